@@ -10,7 +10,7 @@ from django.contrib import messages
 # We don't need timezone here anymore, the form handles it
 
 from finance.forms import PayslipGenerationForm
-from finance.payslip_services import generate_payslip_for_single_coach # Using the single coach function
+from finance.payslip_services import generate_payslip_for_single_coach, get_payslip_data_for_coaches
 
 @admin.register(Coach)
 class CoachAdmin(admin.ModelAdmin):
@@ -33,14 +33,19 @@ class CoachAdmin(admin.ModelAdmin):
                 generated_count = 0
                 error_count = 0
                 skipped_count = 0
-                
-                for coach in queryset:
+
+                coaches = list(queryset)
+                # Load every selected coach's payslip data up front in a fixed number of queries
+                payslip_data_by_coach = get_payslip_data_for_coaches([coach.id for coach in coaches], year, month)
+
+                for coach in coaches:
                     result = generate_payslip_for_single_coach(
                         coach_id=coach.id,
                         year=year,
                         month=month,
                         generating_user_id=request.user.id,
-                        force_regeneration=force_regeneration
+                        force_regeneration=force_regeneration,
+                        payslip_data_by_coach=payslip_data_by_coach
                     )
                     if result['status'] == 'success':
                         generated_count += 1
@@ -52,7 +57,7 @@ class CoachAdmin(admin.ModelAdmin):
                         skipped_count += 1
                         messages.warning(request, result['message'])
 
-                summary = f"Processed {queryset.count()} coaches. Generated: {generated_count}, Skipped: {skipped_count}, Errors: {error_count}."
+                summary = f"Processed {len(coaches)} coaches. Generated: {generated_count}, Skipped: {skipped_count}, Errors: {error_count}."
                 self.message_user(request, summary, messages.INFO)
                 
                 return HttpResponseRedirect(request.get_full_path())
@@ -92,14 +97,18 @@ def generate_payslips(modeladmin, request, queryset):
             
             generated_count = 0
             error_count = 0
-            
-            for coach in queryset:
+
+            coaches = list(queryset)
+            payslip_data_by_coach = get_payslip_data_for_coaches([coach.id for coach in coaches], year, month)
+
+            for coach in coaches:
                 result = generate_payslip_for_single_coach(
                     coach_id=coach.id,
                     year=year,
                     month=month,
                     generating_user_id=request.user.id,
-                    force_regeneration=force_regeneration
+                    force_regeneration=force_regeneration,
+                    payslip_data_by_coach=payslip_data_by_coach
                 )
                 if result['status'] == 'success':
                     generated_count += 1
@@ -110,7 +119,7 @@ def generate_payslips(modeladmin, request, queryset):
                 else: # skipped
                     messages.info(request, result['message'])
 
-            modeladmin.message_user(request, f"Processed {queryset.count()} coaches. Generated: {generated_count}, Errors: {error_count}.")
+            modeladmin.message_user(request, f"Processed {len(coaches)} coaches. Generated: {generated_count}, Errors: {error_count}.")
             return HttpResponseRedirect(request.get_full_path())
 
     context = {
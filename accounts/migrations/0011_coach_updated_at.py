@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_coach_account_holder_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coach',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
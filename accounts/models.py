@@ -41,6 +41,7 @@ class Coach(models.Model):
     email = models.EmailField(blank=True)
     is_active = models.BooleanField(default=True)
     hourly_rate = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True, help_text="Coach's hourly rate for payment.")
+    updated_at = models.DateTimeField(auto_now=True)  # Cached week snapshots show the name and use the rate
     
     whatsapp_phone_number = models.CharField(
         max_length=20,
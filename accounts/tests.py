@@ -1,8 +1,10 @@
+from unittest import mock
 from django.test import TestCase, Client
+from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
-from accounts.models import Coach
+from accounts.models import Coach, ContractTemplate, CoachContract
 from scheduling.models import Session, CoachAvailability, Venue
 from players.models import SchoolGroup # Assuming this is needed for Session creation
 
@@ -158,3 +160,31 @@ class AdminAvailabilityInsightsTest(TestCase):
         self.assertNotIn(s2.id, s2_ids)
         self.assertNotIn(s3.id, s2_ids)
 
+
+@mock.patch('accounts.views.render_pdf', return_value=b'%PDF-contract')
+class ContractPdfExportTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.coach_user = User.objects.create_user(username='coach', password='password', is_staff=True)
+        self.other_user = User.objects.create_user(username='other', password='password', is_staff=True)
+        Coach.objects.create(user=self.other_user, name="Other Coach")
+        coach = Coach.objects.create(user=self.coach_user, name="Contract Coach")
+        template = ContractTemplate.objects.create(name="2026 Agreement", content="Terms.", is_active=True)
+        self.contract = CoachContract.objects.create(coach=coach, template=template)
+        self.url = reverse('accounts:contract_pdf', args=[self.contract.id])
+
+    def test_coach_downloads_own_contract(self, render_pdf):
+        self.client.login(username='coach', password='password')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response.content, b'%PDF-contract')
+        html_string = render_pdf.call_args.args[0]
+        self.assertIn("2026 Agreement", html_string)
+        self.assertEqual(render_pdf.call_args.kwargs['stylesheets'], ['css/contract_pdf.css'])
+
+    def test_other_coach_is_redirected(self, render_pdf):
+        self.client.login(username='other', password='password')
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse('accounts:my_profile'), fetch_redirect_response=False)
+        render_pdf.assert_not_called()
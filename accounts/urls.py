@@ -12,6 +12,7 @@ urlpatterns = [
     
     path('coaches/<int:coach_id>/', views.coach_profile, name='coach_profile'),
     path('sign-contract/', views.sign_contract, name='sign_contract'),
+    path('contracts/<int:contract_id>/pdf/', views.contract_pdf, name='contract_pdf'),
 
     path('accept-invitation/<uuid:token>/', views.accept_invitation, name='accept_invitation'),
     
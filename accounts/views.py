@@ -6,13 +6,13 @@ from django.utils import timezone
 import datetime
 from datetime import timedelta
 from django.conf import settings
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.contrib.auth import login
 from django.contrib.auth import get_user_model
 from django.db.models import Prefetch
 from django.db import transaction
+from django.http import HttpResponse
 import calendar
 
 from .models import Coach, CoachInvitation, ContractTemplate, CoachContract
@@ -23,6 +23,8 @@ from assessments.forms import AssessmentCommentForm
 from finance.models import CoachSessionCompletion
 # Import the payslip service
 from finance.payslip_services import get_payslip_data_for_coach
+from core.pdf_service import render_pdf
+from core.outbox import enqueue
 
 def is_superuser(user):
     return user.is_superuser
@@ -55,13 +57,12 @@ def coach_list(request):
                     'accept_url': accept_url
                 })
 
-                send_mail(
+                enqueue(
                     'You are invited to join SquashSync',
                     f'Please click the following link to accept the invitation: {accept_url}',
-                    settings.DEFAULT_FROM_EMAIL,
                     [email],
                     html_message=html_message,
-                    fail_silently=False,
+                    category='coach_invitation',
                 )
                 messages.success(request, f"Invitation sent to {email}.")
 
@@ -412,3 +413,19 @@ def sign_contract(request):
 
     return render(request, 'accounts/sign_contract.html', {'contract': contract})
 
+
+@login_required
+def contract_pdf(request, contract_id):
+    """Downloads a coach contract as PDF. Coaches can export their own contracts; superusers any."""
+    contract = get_object_or_404(CoachContract.objects.select_related('coach', 'template'), pk=contract_id)
+    if not request.user.is_superuser and contract.coach.user_id != request.user.id:
+        messages.error(request, "You do not have permission to view this contract.")
+        return redirect('accounts:my_profile')
+
+    html_string = render_to_string('accounts/contract_pdf.html', {'contract': contract})
+    pdf_bytes = render_pdf(html_string, stylesheets=['css/contract_pdf.css'])
+
+    filename = f"contract_{contract.coach.name.replace(' ', '_').lower()}_{contract.id}.pdf"
+    response = HttpResponse(pdf_bytes, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -205,6 +205,16 @@ else:
 # --- CUSTOM APP SETTINGS ---
 BONUS_SESSION_START_TIME = datetime.time(6, 0, 0) # 6:00 AM
 BONUS_SESSION_AMOUNT = 25.00
+PAYSLIP_RENDER_WORKERS = int(os.environ.get('PAYSLIP_RENDER_WORKERS', 2)) # Processes used to render PDFs in bulk payslip runs
+COACH_CALENDAR_FEED_CACHE_SECONDS = 60 * 60 # How long a rendered coach iCal feed is kept; it is revalidated against the DB on every poll
+WEEK_SNAPSHOT_CACHE_SECONDS = 10 * 60 # Staffing week snapshots; also revalidated against the DB on every read
+EMAIL_OUTBOX_BATCH_SIZE = 50 # Emails claimed per batch by the send_outbox worker
+EMAIL_OUTBOX_RATE_PER_SECOND = float(os.environ.get('EMAIL_OUTBOX_RATE_PER_SECOND', 5)) # Max sends per second over the worker's SMTP connection (0 = unlimited)
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5 # Attempts before a queued email is marked FAILED
+EMAIL_OUTBOX_RETRY_SECONDS = 60 # First retry delay; doubles with every failed attempt
+PLAYER_REMINDER_WORKERS = 4 # Threads building player attendance reminder emails
+PLAYER_REMINDER_RATE_PER_SECOND = float(os.environ.get('PLAYER_REMINDER_RATE_PER_SECOND', 20)) # Max player reminder sends per second (0 = unlimited)
+PLAYER_REMINDER_BURST = 20 # Sends allowed back to back before the rate limit kicks in
 
 
 # --- CORS SETTINGS (ADD THIS ENTIRE SECTION) ---
@@ -1,6 +1,15 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
 from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+
+from .csv_export import EXPORTS, streaming_csv_response
+from .forms import ExportRangeForm
+from .models import OutboundEmail
 
 class SquashSyncAdminSite(admin.AdminSite):
     site_header = "SquashSync (DEV MODE)" if settings.DEBUG else "SquashSync (PRODUCTION)"
@@ -34,4 +43,56 @@ class SquashSyncAdminSite(admin.AdminSite):
         context['dev_mode'] = settings.DEBUG
         return context
 
+    def get_urls(self):
+        urls = [
+            path('exports/', self.admin_view(self.data_exports_view), name='data_exports'),
+            path('exports/<str:name>/', self.admin_view(self.download_export_view), name='download_export'),
+        ]
+        return urls + super().get_urls()
+
+    def _data_exports_response(self, request, form, status=200):
+        context = {
+            **self.each_context(request),
+            'title': "Data Exports",
+            'exports': [(name, spec['label']) for name, spec in EXPORTS.items()],
+            'form': form,
+        }
+        return TemplateResponse(request, 'admin/data_exports.html', context, status=status)
+
+    def data_exports_view(self, request):
+        """Lists the CSV exports with a date range picker for each."""
+        if not request.user.is_superuser:
+            raise PermissionDenied
+        return self._data_exports_response(request, ExportRangeForm())
+
+    def download_export_view(self, request, name):
+        """Streams one CSV export, limited to the ?start_date=&end_date= range if given."""
+        if not request.user.is_superuser:
+            raise PermissionDenied
+        if name not in EXPORTS:
+            raise Http404("Unknown export.")
+        form = ExportRangeForm(request.GET)
+        if not form.is_valid():
+            return self._data_exports_response(request, form, status=400)
+        return streaming_csv_response(name, form.cleaned_data['start_date'], form.cleaned_data['end_date'])
+
 # Register your models here.
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipients', 'category', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'category')
+    search_fields = ('subject', 'to')
+    readonly_fields = ('attempts', 'last_error', 'created_at', 'sent_at')
+    actions = ['retry_now']
+
+    @admin.display(description="To")
+    def recipients(self, obj):
+        return ", ".join(obj.to)
+
+    @admin.action(description="Retry selected emails now")
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutboundEmail.Status.SENT).update(
+            status=OutboundEmail.Status.PENDING, attempts=0, next_attempt_at=timezone.now(), claim_token=''
+        )
+        messages.success(request, f"{updated} email(s) queued for the next outbox run.")
@@ -0,0 +1,177 @@
+# core/csv_export.py
+
+import csv
+
+from django.http import StreamingHttpResponse
+
+from finance.models import CoachSessionCompletion
+from players.models import AttendanceDiscrepancy, MatchResult
+from scheduling.models import AttendanceTracking, CoachAvailability
+
+CHUNK_SIZE = 2000
+
+
+def _label(choices, default=''):
+    """Column formatter showing a choice field's human-readable label."""
+    labels = dict(choices)
+    return lambda value: labels.get(value, value) if value is not None else default
+
+
+def _or(default):
+    return lambda value: value if value is not None else default
+
+
+def _yes_no(value):
+    return "Yes" if value else "No"
+
+
+def _full_name(first_name, last_name):
+    return f"{first_name} {last_name}"
+
+
+def _opponent(first_name, last_name, opponent_name):
+    return _full_name(first_name, last_name) if first_name is not None else (opponent_name or '')
+
+
+# Each export: the queryset, the date field the range filter applies to, and its columns as
+# (header, field path or tuple of paths, optional formatter called with those values). Rows are
+# read with values_list(), so no model instances are built and memory stays flat however many
+# rows there are.
+EXPORTS = {
+    'availabilities': {
+        'label': "Coach availabilities",
+        'queryset': lambda: CoachAvailability.objects.order_by('session__session_date', 'session__session_start_time', 'id'),
+        'date_field': 'session__session_date',
+        'columns': [
+            ('Coach Username', 'coach__username', None),
+            ('Coach Full Name', ('coach__first_name', 'coach__last_name'), _full_name),
+            ('Session Date', 'session__session_date', None),
+            ('Session Start Time', 'session__session_start_time', None),
+            ('School Group', 'session__school_group__name', _or("No Group")),
+            ('Venue', 'session__venue__name', _or("No Venue")),
+            ('Status', 'status', _label(CoachAvailability.Status.choices)),
+            ('Last Action', 'last_action', _label(CoachAvailability.ACTION_CHOICES)),
+            ('Notes', 'notes', None),
+            ('Updated At', 'status_updated_at', None),
+        ],
+    },
+    'attendance': {
+        'label': "Player attendance",
+        'queryset': lambda: AttendanceTracking.objects.order_by('session__session_date', 'session__session_start_time', 'id'),
+        'date_field': 'session__session_date',
+        'columns': [
+            ('Session Date', 'session__session_date', None),
+            ('Session Start Time', 'session__session_start_time', None),
+            ('School Group', 'session__school_group__name', _or("No Group")),
+            ('Player ID', 'player_id', None),
+            ('Player', ('player__first_name', 'player__last_name'), _full_name),
+            ("Parent's Response", 'parent_response', _label(AttendanceTracking.ParentResponse.choices)),
+            ('Coach-Marked Attendance', 'attended', _label(AttendanceTracking.CoachAttended.choices)),
+            ('Updated At', 'recorded_at', None),
+        ],
+    },
+    'discrepancies': {
+        'label': "Attendance discrepancies",
+        'queryset': lambda: AttendanceDiscrepancy.objects.order_by('session__session_date', 'session__session_start_time', 'id'),
+        'date_field': 'session__session_date',
+        'columns': [
+            ('Session Date', 'session__session_date', None),
+            ('Session Start Time', 'session__session_start_time', None),
+            ('School Group', 'session__school_group__name', _or("No Group")),
+            ('Player ID', 'player_id', None),
+            ('Player', ('player__first_name', 'player__last_name'), _full_name),
+            ('Discrepancy', 'discrepancy_type', _label(AttendanceDiscrepancy.DiscrepancyType.choices)),
+            ("Parent's Response", 'parent_response', _label(AttendanceTracking.ParentResponse.choices)),
+            ('Coach-Marked Attendance', 'coach_marked_attendance', _label(AttendanceTracking.CoachAttended.choices)),
+            ('Acknowledged', 'admin_acknowledged', _yes_no),
+            ('Recorded At', 'recorded_at', None),
+        ],
+    },
+    'completions': {
+        'label': "Coach session completions",
+        'queryset': lambda: CoachSessionCompletion.objects.order_by('session__session_date', 'session__session_start_time', 'id'),
+        'date_field': 'session__session_date',
+        'columns': [
+            ('Session Date', 'session__session_date', None),
+            ('Session Start Time', 'session__session_start_time', None),
+            ('School Group', 'session__school_group__name', _or("No Group")),
+            ('Coach', 'coach__name', None),
+            ('Assessments Submitted', 'assessments_submitted', _yes_no),
+            ('Confirmed For Payment', 'confirmed_for_payment', _yes_no),
+            ('Last Updated', 'last_updated', None),
+        ],
+    },
+    'matches': {
+        'label': "Match results",
+        'queryset': lambda: MatchResult.objects.order_by('date', 'id'),
+        'date_field': 'date',
+        'columns': [
+            ('Date', 'date', None),
+            ('Player', ('player__first_name', 'player__last_name'), _full_name),
+            ('Opponent', ('opponent__first_name', 'opponent__last_name', 'opponent_name'), _opponent),
+            ('Player Score', 'player_score_str', None),
+            ('Opponent Score', 'opponent_score_str', _or('')),
+            ('Competitive', 'is_competitive', _yes_no),
+            ('Status', 'status', _label(MatchResult.MatchStatus.choices)),
+            ('Submitted By', 'submitted_by_name', None),
+            ('Confirmed At', 'confirmed_at', None),
+        ],
+    },
+}
+
+
+def export_rows(name, start_date=None, end_date=None, chunk_size=CHUNK_SIZE):
+    """
+    Yields the header row and then every data row of export `name` (a key of EXPORTS), optionally
+    limited to an inclusive date range. Rows are fetched chunk_size at a time from a server-side
+    cursor where the database supports one.
+    """
+    spec = EXPORTS[name]
+    queryset = spec['queryset']()
+    if start_date:
+        queryset = queryset.filter(**{f"{spec['date_field']}__gte": start_date})
+    if end_date:
+        queryset = queryset.filter(**{f"{spec['date_field']}__lte": end_date})
+
+    paths, slices = [], []
+    for _, fields, formatter in spec['columns']:
+        fields = (fields,) if isinstance(fields, str) else fields
+        slices.append((len(paths), len(paths) + len(fields), formatter))
+        paths.extend(fields)
+
+    yield [header for header, _, _ in spec['columns']]
+    for values in queryset.values_list(*paths).iterator(chunk_size=chunk_size):
+        yield [
+            formatter(*values[start:end]) if formatter else values[start]
+            for start, end, formatter in slices
+        ]
+
+
+class _Echo:
+    """File-like object whose write() hands the formatted line back to the csv writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    """Formats rows as CSV lines one at a time."""
+    writer = csv.writer(_Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def export_filename(name, start_date=None, end_date=None):
+    parts = [name]
+    if start_date:
+        parts.append(f"from_{start_date:%Y%m%d}")
+    if end_date:
+        parts.append(f"to_{end_date:%Y%m%d}")
+    return "_".join(parts) + ".csv"
+
+
+def streaming_csv_response(name, start_date=None, end_date=None):
+    """A StreamingHttpResponse downloading export `name`; memory use doesn't grow with the row count."""
+    response = StreamingHttpResponse(stream_csv(export_rows(name, start_date, end_date)), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(name, start_date, end_date)}"'
+    return response
@@ -0,0 +1,14 @@
+from django import forms
+
+
+class ExportRangeForm(forms.Form):
+    start_date = forms.DateField(label="From", required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    end_date = forms.DateField(label="To", required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start = cleaned_data.get("start_date")
+        end = cleaned_data.get("end_date")
+        if start and end and end < start:
+            raise forms.ValidationError("End date cannot be before start date.")
+        return cleaned_data
@@ -1,113 +1,62 @@
 # core/management/commands/import_schedule.py
 
-import csv
 import os
-import re
-from datetime import time
+import time
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from django.db import transaction
 
-# Import models from their new app locations
-from players.models import Player, SchoolGroup
-from scheduling.models import ScheduledClass
-
-# Import the utility function from its new location
-from core.utils import parse_grade_from_string
+from core.schedule_import import apply_schedule_import, describe_plan, parse_schedule_files, plan_schedule_import
 
 class Command(BaseCommand):
     help = 'Imports player, group, and schedule data from the new, standardized CSV file format.'
 
-    @transaction.atomic
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what the import would create and update without writing anything.',
+        )
+        parser.add_argument(
+            '--dir',
+            help="Directory holding the day files (defaults to 'data_imports/data_imports' in the project root).",
+        )
+
     def handle(self, *args, **options):
-        # --- THIS IS THE ONLY LINE THAT HAS CHANGED ---
-        import_dir = os.path.join(settings.BASE_DIR, 'data_imports', 'data_imports')
-        
+        import_dir = options['dir'] or os.path.join(settings.BASE_DIR, 'data_imports', 'data_imports')
+        dry_run = options['dry_run']
+        verbosity = options['verbosity']
+
         if not os.path.isdir(import_dir):
             self.stdout.write(self.style.ERROR(f"Import directory not found: {import_dir}"))
             self.stdout.write(self.style.WARNING("Please create a 'data_imports/data_imports' directory in your project root."))
             return
 
-        day_mapping = {
-            'Mondays.csv': 0, 'Tuesdays.csv': 1, 'Wednesdays.csv': 2,
-            'Thursdays.csv': 3, 'Fridays.csv': 4,
-        }
-
-        stats = {
-            'groups_created': 0, 'players_created': 0, 'players_updated': 0,
-            'schedules_created': 0, 'schedules_updated': 0, 'players_added_to_groups': 0,
-            'rows_skipped': 0
-        }
-
-        for file_name, day_of_week in day_mapping.items():
-            file_path = os.path.join(import_dir, file_name)
-            if not os.path.exists(file_path):
-                continue
-
-            self.stdout.write(f"--- Processing file: {file_name} ---")
-            
-            with open(file_path, mode='r', encoding='utf-8-sig') as csvfile:
-                reader = csv.DictReader(csvfile, delimiter=';')
-                
-                for row_num, row in enumerate(reader, start=2):
-                    group_name = row.get('school_group_name', '').strip()
-                    time_str = row.get('session_start_time', '').strip()
-                    full_name = row.get('player_first_name', '').strip()
-                    grade_str = row.get('player_grade', '').strip()
-
-                    if not (group_name and time_str and full_name):
-                        self.stdout.write(self.style.WARNING(f"  Skipping row {row_num} due to missing data."))
-                        stats['rows_skipped'] += 1
-                        continue
-
-                    # --- Process School Group ---
-                    school_group_obj, created = SchoolGroup.objects.get_or_create(name=group_name)
-                    if created:
-                        stats['groups_created'] += 1
-
-                    # --- Process Player ---
-                    name_parts = full_name.split(' ', 1)
-                    first_name = name_parts[0]
-                    last_name = name_parts[1] if len(name_parts) > 1 else ''
-                    grade_val = parse_grade_from_string(grade_str)
-
-                    player_obj, created = Player.objects.get_or_create(
-                        first_name__iexact=first_name,
-                        last_name__iexact=last_name,
-                        defaults={'first_name': first_name, 'last_name': last_name, 'grade': grade_val}
-                    )
-                    
-                    if created:
-                        stats['players_created'] += 1
-                    else:
-                        if grade_val is not None and player_obj.grade != grade_val:
-                            player_obj.grade = grade_val
-                            player_obj.save()
-                            stats['players_updated'] += 1
-                    
-                    # --- Link Player to Group ---
-                    if not player_obj.school_groups.filter(pk=school_group_obj.pk).exists():
-                        player_obj.school_groups.add(school_group_obj)
-                        stats['players_added_to_groups'] += 1
-
-                    # --- Process Scheduled Class ---
-                    try:
-                        hour, minute = map(int, time_str.split(':'))
-                        start_time_obj = time(hour, minute)
-                        
-                        schedule, created = ScheduledClass.objects.update_or_create(
-                            school_group=school_group_obj,
-                            day_of_week=day_of_week,
-                            start_time=start_time_obj,
-                            defaults={'default_duration_minutes': 60}
-                        )
-                        if created:
-                            stats['schedules_created'] += 1
-                        else:
-                            stats['schedules_updated'] += 1
-                    except ValueError:
-                        self.stdout.write(self.style.WARNING(f"  Skipping schedule for row {row_num} due to invalid time: '{time_str}'"))
-
-        self.stdout.write(self.style.SUCCESS('\n--- Import Complete ---'))
-        for key, value in stats.items():
-            self.stdout.write(f"{key.replace('_', ' ').title()}: {value}")
\ No newline at end of file
+        timings = {}
+        started = time.perf_counter()
+        staging = parse_schedule_files(import_dir)
+        timings['parse'] = time.perf_counter() - started
+        self.stdout.write(f"--- Parsed {len(staging['rows'])} rows from: {', '.join(staging['files']) or 'no day files'} ---")
+
+        phase_started = time.perf_counter()
+        plan = plan_schedule_import(staging)
+        timings['plan'] = time.perf_counter() - phase_started
+        for warning in plan['warnings']:
+            self.stdout.write(self.style.WARNING(f"  {warning}"))
+
+        # The full diff on request (-v 2), or always for a dry run
+        if dry_run or verbosity >= 2:
+            for line in describe_plan(plan):
+                self.stdout.write(f"  {line}")
+
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS('\n--- Dry Run: nothing was written ---'))
+        else:
+            phase_started = time.perf_counter()
+            apply_schedule_import(plan)
+            timings['apply'] = time.perf_counter() - phase_started
+            self.stdout.write(self.style.SUCCESS('\n--- Import Complete ---'))
+
+        for key, value in plan['stats'].items():
+            self.stdout.write(f"{key.replace('_', ' ').title()}: {value}")
+        phases = ', '.join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items())
+        self.stdout.write(f"Finished in {time.perf_counter() - started:.2f}s ({phases}).")
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from core.outbox import deliver_outbox
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued emails from the outbox over a single email connection (run from cron, or with --loop).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Emails claimed per batch (defaults to settings.EMAIL_OUTBOX_BATCH_SIZE).')
+        parser.add_argument('--rate', type=float, help='Max emails per second, 0 for unlimited (defaults to settings.EMAIL_OUTBOX_RATE_PER_SECOND).')
+        parser.add_argument('--max-messages', type=int, help='Stop after handling this many emails.')
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, polling the outbox every --interval seconds.',
+        )
+        parser.add_argument('--interval', type=float, default=10, help='Seconds between polls with --loop.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        if options['rate'] is not None and options['rate'] < 0:
+            raise CommandError('--rate cannot be negative.')
+
+        while True:
+            stats = deliver_outbox(
+                batch_size=options['batch_size'],
+                rate_per_second=options['rate'],
+                max_messages=options['max_messages'],
+            )
+            if stats['batches'] or not options['loop']:
+                style = self.style.SUCCESS if not (stats['retried'] or stats['failed']) else self.style.WARNING
+                self.stdout.write(style(
+                    f"Sent {stats['sent']}, retrying {stats['retried']}, failed {stats['failed']} "
+                    f"in {stats['batches']} batch(es), {stats['seconds']}s."
+                ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -1,14 +1,13 @@
 # core/management/commands/send_session_reminders.py
 
-import datetime
+import time
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.db import connection
 from django.utils import timezone
-from django.db.models import Q
-from collections import defaultdict
 
-from scheduling.models import Session, CoachAvailability
-from scheduling.notifications import send_consolidated_session_reminder_email
-from accounts.models import Coach
+from core.outbox import deliver_outbox, enqueue_messages
+from scheduling.reminders import build_coach_reminder_emails, collect_coach_reminders
 
 class Command(BaseCommand):
     help = 'Sends consolidated attendance reminder emails to coaches for sessions occurring today and the next day.'
@@ -19,72 +18,66 @@ class Command(BaseCommand):
             type=str,
             help='Send all generated emails to this address instead of the actual coaches for testing.',
         )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Load and build every email but queue and send nothing. Lists who would receive them.',
+        )
+        parser.add_argument(
+            '--queue-only',
+            action='store_true',
+            help='Queue the emails and leave delivery to the send_outbox worker.',
+        )
 
     def handle(self, *args, **options):
         now = timezone.now()
-        today = now.date()
-        tomorrow = today + datetime.timedelta(days=1)
         test_email = options['email']
-        
+        dry_run = options['dry_run']
+        mode_str = "[DRY RUN] " if dry_run else ""
+
         if test_email:
             self.stdout.write(self.style.WARNING(f"--- RUNNING IN TEST MODE ---"))
             self.stdout.write(self.style.WARNING(f"All emails will be sent to: {test_email}"))
-        
-        self.stdout.write(f"[{now:%Y-%m-%d %H:%M}] Running send_session_reminders for sessions on: {today} and {tomorrow}")
-
-        sessions_to_notify_qs = Session.objects.filter(
-            Q(
-                session_date=today,
-                session_start_time__gte=now.time()
-            ) | 
-            Q(
-                session_date=tomorrow
-            ),
-            is_cancelled=False
-        ).prefetch_related('coaches_attending__user')
 
-        sessions_by_coach = defaultdict(list)
-        for session in sessions_to_notify_qs:
-            for coach_profile in session.coaches_attending.all():
-                if coach_profile.user:
-                    sessions_by_coach[coach_profile.user].append(session)
-        
-        if not sessions_by_coach:
-            self.stdout.write(self.style.SUCCESS("No upcoming sessions with assigned coaches found. Exiting."))
-            return
+        self.stdout.write(f"{mode_str}[{now:%Y-%m-%d %H:%M}] Running send_session_reminders for sessions on: {now.date()} and the next day")
+        timings = {}
+        queries = {}
 
-        sent_count = 0
-        for coach_user, sessions in sessions_by_coach.items():
-            
-            unresponded_sessions = []
-            for session in sessions:
-                 if not CoachAvailability.objects.filter(
-                    coach=coach_user,
-                    session=session,
-                    last_action__in=['CONFIRM', 'DECLINE']
-                ).exists():
-                    unresponded_sessions.append(session)
-            
-            if not unresponded_sessions:
-                self.stdout.write(f"  Skipping email for {coach_user.username}, all sessions already responded to.")
-                continue
+        # 1. Who needs a reminder, from one load of sessions, assignments and availabilities
+        started, query_count = time.perf_counter(), len(connection.queries)
+        reminders = collect_coach_reminders(now)
+        timings['load'] = time.perf_counter() - started
+        queries['load'] = len(connection.queries) - query_count
 
-            sessions_by_day = defaultdict(list)
-            for session in unresponded_sessions:
-                sessions_by_day[session.session_date].append(session)
+        if not reminders:
+            self.stdout.write(self.style.SUCCESS("No coaches with unresponded sessions found. Exiting."))
+            return
 
-            # Override the recipient if in test mode
-            original_email = coach_user.email
-            if test_email:
-                coach_user.email = test_email
+        # 2. Build every email from the preloaded data
+        started, query_count = time.perf_counter(), len(connection.queries)
+        emails = build_coach_reminder_emails(reminders, is_reminder=True, recipient_override=test_email)
+        timings['build'] = time.perf_counter() - started
+        queries['build'] = len(connection.queries) - query_count
 
-            if send_consolidated_session_reminder_email(coach_user, sessions_by_day, is_reminder=True):
-                sent_count += 1
-            
-            # IMPORTANT: Restore the original email after sending
-            if test_email:
-                coach_user.email = original_email
-        
-        self.stdout.write(self.style.SUCCESS(f"--- Process Complete ---"))
-        self.stdout.write(f"Sent {sent_count} consolidated reminder emails.")
+        if dry_run:
+            for user, email in emails:
+                self.stdout.write(f"  [DRY RUN] Would send to: {user.username} <{', '.join(email.to)}> - {email.subject}")
+        else:
+            # 3. Queue them with one insert, then deliver over a single connection in batches
+            started = time.perf_counter()
+            enqueue_messages([email for _, email in emails], category='session_reminder')
+            timings['queue'] = time.perf_counter() - started
+            if not options['queue_only']:
+                stats = deliver_outbox()
+                timings['send'] = stats['seconds']
+                if stats['retried'] or stats['failed']:
+                    self.stdout.write(self.style.WARNING(f"  {stats['retried']} email(s) will be retried, {stats['failed']} failed."))
 
+        self.stdout.write(self.style.SUCCESS(f"--- {mode_str}Process Complete ---"))
+        action_verb = "would be sent" if dry_run else ("queued" if options['queue_only'] else "sent")
+        self.stdout.write(f"Consolidated reminder emails {action_verb}: {len(emails)} (coaches needing one: {len(reminders)}).")
+        timing = "Timing: " + ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items())
+        if settings.DEBUG:
+            # Django only records queries with DEBUG on
+            timing += "; queries: " + ", ".join(f"{stage} {count}" for stage, count in queries.items())
+        self.stdout.write(timing + ".")
@@ -0,0 +1,181 @@
+# core/outbox.py
+
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+# A claimed batch is hidden from other workers for this long; if the worker dies mid-batch
+# the emails become due again once the lease runs out.
+CLAIM_LEASE = timedelta(minutes=10)
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+
+def _row_for(subject, body, to, html_message=None, from_email=None, headers=None, category=''):
+    return OutboundEmail(
+        category=category,
+        subject=subject.strip(),
+        body=body or '',
+        html_body=html_message or '',
+        from_email=from_email or '',
+        to=list(to),
+        headers=dict(headers or {}),
+    )
+
+
+def enqueue(subject, body, to, html_message=None, from_email=None, headers=None, category=''):
+    """
+    Queues an email for delivery by the send_outbox worker instead of sending it inline.
+    Takes the same arguments as send_mail(); returns the OutboundEmail row.
+    """
+    row = _row_for(subject, body, to, html_message, from_email, headers, category)
+    row.save()
+    return row
+
+
+def enqueue_messages(messages, category=''):
+    """Queues already-built EmailMessage/EmailMultiAlternatives objects with a single INSERT."""
+    rows = []
+    for message in messages:
+        html_message = next(
+            (content for content, mimetype in getattr(message, 'alternatives', []) if mimetype == 'text/html'),
+            None
+        )
+        rows.append(_row_for(
+            message.subject, message.body, message.to, html_message,
+            message.from_email, message.extra_headers, category
+        ))
+    return OutboundEmail.objects.bulk_create(rows)
+
+
+def build_message(email, connection=None):
+    """Turns a queued row back into an EmailMultiAlternatives bound to `connection`."""
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=email.to,
+        headers=email.headers,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+class TokenBucket:
+    """
+    Rate limiter allowing `rate` operations per second on average, in bursts of up to `burst`.
+    wait() blocks until a token is available.
+    """
+
+    def __init__(self, rate, burst=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = max(float(burst), 1.0)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+
+    def wait(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            self.sleep((1 - self.tokens) / self.rate)
+            self.updated = self.clock()
+            self.tokens = 1
+        self.tokens -= 1
+
+
+def retry_delay(attempts):
+    """Exponential backoff after the given number of failed attempts."""
+    delay = timedelta(seconds=settings.EMAIL_OUTBOX_RETRY_SECONDS * 2 ** (attempts - 1))
+    return min(delay, MAX_RETRY_DELAY)
+
+
+def _claim_batch(limit):
+    """Claims up to `limit` due emails for this worker; rows claimed concurrently by another worker are skipped."""
+    now = timezone.now()
+    due = OutboundEmail.objects.filter(status=OutboundEmail.Status.PENDING, next_attempt_at__lte=now)
+    ids = list(due.values_list('id', flat=True)[:limit])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    due.filter(pk__in=ids).update(claim_token=token, next_attempt_at=now + CLAIM_LEASE)
+    return list(OutboundEmail.objects.filter(claim_token=token).order_by('id'))
+
+
+def deliver_outbox(batch_size=None, rate_per_second=None, max_messages=None, max_attempts=None, connection=None, sleep=time.sleep):
+    """
+    Sends due emails from the outbox in batches over one reused backend connection.
+
+    Sends are spaced by a token bucket (rate_per_second, 0 disables it). A failed email is
+    retried with exponential backoff until it has been attempted max_attempts times, then
+    marked FAILED. After an error the connection is closed and reopened for the next email.
+    Returns {'sent', 'retried', 'failed', 'batches', 'seconds'}.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    rate_per_second = settings.EMAIL_OUTBOX_RATE_PER_SECOND if rate_per_second is None else rate_per_second
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    limiter = TokenBucket(rate_per_second, sleep=sleep) if rate_per_second else None
+    connection = connection or get_connection()
+
+    stats = {'sent': 0, 'retried': 0, 'failed': 0, 'batches': 0}
+    started = time.perf_counter()
+    handled = 0
+    is_open = False
+    try:
+        while max_messages is None or handled < max_messages:
+            limit = batch_size if max_messages is None else min(batch_size, max_messages - handled)
+            batch = _claim_batch(limit)
+            if not batch:
+                break
+            stats['batches'] += 1
+            handled += len(batch)
+
+            sent_ids, failed = [], []
+            for email in batch:
+                if limiter:
+                    limiter.wait()
+                try:
+                    if not is_open:
+                        connection.open()
+                        is_open = True
+                    if not connection.send_messages([build_message(email, connection)]):
+                        raise ValueError("The email backend did not accept the message.")
+                    sent_ids.append(email.id)
+                except Exception as e:
+                    email.last_error = f"{type(e).__name__}: {e}"
+                    failed.append(email)
+                    connection.close()
+                    is_open = False
+
+            now = timezone.now()
+            if sent_ids:
+                OutboundEmail.objects.filter(pk__in=sent_ids).update(
+                    status=OutboundEmail.Status.SENT, sent_at=now, claim_token='', last_error=''
+                )
+            for email in failed:
+                email.attempts += 1
+                email.claim_token = ''
+                if email.attempts >= max_attempts:
+                    email.status = OutboundEmail.Status.FAILED
+                    stats['failed'] += 1
+                else:
+                    email.next_attempt_at = now + retry_delay(email.attempts)
+                    stats['retried'] += 1
+            if failed:
+                OutboundEmail.objects.bulk_update(failed, ['status', 'attempts', 'last_error', 'next_attempt_at', 'claim_token'])
+            stats['sent'] += len(sent_ids)
+    finally:
+        if is_open:
+            connection.close()
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    return stats
@@ -0,0 +1,147 @@
+# core/pdf_service.py
+
+import mimetypes
+import threading
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from weasyprint import HTML, CSS, default_url_fetcher
+from weasyprint.text.fonts import FontConfiguration
+
+# Per-process caches. WeasyPrint documents can share a FontConfiguration and parsed CSS,
+# so these are built on first use and reused for every document rendered by this process.
+_cache_lock = threading.Lock()
+_font_config = None
+_stylesheets = {}
+_static_assets = {}
+
+
+def _find_static_file(static_path: str) -> Path | None:
+    """Resolves a path relative to STATIC_URL to a file on disk (source dirs first, then STATIC_ROOT)."""
+    found = finders.find(static_path)
+    if found:
+        return Path(found)
+    if settings.STATIC_ROOT:
+        collected = Path(settings.STATIC_ROOT) / static_path
+        if collected.is_file():
+            return collected
+    return None
+
+
+def _static_path_for_url(url: str) -> str | None:
+    """
+    Returns the static-relative path if `url` points at one of our static files, i.e. a
+    STATIC_URL path on this site (as produced by {% static %} against APP_SITE_URL).
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https'):
+        return None
+    if parsed.netloc != urlparse(settings.APP_SITE_URL).netloc:
+        return None
+    static_prefix = '/' + settings.STATIC_URL.strip('/') + '/'
+    if not parsed.path.startswith(static_prefix):
+        return None
+    return unquote(parsed.path[len(static_prefix):])
+
+
+def _fetch_static_asset(url, use_cache=True):
+    """Returns a WeasyPrint fetcher result for one of our static files, or None if `url` isn't one."""
+    static_path = _static_path_for_url(url)
+    if not static_path:
+        return None
+    asset = _static_assets.get(static_path) if use_cache else None
+    if asset is None:
+        file_path = _find_static_file(static_path)
+        if not file_path:
+            return None
+        asset = file_path.read_bytes()
+        if use_cache:
+            with _cache_lock:
+                _static_assets[static_path] = asset
+    return {
+        'string': asset,
+        'mime_type': mimetypes.guess_type(static_path)[0] or 'application/octet-stream',
+        'redirected_url': url,
+    }
+
+
+def local_url_fetcher(url, *args, **kwargs):
+    """
+    WeasyPrint url_fetcher that serves our own static assets (logo, images) straight from
+    disk, cached in memory, instead of fetching them back over HTTP from APP_SITE_URL.
+    Anything else goes through WeasyPrint's default fetcher.
+    """
+    return _fetch_static_asset(url) or default_url_fetcher(url, *args, **kwargs)
+
+
+def _uncached_url_fetcher(url, *args, **kwargs):
+    return _fetch_static_asset(url, use_cache=False) or default_url_fetcher(url, *args, **kwargs)
+
+
+def get_font_config() -> FontConfiguration:
+    """The process-wide FontConfiguration shared by all rendered documents."""
+    global _font_config
+    if _font_config is None:
+        with _cache_lock:
+            if _font_config is None:
+                _font_config = FontConfiguration()
+    return _font_config
+
+
+def get_stylesheet(static_path: str) -> CSS:
+    """Parses a static CSS file (e.g. 'css/payslip_pdf.css') once per process and returns the cached CSS."""
+    stylesheet = _stylesheets.get(static_path)
+    if stylesheet is None:
+        file_path = _find_static_file(static_path)
+        if not file_path:
+            raise FileNotFoundError(f"PDF stylesheet '{static_path}' not found in static files.")
+        stylesheet = CSS(
+            string=file_path.read_text(encoding='utf-8'),
+            base_url=settings.APP_SITE_URL,
+            font_config=get_font_config(),
+            url_fetcher=local_url_fetcher
+        )
+        with _cache_lock:
+            _stylesheets[static_path] = stylesheet
+    return stylesheet
+
+
+def clear_pdf_caches():
+    """Drops the cached fonts, stylesheets and assets (e.g. after editing a PDF stylesheet)."""
+    global _font_config
+    with _cache_lock:
+        _font_config = None
+        _stylesheets.clear()
+        _static_assets.clear()
+
+
+def render_pdf(html_string: str, stylesheets=(), use_cache: bool = True) -> bytes:
+    """
+    Renders an HTML string to PDF bytes with the given static stylesheets.
+    With use_cache=False every piece is built from scratch, which is only useful for
+    benchmarking against the cached path.
+    """
+    if use_cache:
+        font_config = get_font_config()
+        css = [get_stylesheet(path) for path in stylesheets]
+        url_fetcher = local_url_fetcher
+    else:
+        font_config = FontConfiguration()
+        css = [
+            CSS(
+                filename=str(_find_static_file(path)),
+                base_url=settings.APP_SITE_URL,
+                font_config=font_config,
+                url_fetcher=_uncached_url_fetcher
+            )
+            for path in stylesheets
+        ]
+        url_fetcher = _uncached_url_fetcher
+
+    return HTML(
+        string=html_string,
+        base_url=settings.APP_SITE_URL,
+        url_fetcher=url_fetcher
+    ).write_pdf(stylesheets=css, font_config=font_config)
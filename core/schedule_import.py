@@ -0,0 +1,222 @@
+# core/schedule_import.py
+
+import csv
+import os
+from datetime import time
+
+from django.db import transaction
+
+from players.models import Player, SchoolGroup
+from scheduling.models import ScheduledClass
+from .utils import parse_grade_from_string
+
+DAY_FILES = {
+    'Mondays.csv': 0, 'Tuesdays.csv': 1, 'Wednesdays.csv': 2,
+    'Thursdays.csv': 3, 'Fridays.csv': 4,
+}
+DEFAULT_DURATION_MINUTES = 60
+
+
+def _player_key(first_name, last_name):
+    return first_name.lower(), last_name.lower()
+
+
+def parse_schedule_files(import_dir):
+    """
+    Phase 1: reads every day file in import_dir into staging rows without touching the database.
+    Returns {'rows', 'warnings', 'files', 'rows_skipped'} where each row is a dict with
+    group_name, day_of_week, start_time (None if unparseable), first_name, last_name and grade.
+    """
+    staging = {'rows': [], 'warnings': [], 'files': [], 'rows_skipped': 0}
+    for file_name, day_of_week in DAY_FILES.items():
+        file_path = os.path.join(import_dir, file_name)
+        if not os.path.exists(file_path):
+            continue
+        staging['files'].append(file_name)
+
+        with open(file_path, mode='r', encoding='utf-8-sig') as csvfile:
+            reader = csv.DictReader(csvfile, delimiter=';')
+            for row_num, row in enumerate(reader, start=2):
+                group_name = (row.get('school_group_name') or '').strip()
+                time_str = (row.get('session_start_time') or '').strip()
+                full_name = (row.get('player_first_name') or '').strip()
+                grade_str = (row.get('player_grade') or '').strip()
+
+                if not (group_name and time_str and full_name):
+                    staging['warnings'].append(f"{file_name} row {row_num}: skipped due to missing data.")
+                    staging['rows_skipped'] += 1
+                    continue
+
+                try:
+                    hour, minute = map(int, time_str.split(':'))
+                    start_time = time(hour, minute)
+                except ValueError:
+                    staging['warnings'].append(f"{file_name} row {row_num}: no schedule imported, invalid time '{time_str}'.")
+                    start_time = None
+
+                name_parts = full_name.split(' ', 1)
+                staging['rows'].append({
+                    'group_name': group_name,
+                    'day_of_week': day_of_week,
+                    'start_time': start_time,
+                    'first_name': name_parts[0],
+                    'last_name': name_parts[1] if len(name_parts) > 1 else '',
+                    'grade': parse_grade_from_string(grade_str),
+                })
+    return staging
+
+
+def plan_schedule_import(staging):
+    """
+    Phase 2: resolves the staged rows against existing groups, players, memberships and schedule
+    rules with one query each, and works out what the import would change. Nothing is written.
+
+    Groups match by exact name and players case-insensitively by first and last name, as the
+    row-by-row import did; when several existing records match, the first active (groups) or
+    oldest one is used and a warning is added. A player's grade becomes the last grade given
+    for them in the files.
+    """
+    rows = staging['rows']
+    warnings = list(staging['warnings'])
+
+    group_names = sorted({row['group_name'] for row in rows})
+    groups = {}
+    for group in SchoolGroup.objects.filter(name__in=group_names).order_by('-is_active', 'id'):
+        if group.name in groups:
+            warnings.append(f"Several groups are named '{group.name}'; using id {groups[group.name].id}.")
+            continue
+        groups[group.name] = group
+    new_groups = [SchoolGroup(name=name) for name in group_names if name not in groups]
+
+    row_keys = {_player_key(row['first_name'], row['last_name']) for row in rows}
+    players = {}
+    for player in Player.objects.only('id', 'first_name', 'last_name', 'grade').order_by('id'):
+        key = _player_key(player.first_name, player.last_name)
+        if key in players:
+            if key in row_keys:
+                warnings.append(f"Several players are named '{player.first_name} {player.last_name}'; using id {players[key].id}.")
+            continue
+        players[key] = player
+
+    new_players, grade_changes, staged_players = {}, {}, {}
+    for row in rows:
+        key = _player_key(row['first_name'], row['last_name'])
+        player = players.get(key) or new_players.get(key)
+        if player is None:
+            player = new_players[key] = Player(first_name=row['first_name'], last_name=row['last_name'], grade=row['grade'])
+        elif row['grade'] is not None:
+            if player.pk is None:
+                player.grade = row['grade']
+            elif player.grade != row['grade']:
+                grade_changes[key] = (player, row['grade'])
+            else:
+                grade_changes.pop(key, None)
+        staged_players[key] = player
+
+    existing_groups = list(groups.values())
+    existing_memberships = set(
+        Player.school_groups.through.objects.filter(
+            schoolgroup_id__in=[group.id for group in existing_groups]
+        ).values_list('player_id', 'schoolgroup_id')
+    )
+    memberships = []
+    seen = set()
+    for row in rows:
+        key = _player_key(row['first_name'], row['last_name'])
+        pair = (key, row['group_name'])
+        if pair in seen:
+            continue
+        seen.add(pair)
+        player, group = staged_players[key], groups.get(row['group_name'])
+        if player.pk and group and (player.pk, group.pk) in existing_memberships:
+            continue
+        memberships.append(pair)
+
+    existing_schedules = {
+        (rule.school_group_id, rule.day_of_week, rule.start_time): rule
+        for rule in ScheduledClass.objects.filter(school_group__in=existing_groups).select_related('school_group')
+    }
+    schedules_to_create, schedules_to_update, schedules_unchanged = [], [], 0
+    seen = set()
+    for row in rows:
+        schedule_key = (row['group_name'], row['day_of_week'], row['start_time'])
+        if row['start_time'] is None or schedule_key in seen:
+            continue
+        seen.add(schedule_key)
+        group = groups.get(row['group_name'])
+        rule = existing_schedules.get((group.pk, row['day_of_week'], row['start_time'])) if group else None
+        if rule is None:
+            schedules_to_create.append(schedule_key)
+        elif rule.default_duration_minutes != DEFAULT_DURATION_MINUTES:
+            schedules_to_update.append(rule)
+        else:
+            schedules_unchanged += 1
+
+    return {
+        'groups': groups,
+        'new_groups': new_groups,
+        'players': staged_players,
+        'new_players': list(new_players.values()),
+        'grade_changes': list(grade_changes.values()),
+        'memberships': memberships,
+        'schedules_to_create': schedules_to_create,
+        'schedules_to_update': schedules_to_update,
+        'warnings': warnings,
+        'stats': {
+            'rows': len(rows),
+            'rows_skipped': staging['rows_skipped'],
+            'groups_created': len(new_groups),
+            'players_created': len(new_players),
+            'players_updated': len(grade_changes),
+            'players_added_to_groups': len(memberships),
+            'schedules_created': len(schedules_to_create),
+            'schedules_updated': len(schedules_to_update),
+            'schedules_unchanged': schedules_unchanged,
+        },
+    }
+
+
+def describe_plan(plan):
+    """Human-readable diff lines for a plan: what would be created or changed."""
+    lines = [f"Create group: {group.name}" for group in plan['new_groups']]
+    lines += [f"Create player: {player.first_name} {player.last_name} (grade {player.grade})" for player in plan['new_players']]
+    lines += [f"Update grade: {player.first_name} {player.last_name} {player.grade} -> {grade}" for player, grade in plan['grade_changes']]
+    lines += [f"Add to group: {plan['players'][key].first_name} {plan['players'][key].last_name} -> {group_name}" for key, group_name in plan['memberships']]
+    day_names = dict(ScheduledClass.DAY_OF_WEEK_CHOICES)
+    lines += [f"Create schedule: {group_name} on {day_names[day]} at {start:%H:%M}" for group_name, day, start in plan['schedules_to_create']]
+    lines += [
+        f"Update schedule: {rule.school_group.name} on {rule.get_day_of_week_display()} at {rule.start_time:%H:%M} "
+        f"(duration {rule.default_duration_minutes} -> {DEFAULT_DURATION_MINUTES} min)"
+        for rule in plan['schedules_to_update']
+    ]
+    return lines
+
+
+def apply_schedule_import(plan):
+    """
+    Phase 3: writes a plan from plan_schedule_import() with bulk operations in one transaction:
+    new groups, new players, grade updates, memberships and schedule rules each take one statement.
+    """
+    with transaction.atomic():
+        SchoolGroup.objects.bulk_create(plan['new_groups'])
+        groups = {**plan['groups'], **{group.name: group for group in plan['new_groups']}}
+
+        Player.objects.bulk_create(plan['new_players'])
+        for player, grade in plan['grade_changes']:
+            player.grade = grade
+        Player.objects.bulk_update([player for player, _ in plan['grade_changes']], ['grade'])
+
+        Membership = Player.school_groups.through
+        Membership.objects.bulk_create(
+            [Membership(player_id=plan['players'][key].pk, schoolgroup_id=groups[group_name].pk) for key, group_name in plan['memberships']],
+            ignore_conflicts=True
+        )
+
+        ScheduledClass.objects.bulk_create([
+            ScheduledClass(school_group=groups[group_name], day_of_week=day, start_time=start, default_duration_minutes=DEFAULT_DURATION_MINUTES)
+            for group_name, day, start in plan['schedules_to_create']
+        ])
+        for rule in plan['schedules_to_update']:
+            rule.default_duration_minutes = DEFAULT_DURATION_MINUTES
+        ScheduledClass.objects.bulk_update(plan['schedules_to_update'], ['default_duration_minutes'])
+    return plan['stats']
@@ -0,0 +1,92 @@
+import csv
+import datetime
+import io
+import os
+import tempfile
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.urls import reverse
+from accounts.models import Coach
+from core.csv_export import EXPORTS, export_rows
+from finance.models import CoachSessionCompletion
+from players.models import AttendanceDiscrepancy, MatchResult, Player, SchoolGroup
+from scheduling.models import AttendanceTracking, CoachAvailability, Session, Venue
+
+User = get_user_model()
+DAY = datetime.date(2026, 3, 2)
+
+
+class CsvExportTest(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='password')
+        self.coach_user = User.objects.create_user(username='coach', first_name='Sam', last_name='Smith', password='password', is_staff=True)
+        self.coach = Coach.objects.create(user=self.coach_user, name='Sam Smith')
+        self.group = SchoolGroup.objects.create(name="U13")
+        self.venue = Venue.objects.create(name="Courts")
+        self.player = Player.objects.create(first_name="Ava", last_name="Jones")
+        self.opponent = Player.objects.create(first_name="Ben", last_name="Brown")
+        self.sessions = [
+            Session.objects.create(
+                session_date=DAY + datetime.timedelta(days=7 * week), session_start_time=datetime.time(15, 0),
+                school_group=self.group, venue=self.venue if week else None, planned_duration_minutes=60
+            )
+            for week in range(3)
+        ]
+        for session in self.sessions:
+            CoachAvailability.objects.create(coach=self.coach_user, session=session, status=CoachAvailability.Status.AVAILABLE, last_action='CONFIRM')
+            AttendanceTracking.objects.create(session=session, player=self.player, parent_response=AttendanceTracking.ParentResponse.ATTENDING, attended=AttendanceTracking.CoachAttended.NO)
+            AttendanceDiscrepancy.objects.create(player=self.player, session=session, discrepancy_type=AttendanceDiscrepancy.DiscrepancyType.NO_SHOW, parent_response='ATTENDING', coach_marked_attendance='NO')
+            CoachSessionCompletion.objects.create(coach=self.coach, session=session, confirmed_for_payment=True)
+        MatchResult.objects.create(player=self.player, opponent=self.opponent, date=DAY, player_score_str='3-1')
+        MatchResult.objects.create(player=self.player, opponent_name="Visitor", date=DAY + datetime.timedelta(days=7), player_score_str='3-0')
+
+    def test_rows_use_labels_and_date_range(self):
+        header, first, *rest = export_rows('availabilities')
+        self.assertEqual(header[:2], ['Coach Username', 'Coach Full Name'])
+        self.assertEqual(first, [
+            'coach', 'Sam Smith', DAY, datetime.time(15, 0), 'U13', 'No Venue', 'Available', 'Confirmed', '', None
+        ])
+        self.assertEqual(len(rest), 2)
+
+        in_range = list(export_rows('attendance', DAY + datetime.timedelta(days=1), DAY + datetime.timedelta(days=14)))[1:]
+        self.assertEqual([row[0] for row in in_range], [self.sessions[1].session_date, self.sessions[2].session_date])
+        self.assertEqual(in_range[0][4:7], ['Ava Jones', 'Attending', 'No'])
+
+        matches = list(export_rows('matches'))[1:]
+        self.assertEqual([row[2] for row in matches], ['Ben Brown', 'Visitor'])
+
+    def test_every_export_runs_in_one_query(self):
+        for name in EXPORTS:
+            with self.subTest(name=name), self.assertNumQueries(1):
+                rows = list(export_rows(name, chunk_size=2))
+            self.assertGreater(len(rows), 1)
+
+    def test_admin_download_streams_csv(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse('admin:data_exports')).status_code, 200)
+
+        response = self.client.get(reverse('admin:download_export', args=['completions']), {'start_date': DAY.isoformat(), 'end_date': DAY.isoformat()})
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertIn('completions_from_20260302_to_20260302.csv', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[1], [str(DAY), '15:00:00', 'U13', 'Sam Smith', 'No', 'Yes', rows[1][-1]])
+        self.assertEqual(len(rows), 2)
+
+        self.assertEqual(self.client.get(reverse('admin:download_export', args=['nope'])).status_code, 404)
+        bad_range = {'start_date': '2026-03-10', 'end_date': '2026-03-01'}
+        self.assertEqual(self.client.get(reverse('admin:download_export', args=['matches']), bad_range).status_code, 400)
+
+    def test_download_requires_superuser(self):
+        self.client.force_login(self.coach_user)
+        self.assertEqual(self.client.get(reverse('admin:download_export', args=['availabilities'])).status_code, 403)
+
+    def test_command_writes_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'out.csv')
+            call_command('export_availabilities', '--dataset', 'discrepancies', '--start', '2026-03-09', '--output', path, stdout=io.StringIO())
+            with open(path, newline='', encoding='utf-8') as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(rows[0][0], 'Session Date')
+        self.assertEqual([row[5] for row in rows[1:]], ['No-Show', 'No-Show'])
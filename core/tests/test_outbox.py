@@ -0,0 +1,103 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from core.models import OutboundEmail
+from core.outbox import TokenBucket, deliver_outbox, enqueue
+
+User = get_user_model()
+
+
+class CountingBackend(EmailBackend):
+    """locmem backend that counts connection opens and rejects addresses in `failing`."""
+
+    def __init__(self, failing=(), **kwargs):
+        super().__init__(**kwargs)
+        self.failing = set(failing)
+        self.opens = 0
+
+    def open(self):
+        self.opens += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if self.failing.intersection(message.to):
+                raise ConnectionError("relay refused")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_OUTBOX_RETRY_SECONDS=60, EMAIL_OUTBOX_MAX_ATTEMPTS=3)
+class OutboxDeliveryTest(TestCase):
+    def test_batches_share_one_connection(self):
+        for i in range(5):
+            enqueue(f"Hello {i}", "Body", [f"coach{i}@example.com"], html_message="<p>Body</p>", category='test')
+        backend = CountingBackend()
+
+        stats = deliver_outbox(batch_size=2, rate_per_second=0, connection=backend)
+        self.assertEqual((stats['sent'], stats['batches']), (5, 3))
+        self.assertEqual(backend.opens, 1)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(mail.outbox[0].alternatives[0][0], "<p>Body</p>")
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.Status.SENT).exists())
+
+        # Nothing left to send
+        self.assertEqual(deliver_outbox(connection=backend)['sent'], 0)
+
+    def test_failures_back_off_then_give_up(self):
+        bad = enqueue("Bounce", "Body", ["bad@example.com"])
+        enqueue("Fine", "Body", ["good@example.com"])
+        backend = CountingBackend(failing={"bad@example.com"})
+
+        stats = deliver_outbox(rate_per_second=0, connection=backend)
+        self.assertEqual((stats['sent'], stats['retried']), (1, 1))
+        bad.refresh_from_db()
+        self.assertEqual((bad.status, bad.attempts), (OutboundEmail.Status.PENDING, 1))
+        self.assertIn("relay refused", bad.last_error)
+        self.assertAlmostEqual((bad.next_attempt_at - timezone.now()).total_seconds(), 60, delta=5)
+        # The connection is reopened after an error
+        self.assertEqual(backend.opens, 2)
+
+        # Not due yet
+        self.assertEqual(deliver_outbox(rate_per_second=0, connection=backend)['batches'], 0)
+
+        for attempt in (2, 3):
+            OutboundEmail.objects.filter(pk=bad.pk).update(next_attempt_at=timezone.now())
+            deliver_outbox(rate_per_second=0, connection=backend)
+            bad.refresh_from_db()
+            self.assertEqual(bad.attempts, attempt)
+        self.assertEqual(bad.status, OutboundEmail.Status.FAILED)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_claimed_emails_are_not_sent_twice(self):
+        email = enqueue("Claimed", "Body", ["coach@example.com"])
+        OutboundEmail.objects.filter(pk=email.pk).update(claim_token='other-worker', next_attempt_at=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(deliver_outbox(rate_per_second=0, connection=CountingBackend())['sent'], 0)
+
+    def test_rate_limit_spaces_sends(self):
+        clock = [0.0]
+        slept = []
+
+        def sleep(seconds):
+            slept.append(seconds)
+            clock[0] += seconds
+
+        bucket = TokenBucket(4, clock=lambda: clock[0], sleep=sleep)
+        for _ in range(5):
+            bucket.wait()
+        self.assertEqual(slept, [0.25] * 4)
+
+    def test_views_queue_instead_of_sending(self):
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='password')
+        self.client.force_login(admin)
+        response = self.client.post(reverse('accounts:coach_list'), {'email': 'new.coach@example.com'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboundEmail.objects.get()
+        self.assertEqual((queued.to, queued.category), (['new.coach@example.com'], 'coach_invitation'))
+
+        deliver_outbox(rate_per_second=0)
+        self.assertEqual(mail.outbox[0].subject, 'You are invited to join SquashSync')
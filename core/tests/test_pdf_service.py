@@ -0,0 +1,37 @@
+from unittest import mock
+from django.conf import settings
+from django.test import SimpleTestCase
+from core import pdf_service
+
+
+class PdfServiceCacheTest(SimpleTestCase):
+    def setUp(self):
+        pdf_service.clear_pdf_caches()
+        self.addCleanup(pdf_service.clear_pdf_caches)
+
+    def test_static_urls_are_served_from_disk(self):
+        logo_url = settings.APP_SITE_URL.rstrip('/') + '/static/images/company_logo.png'
+        with mock.patch.object(pdf_service, 'default_url_fetcher') as network_fetcher:
+            result = pdf_service.local_url_fetcher(logo_url)
+        network_fetcher.assert_not_called()
+        self.assertEqual(result['mime_type'], 'image/png')
+        self.assertEqual(result['string'], (settings.BASE_DIR / 'static' / 'images' / 'company_logo.png').read_bytes())
+
+    def test_other_urls_use_default_fetcher(self):
+        with mock.patch.object(pdf_service, 'default_url_fetcher', return_value={'string': b''}) as network_fetcher:
+            pdf_service.local_url_fetcher('https://example.com/static/images/company_logo.png')
+            pdf_service.local_url_fetcher(settings.APP_SITE_URL.rstrip('/') + '/media/payslips/x.pdf')
+        self.assertEqual(network_fetcher.call_count, 2)
+
+    def test_fonts_and_stylesheets_are_built_once(self):
+        with mock.patch.object(pdf_service, 'CSS') as css, mock.patch.object(pdf_service, 'FontConfiguration') as fonts:
+            first = pdf_service.get_stylesheet('css/payslip_pdf.css')
+            second = pdf_service.get_stylesheet('css/payslip_pdf.css')
+            pdf_service.get_font_config()
+        self.assertIs(first, second)
+        self.assertEqual(css.call_count, 1)
+        self.assertEqual(fonts.call_count, 1)
+
+    def test_missing_stylesheet(self):
+        with self.assertRaises(FileNotFoundError):
+            pdf_service.get_stylesheet('css/does_not_exist.css')
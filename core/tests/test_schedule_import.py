@@ -0,0 +1,75 @@
+import datetime
+import io
+import os
+import tempfile
+from django.core.management import call_command
+from django.test import TestCase
+from core.schedule_import import parse_schedule_files, plan_schedule_import
+from players.models import Player, SchoolGroup
+from scheduling.models import ScheduledClass
+
+HEADER = 'school_group_name;session_start_time;player_first_name;player_grade\n'
+
+
+class ScheduleImportTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.write('Mondays.csv', [
+            'U13;15:00;Ava Jones;Grade 5',
+            'U13;15:00;ben brown;Grade 6',
+            'U15;16:30;Ava Jones;Grade 5',
+            'U15;;Missing Time;Grade 5',
+        ])
+        self.write('Wednesdays.csv', [
+            'U13;15:00;Ava Jones;Grade 5',
+            'U13;25:00;Cara Lee;Grade 4',
+        ])
+        self.ben = Player.objects.create(first_name='Ben', last_name='Brown', grade=5)
+
+    def write(self, name, lines):
+        with open(os.path.join(self.directory.name, name), 'w', encoding='utf-8') as f:
+            f.write(HEADER + '\n'.join(lines) + '\n')
+
+    def run_import(self, *args):
+        out = io.StringIO()
+        call_command('import_schedule', '--dir', self.directory.name, *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_reports_diff_without_writing(self):
+        output = self.run_import('--dry-run')
+        self.assertIn('Create group: U13', output)
+        self.assertIn('Update grade: Ben Brown 5 -> 6', output)
+        self.assertIn('Create schedule: U15 on Monday at 16:30', output)
+        self.assertIn("invalid time '25:00'", output)
+        self.assertFalse(SchoolGroup.objects.exists())
+        self.assertEqual(Player.objects.count(), 1)
+        self.assertFalse(ScheduledClass.objects.exists())
+
+    def test_apply_creates_everything_and_rerun_is_a_noop(self):
+        output = self.run_import()
+        self.assertIn('Rows Skipped: 1', output)
+
+        self.assertEqual(Player.objects.count(), 3)
+        self.ben.refresh_from_db()
+        self.assertEqual(self.ben.grade, 6)
+        ava = Player.objects.get(first_name='Ava')
+        self.assertEqual(sorted(ava.school_groups.values_list('name', flat=True)), ['U13', 'U15'])
+        self.assertEqual(
+            sorted(ScheduledClass.objects.values_list('school_group__name', 'day_of_week', 'start_time')),
+            [('U13', 0, datetime.time(15, 0)), ('U13', 2, datetime.time(15, 0)), ('U15', 0, datetime.time(16, 30))]
+        )
+
+        stats = plan_schedule_import(parse_schedule_files(self.directory.name))['stats']
+        self.assertEqual(stats['schedules_unchanged'], 3)
+        self.assertEqual(
+            [stats[key] for key in ('groups_created', 'players_created', 'players_updated', 'players_added_to_groups', 'schedules_created', 'schedules_updated')],
+            [0, 0, 0, 0, 0, 0]
+        )
+
+    def test_query_count_does_not_grow_with_rows(self):
+        SchoolGroup.objects.create(name='U13')
+        self.write('Fridays.csv', [f'U{n};17:00;Player{n} Test;Grade 3' for n in range(50)])
+        staging = parse_schedule_files(self.directory.name)
+        with self.assertNumQueries(4):
+            plan_schedule_import(staging)
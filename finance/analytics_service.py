@@ -1,11 +1,62 @@
 from decimal import Decimal, ROUND_HALF_UP
 from django.utils import timezone
-from django.db.models import Sum, Avg, F
+from django.db.models import Sum, Avg, F, Window
+from django.db.models.functions import RowNumber
+from collections import defaultdict
 import datetime
 from accounts.models import Coach
 from finance.models import CoachSessionCompletion, RecurringCoachAdjustment
 from scheduling.models import Session, SessionCoach, ScheduledClass
 
+HISTORY_SESSIONS_PER_RULE = 5
+
+
+def _coaching_cost(minutes, hourly_rate):
+    """Cost of one coach for `minutes` at `hourly_rate`."""
+    duration_hours = Decimal(minutes) / Decimal('60.0')
+    return duration_hours * hourly_rate
+
+
+def _session_cost(session_coaches):
+    """Total cost of a session's assigned coaches, skipping coaches without a rate."""
+    session_cost = Decimal('0.00')
+    for sc in session_coaches:
+        if sc.coach.hourly_rate:
+            session_cost += _coaching_cost(sc.coaching_duration_minutes, sc.coach.hourly_rate)
+    return session_cost
+
+
+def _historical_rule_average_costs(rule_ids, today):
+    """
+    Returns {rule_id: average cost} over each rule's last five finished sessions before today.
+    Uses a single window query for all rules; sessions that cost nothing are ignored,
+    and rules without any costed history are omitted.
+    """
+    if not rule_ids:
+        return {}
+
+    history = Session.objects.annotate(
+        recency=Window(
+            expression=RowNumber(),
+            partition_by=[F('generated_from_rule_id')],
+            order_by=[F('session_date').desc(), F('id').desc()]
+        )
+    ).filter(
+        generated_from_rule_id__in=rule_ids,
+        status='finished',
+        session_date__lt=today,
+        recency__lte=HISTORY_SESSIONS_PER_RULE
+    ).order_by('generated_from_rule_id', 'recency').prefetch_related('sessioncoach_set__coach')
+
+    costs_by_rule = defaultdict(list)
+    for hist_sess in history:
+        sess_cost = _session_cost(hist_sess.sessioncoach_set.all())
+        if sess_cost > 0:
+            costs_by_rule[hist_sess.generated_from_rule_id].append(sess_cost)
+
+    return {rule_id: sum(costs) / len(costs) for rule_id, costs in costs_by_rule.items()}
+
+
 def calculate_monthly_projection(year, month, scheduled_class_id=None):
     """
     Calculates financial projections for a given month/year.
@@ -45,19 +96,26 @@ def calculate_monthly_projection(year, month, scheduled_class_id=None):
         session__session_date__year=year,
         session__session_date__month=month,
         confirmed_for_payment=True
-    ).select_related('coach', 'session').prefetch_related('session__sessioncoach_set')
+    ).select_related('coach')
 
     if scheduled_class_id:
         completions = completions.filter(session__generated_from_rule_id=scheduled_class_id)
 
+    completions = list(completions)
+
+    # Coaching durations for every completed (session, coach) pair in one query
+    durations = dict(
+        ((session_id, coach_id), minutes) for session_id, coach_id, minutes in SessionCoach.objects.filter(
+            session_id__in={comp.session_id for comp in completions}
+        ).values_list('session_id', 'coach_id', 'coaching_duration_minutes')
+    ) if completions else {}
+
     for comp in completions:
         # Calculate cost for this completion
         # We need the duration from SessionCoach
-        session_coach = comp.session.sessioncoach_set.filter(coach=comp.coach).first()
-        if session_coach and comp.coach.hourly_rate:
-            duration_hours = Decimal(session_coach.coaching_duration_minutes) / Decimal('60.0')
-            cost = duration_hours * comp.coach.hourly_rate
-            realized_total += cost
+        minutes = durations.get((comp.session_id, comp.coach_id))
+        if minutes is not None and comp.coach.hourly_rate:
+            realized_total += _coaching_cost(minutes, comp.coach.hourly_rate)
             breakdown['realized_count'] += 1
 
     # --- ADJUSTMENTS ---
@@ -79,18 +137,29 @@ def calculate_monthly_projection(year, month, scheduled_class_id=None):
         session_date__year=year,
         session_date__month=month,
         is_cancelled=False
-    ).prefetch_related(
-        'sessioncoach_set__coach', 
-        'generated_from_rule',
-        # 'coach_completions' # Optimization: Let's rely on individual queries or more robust prefetching if needed
-    )
+    ).prefetch_related('sessioncoach_set__coach')
 
     if scheduled_class_id:
         sessions_in_month = sessions_in_month.filter(generated_from_rule_id=scheduled_class_id)
 
+    sessions_in_month = list(sessions_in_month)
+
     avg_coach_rate_qs = Coach.objects.filter(is_active=True, hourly_rate__isnull=False).aggregate(avg=Avg('hourly_rate'))
     avg_coach_rate = avg_coach_rate_qs['avg'] or Decimal('0.00')
 
+    # Confirmed (session, coach) pairs for the past sessions, loaded once
+    past_session_ids = [s.id for s in sessions_in_month if s.session_date < today]
+    confirmed_pairs = set(
+        CoachSessionCompletion.objects.filter(
+            session_id__in=past_session_ids,
+            confirmed_for_payment=True
+        ).values_list('session_id', 'coach_id')
+    ) if past_session_ids else set()
+
+    # Historical average cost per rule, computed once per rule
+    future_rule_ids = {s.generated_from_rule_id for s in sessions_in_month if s.session_date >= today and s.generated_from_rule_id}
+    rule_average_costs = _historical_rule_average_costs(future_rule_ids, today)
+
     for session in sessions_in_month:
         is_past = session.session_date < today
         is_future = session.session_date >= today
@@ -100,70 +169,32 @@ def calculate_monthly_projection(year, month, scheduled_class_id=None):
         
         if is_past:
             # Check for EACH coach if they have a confirmed completion
-            if not session_coaches:
-                pass 
-            else:
-                for sc in session_coaches:
-                    # Check if confirmed completion exists
-                    has_confirmed = CoachSessionCompletion.objects.filter(
-                        session=session, 
-                        coach=sc.coach, 
-                        confirmed_for_payment=True
-                    ).exists()
-                    
-                    if not has_confirmed:
-                        # It is Accrued
-                        if sc.coach.hourly_rate:
-                            duration_hours = Decimal(sc.coaching_duration_minutes) / Decimal('60.0')
-                            cost = duration_hours * sc.coach.hourly_rate
-                            accrued_total += cost
-                            breakdown['accrued_count'] += 1
+            for sc in session_coaches:
+                if (session.id, sc.coach_id) not in confirmed_pairs:
+                    # It is Accrued
+                    if sc.coach.hourly_rate:
+                        accrued_total += _coaching_cost(sc.coaching_duration_minutes, sc.coach.hourly_rate)
+                        breakdown['accrued_count'] += 1
                         
         elif is_future:
             # --- 3. PROJECTED ---
             # Future sessions (date >= today)
             
             # Logic: If rule -> Historical Average.
-            if session.generated_from_rule:
-                # Calculate rule's historical average cost
-                rule = session.generated_from_rule
-                
-                last_5_sessions = Session.objects.filter(
-                    generated_from_rule=rule,
-                    status='finished',
-                    session_date__lt=today
-                ).exclude(id=session.id).order_by('-session_date')[:5]
-                
-                costs = []
-                for hist_sess in last_5_sessions:
-                    # Calculate total cost for this historic session
-                    sess_cost = Decimal('0.00')
-                    for h_sc in hist_sess.sessioncoach_set.all():
-                         if h_sc.coach.hourly_rate:
-                            h_dur = Decimal(h_sc.coaching_duration_minutes) / Decimal('60.0')
-                            sess_cost += h_dur * h_sc.coach.hourly_rate
-                    if sess_cost > 0:
-                        costs.append(sess_cost)
-                
-                if costs:
-                    avg_cost = sum(costs) / len(costs)
+            if session.generated_from_rule_id:
+                avg_cost = rule_average_costs.get(session.generated_from_rule_id)
+                if avg_cost is not None:
                     projected_total += avg_cost
-                    breakdown['projected_rules_count'] += 1
                 else:
                     # Fallback: planned_duration * Average Coach Rate
                     duration_hours = Decimal(session.planned_duration_minutes) / Decimal('60.0')
-                    est_cost = duration_hours * avg_coach_rate
-                    projected_total += est_cost
-                    breakdown['projected_rules_count'] += 1 # Still counted as rule-based, just fallback used
+                    projected_total += duration_hours * avg_coach_rate
+                # Still counted as rule-based when the fallback is used
+                breakdown['projected_rules_count'] += 1
             else:
                 # Manual session (future)
-                projected_total += Decimal('0.00')
-                session_cost = Decimal('0.00')
                 if session_coaches:
-                    for sc in session_coaches:
-                        if sc.coach.hourly_rate:
-                            dur = Decimal(sc.coaching_duration_minutes) / Decimal('60.0')
-                            session_cost += dur * sc.coach.hourly_rate
+                    session_cost = _session_cost(session_coaches)
                 else:
                     duration_hours = Decimal(session.planned_duration_minutes) / Decimal('60.0')
                     session_cost = duration_hours * avg_coach_rate
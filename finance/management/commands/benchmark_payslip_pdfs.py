@@ -0,0 +1,75 @@
+import datetime
+import time
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.utils import timezone
+from core.pdf_service import clear_pdf_caches, render_pdf
+from finance.payslip_services import PAYSLIP_STYLESHEET
+
+class Command(BaseCommand):
+    help = 'Renders N sample payslips with and without the cached PDF pipeline and reports ms per document.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20, help='Number of payslips to render per mode.')
+        parser.add_argument('--sessions', type=int, default=16, help='Session lines on each sample payslip.')
+
+    def _sample_payslip(self, index, session_count):
+        today = timezone.now().date()
+        sessions = [
+            {
+                'date': today - datetime.timedelta(days=day),
+                'start_time': '15:00',
+                'school_group_name': f"Group {day % 5}",
+                'duration_hours_str': "1h 30m",
+                'base_pay_for_session': Decimal('225.00'),
+                'bonus_for_session': Decimal('0.00'),
+                'total_pay_for_session_line': Decimal('225.00'),
+            }
+            for day in range(session_count)
+        ]
+        total = Decimal('225.00') * session_count
+        return {
+            'coach_name': f"Benchmark Coach {index}",
+            'coach_identifier_for_filename': f"benchmark_{index}",
+            'hourly_rate': Decimal('150.00'),
+            'period_month_year_display': today.strftime('%B %Y'),
+            'sessions': sessions,
+            'total_hours_str': f"{session_count * 90 // 60}h {session_count * 90 % 60}m",
+            'total_hours_decimal': Decimal(session_count * 90) / Decimal('60'),
+            'total_base_pay': total,
+            'total_bonus_amount': Decimal('0.00'),
+            'bonus_calculation_str': "",
+            'bonus_details_list': [],
+            'total_adjustments_amount': Decimal('0.00'),
+            'adjustment_details_list': [],
+            'total_pay': total,
+            'generation_date': today,
+        }
+
+    def _run(self, documents, use_cache):
+        started = time.perf_counter()
+        for html_string in documents:
+            render_pdf(html_string, stylesheets=[PAYSLIP_STYLESHEET], use_cache=use_cache)
+        return (time.perf_counter() - started) * 1000 / len(documents)
+
+    def handle(self, *args, **options):
+        count = options['count']
+        if count < 1:
+            raise CommandError('--count must be at least 1.')
+
+        documents = [
+            render_to_string('finance/payslip_template.html', {'payslip': self._sample_payslip(i, options['sessions'])})
+            for i in range(count)
+        ]
+        self.stdout.write(f"Rendering {count} payslips ({options['sessions']} sessions each) per mode...")
+
+        uncached_ms = self._run(documents, use_cache=False)
+        self.stdout.write(f"  Uncached (fresh fonts, CSS and assets per document): {uncached_ms:.1f} ms/document")
+
+        clear_pdf_caches()
+        cached_ms = self._run(documents, use_cache=True)
+        self.stdout.write(f"  Cached (shared fonts, CSS and assets):               {cached_ms:.1f} ms/document")
+
+        speedup = uncached_ms / cached_ms if cached_ms else 0
+        self.stdout.write(self.style.SUCCESS(f"Speed-up: {speedup:.2f}x"))
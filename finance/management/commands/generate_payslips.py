@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from finance.payslip_services import create_all_payslips_for_period
+
+class Command(BaseCommand):
+    help = 'Generates payslips for all eligible coaches for a month (defaults to the previous month).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help='Payslip year.')
+        parser.add_argument('--month', type=int, help='Payslip month (1-12).')
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate payslips that already exist for the period.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of processes used to render PDFs (defaults to settings.PAYSLIP_RENDER_WORKERS).',
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        default_year, default_month = (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+        year = options['year'] or default_year
+        month = options['month'] or default_month
+        if not 1 <= month <= 12:
+            raise CommandError(f'Invalid month "{month}".')
+        if options['workers'] is not None and options['workers'] < 1:
+            raise CommandError('--workers must be at least 1.')
+
+        styles = {'success': self.style.SUCCESS, 'error': self.style.ERROR, 'skipped': self.style.WARNING}
+
+        def report(coach, status, message):
+            self.stdout.write(styles[status](f"[{status.upper()}] {coach}: {message}"))
+
+        self.stdout.write(f"--- Generating payslips for {month:02}/{year} ---")
+        result = create_all_payslips_for_period(
+            year, month,
+            generating_user_id=None,
+            force_regeneration=options['force'],
+            max_workers=options['workers'],
+            progress_callback=report
+        )
+        self.stdout.write(self.style.SUCCESS(result['summary_message']))
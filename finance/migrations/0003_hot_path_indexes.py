@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-17 01:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_coach_account_holder_name'),
+        ('finance', '0002_recurringcoachadjustment'),
+        ('scheduling', '0008_attendancemonthlysummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='coachsessioncompletion',
+            index=models.Index(fields=['session', 'confirmed_for_payment'], name='finance_coa_session_c355a9_idx'),
+        ),
+    ]
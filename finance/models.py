@@ -18,6 +18,9 @@ class CoachSessionCompletion(models.Model):
     class Meta:
         unique_together = ('coach', 'session')
         ordering = ['session__session_date', 'session__session_start_time', 'coach__name']
+        indexes = [
+            models.Index(fields=['session', 'confirmed_for_payment']),
+        ]
         verbose_name = "Coach Session Completion"
         verbose_name_plural = "Coach Session Completions"
 
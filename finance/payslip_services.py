@@ -3,34 +3,28 @@
 from decimal import Decimal, ROUND_HALF_UP
 from django.utils import timezone
 from django.template.loader import render_to_string
-from weasyprint import HTML, CSS
 from django.core.files.base import ContentFile
 from django.contrib.auth import get_user_model
 from django.conf import settings
 import datetime
-from django.templatetags.static import static
-from pathlib import Path #
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from django.db import connections, transaction
 # Refactored imports for the new project structure
 from .models import Payslip, CoachSessionCompletion, RecurringCoachAdjustment # Import new model
 from accounts.models import Coach
 from scheduling.models import Session, SessionCoach
+from core.pdf_service import render_pdf
 
 User = get_user_model() # Define User using get_user_model
 
-def get_payslip_data_for_coach(coach_id: int, year: int, month: int) -> dict | None:
+def _build_payslip_data(coach, completions, coaching_minutes: dict, adjustments, year: int, month: int) -> dict | None:
     """
-    Gathers all necessary data for a single coach's payslip for a specific period,
-    including any session bonuses and recurring adjustments.
+    Builds the payslip dictionary for one coach from already-loaded rows.
+    `completions` are the confirmed completions in session order, `coaching_minutes` maps
+    session_id -> this coach's coaching duration and `adjustments` are the active recurring adjustments.
     """
-    try:
-        coach = Coach.objects.get(id=coach_id)
-        if not coach.hourly_rate:
-            print(f"Coach {coach.id} ('{coach}') has no hourly rate set. Skipping payslip data generation.")
-            return None
-    except Coach.DoesNotExist:
-        print(f"Coach with ID {coach_id} not found. Skipping payslip data generation.")
-        return None
-
     if coach.user:
         coach_display_name = coach.user.get_full_name() or coach.user.username
         coach_identifier_for_filename = coach.user.username
@@ -38,18 +32,6 @@ def get_payslip_data_for_coach(coach_id: int, year: int, month: int) -> dict | N
         coach_display_name = coach.name
         coach_identifier_for_filename = ''.join(e for e in coach.name if e.isalnum() or e == '_').lower()
 
-    completions = CoachSessionCompletion.objects.filter(
-        coach=coach,
-        session__session_date__year=year,
-        session__session_date__month=month,
-        confirmed_for_payment=True
-    ).select_related(
-        'session',
-        'session__school_group'
-    ).prefetch_related(
-        'session__sessioncoach_set' # Prefetch to get duration
-    ).order_by('session__session_date', 'session__session_start_time')
-
     session_details = []
     total_duration_minutes = Decimal('0')
     coach_hourly_rate = Decimal(str(coach.hourly_rate))
@@ -64,82 +46,75 @@ def get_payslip_data_for_coach(coach_id: int, year: int, month: int) -> dict | N
     decimal_bonus_amount_value = Decimal(str(bonus_amount_value))
 
     # --- Only calculate session pay if there are completions ---
-    if completions:
-        for completion in completions:
-            session_obj = completion.session
-            session_coach_entry = next((sc for sc in session_obj.sessioncoach_set.all() if sc.coach_id == coach.id), None)
+    for completion in completions:
+        session_obj = completion.session
+        coaching_duration = coaching_minutes.get(session_obj.id)
 
-            duration_minutes = Decimal(session_coach_entry.coaching_duration_minutes) if session_coach_entry else Decimal('0')
+        duration_minutes = Decimal(coaching_duration) if coaching_duration is not None else Decimal('0')
 
-            if duration_minutes == 0:
-                continue
+        if duration_minutes == 0:
+            continue
 
-            pay_for_session_base = (duration_minutes / Decimal('60.0')) * coach_hourly_rate
-            total_base_pay_for_sessions += pay_for_session_base
+        pay_for_session_base = (duration_minutes / Decimal('60.0')) * coach_hourly_rate
+        total_base_pay_for_sessions += pay_for_session_base
 
-            current_session_bonus = Decimal('0.00')
+        current_session_bonus = Decimal('0.00')
 
-            session_start_time_obj = session_obj.session_start_time
-            if isinstance(session_start_time_obj, str):
-                try:
-                    session_start_time_obj = datetime.datetime.strptime(session_start_time_obj, '%H:%M:%S').time()
-                except ValueError:
-                    session_start_time_obj = None
-
-            if session_start_time_obj and session_start_time_obj == bonus_qualifying_time:
-                current_session_bonus = decimal_bonus_amount_value
-                total_bonus_amount_for_sessions += current_session_bonus
-                bonus_session_count += 1  # Increment bonus session counter
-                bonus_session_details_list.append({
-                    'date': session_obj.session_date,
-                    'reason': "Bonus for specific session",
-                    'amount': current_session_bonus.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
-                    'session_group_name': session_obj.school_group.name if session_obj.school_group else "N/A",
-                    'session_time_str': session_obj.session_start_time.strftime('%H:%M'),
-                })
-
-            total_pay_for_this_session_line_item = pay_for_session_base + current_session_bonus
-            hours = int(duration_minutes // 60)
-            minutes = int(duration_minutes % 60)
-
-            session_details.append({
+        session_start_time_obj = session_obj.session_start_time
+        if isinstance(session_start_time_obj, str):
+            try:
+                session_start_time_obj = datetime.datetime.strptime(session_start_time_obj, '%H:%M:%S').time()
+            except ValueError:
+                session_start_time_obj = None
+
+        if session_start_time_obj and session_start_time_obj == bonus_qualifying_time:
+            current_session_bonus = decimal_bonus_amount_value
+            total_bonus_amount_for_sessions += current_session_bonus
+            bonus_session_count += 1  # Increment bonus session counter
+            bonus_session_details_list.append({
                 'date': session_obj.session_date,
-                'start_time': session_obj.session_start_time.strftime('%H:%M'),
-                'school_group_name': session_obj.school_group.name if session_obj.school_group else "N/A",
-                'duration_hours_str': f"{hours}h {minutes}m",
-                'base_pay_for_session': pay_for_session_base.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
-                'bonus_for_session': current_session_bonus.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
-                'total_pay_for_session_line': total_pay_for_this_session_line_item.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+                'reason': "Bonus for specific session",
+                'amount': current_session_bonus.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+                'session_group_name': session_obj.school_group.name if session_obj.school_group else "N/A",
+                'session_time_str': session_obj.session_start_time.strftime('%H:%M'),
             })
-            total_duration_minutes += duration_minutes
 
-    # --- NEW: Fetch and calculate recurring adjustments ---
-    active_adjustments = RecurringCoachAdjustment.objects.filter(
-        coach=coach,
-        is_active=True
-    )
-    
+        total_pay_for_this_session_line_item = pay_for_session_base + current_session_bonus
+        hours = int(duration_minutes // 60)
+        minutes = int(duration_minutes % 60)
+
+        session_details.append({
+            'date': session_obj.session_date,
+            'start_time': session_obj.session_start_time.strftime('%H:%M'),
+            'school_group_name': session_obj.school_group.name if session_obj.school_group else "N/A",
+            'duration_hours_str': f"{hours}h {minutes}m",
+            'base_pay_for_session': pay_for_session_base.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+            'bonus_for_session': current_session_bonus.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+            'total_pay_for_session_line': total_pay_for_this_session_line_item.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+        })
+        total_duration_minutes += duration_minutes
+
+    # --- Recurring adjustments ---
     total_adjustments_amount = Decimal('0.00')
     adjustment_details_list = []
-    
-    for adj in active_adjustments:
+
+    for adj in adjustments:
         total_adjustments_amount += adj.amount
         adjustment_details_list.append({
             'description': adj.description,
             'amount': adj.amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
         })
-    # --- END NEW ---
 
     # --- Skip if no sessions AND no adjustments ---
-    if not completions and not active_adjustments.exists():
+    if not completions and not adjustments:
         return None
 
     total_hours_decimal = (total_duration_minutes / Decimal('60.0')).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-    
-    # --- MODIFIED: Include adjustments in grand total ---
+
+    # --- Include adjustments in grand total ---
     grand_total_pay = (
-        total_base_pay_for_sessions + 
-        total_bonus_amount_for_sessions + 
+        total_base_pay_for_sessions +
+        total_bonus_amount_for_sessions +
         total_adjustments_amount
     ).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
@@ -168,15 +143,77 @@ def get_payslip_data_for_coach(coach_id: int, year: int, month: int) -> dict | N
         'total_bonus_amount': total_bonus_amount_for_sessions.quantize(Decimal('0.01')),
         'bonus_calculation_str': bonus_calculation_str,
         'bonus_details_list': bonus_session_details_list,
-        'total_adjustments_amount': total_adjustments_amount.quantize(Decimal('0.01')), # NEW
-        'adjustment_details_list': adjustment_details_list, # NEW
+        'total_adjustments_amount': total_adjustments_amount.quantize(Decimal('0.01')),
+        'adjustment_details_list': adjustment_details_list,
         'total_pay': grand_total_pay,
         'generation_date': timezone.now().date(),
     }
 
-def generate_payslip_for_single_coach(coach_id: int, year: int, month: int, generating_user_id: int | None, force_regeneration: bool = False) -> dict:
+def get_payslip_data_for_coaches(coach_ids, year: int, month: int) -> dict:
+    """
+    Gathers payslip data for many coaches for a specific period in a fixed number of queries:
+    the coaches, their confirmed completions, their coaching durations and their active
+    recurring adjustments are each loaded once for the whole set.
+    Returns {coach_id: payslip_data or None}; coaches that don't exist are left out and
+    coaches without an hourly rate, sessions or adjustments map to None.
+    """
+    coaches = list(Coach.objects.filter(id__in=list(coach_ids)).select_related('user'))
+    rated_coach_ids = [coach.id for coach in coaches if coach.hourly_rate]
+
+    completions_by_coach = {}
+    for completion in CoachSessionCompletion.objects.filter(
+        coach_id__in=rated_coach_ids,
+        session__session_date__year=year,
+        session__session_date__month=month,
+        confirmed_for_payment=True
+    ).select_related(
+        'session',
+        'session__school_group'
+    ).order_by('session__session_date', 'session__session_start_time', 'id'):
+        completions_by_coach.setdefault(completion.coach_id, []).append(completion)
+
+    # Durations come from the coach's SessionCoach row (first one if there are duplicates)
+    session_ids = {c.session_id for completions in completions_by_coach.values() for c in completions}
+    minutes_by_coach = {}
+    for session_id, coach_id, minutes in SessionCoach.objects.filter(
+        session_id__in=session_ids, coach_id__in=rated_coach_ids
+    ).order_by('id').values_list('session_id', 'coach_id', 'coaching_duration_minutes'):
+        minutes_by_coach.setdefault(coach_id, {}).setdefault(session_id, minutes)
+
+    adjustments_by_coach = {}
+    for adjustment in RecurringCoachAdjustment.objects.filter(coach_id__in=rated_coach_ids, is_active=True):
+        adjustments_by_coach.setdefault(adjustment.coach_id, []).append(adjustment)
+
+    return {
+        coach.id: _build_payslip_data(
+            coach,
+            completions_by_coach.get(coach.id, []),
+            minutes_by_coach.get(coach.id, {}),
+            adjustments_by_coach.get(coach.id, []),
+            year, month
+        ) if coach.hourly_rate else None
+        for coach in coaches
+    }
+
+def get_payslip_data_for_coach(coach_id: int, year: int, month: int) -> dict | None:
+    """
+    Gathers all necessary data for a single coach's payslip for a specific period,
+    including any session bonuses and recurring adjustments.
+    """
+    return get_payslip_data_for_coaches([coach_id], year, month).get(coach_id)
+
+def generate_payslip_for_single_coach(
+    coach_id: int,
+    year: int,
+    month: int,
+    generating_user_id: int | None,
+    force_regeneration: bool = False,
+    payslip_data_by_coach: dict | None = None
+) -> dict:
     """
     Generates and saves a payslip for a single coach for a given period.
+    Callers processing several coaches can pass the result of get_payslip_data_for_coaches
+    as `payslip_data_by_coach` to avoid loading each coach's data separately.
     """
     # User = get_user_model() # Already defined above
     generating_user = None
@@ -209,7 +246,10 @@ def generate_payslip_for_single_coach(coach_id: int, year: int, month: int, gene
             detailed_messages.append(f"  Payslip already exists. Skipping generation (force_regeneration is False).")
             return {'status': 'skipped', 'message': f"Payslip already exists for {str(coach)} for {month:02}/{year}. Skipped.", 'details': detailed_messages}
 
-    payslip_data = get_payslip_data_for_coach(coach.id, year, month)
+    if payslip_data_by_coach is not None:
+        payslip_data = payslip_data_by_coach.get(coach.id)
+    else:
+        payslip_data = get_payslip_data_for_coach(coach.id, year, month)
 
     if not payslip_data:
         detailed_messages.append(f"  No payslip data (e.g., no confirmed sessions or adjustments, or no hourly rate). Skipping.")
@@ -249,64 +289,86 @@ def generate_payslip_for_single_coach(coach_id: int, year: int, month: int, gene
             'details': detailed_messages
         }
 
+PAYSLIP_STYLESHEET = 'css/payslip_pdf.css'
+
 def generate_payslip_pdf_from_data(payslip_data: dict | None) -> bytes | None:
     """
     Generates a PDF payslip from the provided payslip_data dictionary.
-    Uses absolute file path for logo in DEBUG, site URL otherwise.
+    Rendering goes through core.pdf_service, which reuses the parsed stylesheet and font
+    configuration across payslips and reads the logo from local static files.
     """
     if not payslip_data:
         return None
     try:
         html_string = render_to_string('finance/payslip_template.html', {'payslip': payslip_data})
-
-        # --- MODIFICATION: Handle image path differently for DEBUG ---
-        base_url_for_weasyprint = None # Default for local with absolute path
-        stylesheets = []
-
-        if settings.DEBUG:
-            # 1. Get the relative static path (e.g., '/static/images/company_logo.png')
-            relative_logo_path = static('images/company_logo.png')
-
-            # 2. Construct the absolute filesystem path
-            #    Remove leading slash from relative path if it exists
-            abs_logo_path = settings.BASE_DIR / relative_logo_path.lstrip('/')
-
-            # 3. Check if the file actually exists at that path
-            if abs_logo_path.is_file():
-                # 4. Create a file URI (e.g., 'file:///path/to/project/static/images/company_logo.png')
-                logo_uri = abs_logo_path.as_uri()
-
-                # 5. Replace the relative path in the HTML string with the absolute file URI
-                #    Important: Use the exact relative path generated by {% static %} as the string to replace
-                html_string = html_string.replace(relative_logo_path, logo_uri, 1) # Replace only the first instance
-                # print(f"DEBUG: Replaced logo path with URI: {logo_uri}") # Optional: for debugging
-            else:
-                print(f"WARNING: Logo file not found at expected local path: {abs_logo_path}")
-                # Optionally fall back or log error more formally
-
-            # For local CSS, you might still need:
-            # css_path = settings.BASE_DIR / 'static' / 'css' / 'style.css'
-            # if css_path.exists():
-            #     stylesheets = [CSS(filename=css_path)]
-
-        else:
-            # Production (PythonAnywhere): Use the site URL as base_url
-            base_url_for_weasyprint = settings.APP_SITE_URL
-        # --- END MODIFICATION ---
-
-        # Pass base_url (if defined) AND stylesheets (if any)
-        pdf_bytes = HTML(string=html_string, base_url=base_url_for_weasyprint).write_pdf(stylesheets=stylesheets)
-
-        return pdf_bytes
+        return render_pdf(html_string, stylesheets=[PAYSLIP_STYLESHEET])
     except Exception as e:
         print(f"Error generating PDF for coach '{payslip_data.get('coach_name', 'Unknown')}': {type(e).__name__} - {e}")
         import traceback
         traceback.print_exc()
         return None
 
-def create_all_payslips_for_period(year: int, month: int, generating_user_id: int | None, force_regeneration: bool = False) -> dict:
+def _init_payslip_render_worker():
+    """Process pool initializer: spawned workers need Django configured before rendering templates."""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+def _render_payslip_pdfs(payslip_data_by_coach: dict, max_workers: int):
+    """
+    Renders the PDFs for {coach_id: payslip_data}, yielding (coach_id, pdf_bytes or None) as each
+    one finishes. Uses a process pool when more than one worker is requested and falls back to
+    rendering in-process if the pool can't be started (e.g. on hosts that forbid subprocesses).
+    Inside a transaction it always renders in-process: starting the pool closes the database
+    connections, which would break the caller's atomic block.
+    """
+    pending = dict(payslip_data_by_coach)
+    in_transaction = any(conn.in_atomic_block for conn in connections.all(initialized_only=True))
+    if max_workers > 1 and len(pending) > 1 and not in_transaction:
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(max_workers, len(pending)),
+                initializer=_init_payslip_render_worker
+            ) as executor:
+                futures = {
+                    executor.submit(generate_payslip_pdf_from_data, payslip_data): coach_id
+                    for coach_id, payslip_data in pending.items()
+                }
+                for future in as_completed(futures):
+                    coach_id = futures[future]
+                    try:
+                        pdf_bytes = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        print(f"Error rendering payslip PDF for coach {coach_id}: {type(e).__name__} - {e}")
+                        pdf_bytes = None
+                    pending.pop(coach_id)
+                    yield coach_id, pdf_bytes
+        except (BrokenProcessPool, OSError) as e:
+            print(f"Payslip render pool unavailable ({type(e).__name__}: {e}). Rendering remaining payslips in-process.")
+
+    for coach_id, payslip_data in pending.items():
+        yield coach_id, generate_payslip_pdf_from_data(payslip_data)
+
+def create_all_payslips_for_period(
+    year: int,
+    month: int,
+    generating_user_id: int | None,
+    force_regeneration: bool = False,
+    max_workers: int | None = None,
+    progress_callback=None
+) -> dict:
     """
     Generates and saves payslips for all eligible coaches for a given period.
+
+    Runs as a pipeline: payslip data for every coach is gathered with shared bulk queries,
+    PDFs are rendered in a process pool of `max_workers` (default settings.PAYSLIP_RENDER_WORKERS)
+    and the Payslip records are written in a single transaction.
+    `progress_callback(coach, status, message)` is called once per coach as its outcome is known.
     """
     # User = get_user_model() # Already defined above
     generating_user = None
@@ -316,40 +378,114 @@ def create_all_payslips_for_period(year: int, month: int, generating_user_id: in
         except User.DoesNotExist:
             print(f"Warning: User with ID {generating_user_id} not found for marking 'generated_by'.")
 
-    eligible_coaches = Coach.objects.filter(is_active=True, hourly_rate__isnull=False).exclude(hourly_rate=0)
+    if max_workers is None:
+        max_workers = getattr(settings, 'PAYSLIP_RENDER_WORKERS', 1)
+
+    eligible_coaches = list(
+        Coach.objects.filter(is_active=True, hourly_rate__isnull=False).exclude(hourly_rate=0).select_related('user')
+    )
 
-    if not eligible_coaches.exists():
+    if not eligible_coaches:
         return {
             'generated_count': 0, 'skipped_count': 0, 'error_count': 0,
             'summary_message': "No active coaches with an hourly rate found. No payslips to generate.",
             'details': ["No active coaches with an hourly rate found."]
         }
 
-    generated_count = 0
-    skipped_count = 0
-    error_count = 0
-    detailed_messages = []
+    started = time.perf_counter()
+    coaches_by_id = {coach.id: coach for coach in eligible_coaches}
+    coach_messages = {
+        coach.id: [f"Processing payslip for coach: {str(coach)} (ID: {coach.id}) for {month:02}/{year}."]
+        for coach in eligible_coaches
+    }
+    statuses = {}
+
+    def finish(coach_id, status, message):
+        statuses[coach_id] = status
+        coach_messages[coach_id].append(f"  {message}")
+        if progress_callback:
+            progress_callback(coaches_by_id[coach_id], status, message)
+
+    # --- 1. Gather ---
+    existing_payslips = {
+        payslip.coach_id: payslip
+        for payslip in Payslip.objects.filter(coach_id__in=coaches_by_id, year=year, month=month)
+    }
+    payslips_to_replace = []
+    coaches_to_process = []
+    for coach in eligible_coaches:
+        existing_payslip = existing_payslips.get(coach.id)
+        if existing_payslip and not force_regeneration:
+            finish(coach.id, 'skipped', "Payslip already exists. Skipping generation (force_regeneration is False).")
+            continue
+        if existing_payslip:
+            coach_messages[coach.id].append("  Existing payslip found. Forcing regeneration...")
+            payslips_to_replace.append(existing_payslip.id)
+        coaches_to_process.append(coach)
+
+    payslip_data_by_coach = {}
+    gathered_data = get_payslip_data_for_coaches([coach.id for coach in coaches_to_process], year, month)
+    for coach_id, payslip_data in gathered_data.items():
+        if payslip_data:
+            payslip_data_by_coach[coach_id] = payslip_data
+        else:
+            finish(coach_id, 'skipped', "No payslip data (e.g., no confirmed sessions or adjustments, or no hourly rate). Skipping.")
+    gathered = time.perf_counter()
+
+    # --- 2. Render ---
+    rendered_pdfs = {}
+    for coach_id, pdf_bytes in _render_payslip_pdfs(payslip_data_by_coach, max_workers):
+        if pdf_bytes:
+            rendered_pdfs[coach_id] = pdf_bytes
+        else:
+            finish(coach_id, 'error', "Failed to generate PDF. Skipping.")
+    rendered = time.perf_counter()
 
-    detailed_messages.append(f"Starting payslip generation for {month:02}/{year}.")
+    # --- 3. Write ---
+    try:
+        with transaction.atomic():
+            if payslips_to_replace:
+                Payslip.objects.filter(id__in=payslips_to_replace).delete()
+            for coach in eligible_coaches:
+                if coach.id not in rendered_pdfs:
+                    continue
+                payslip_data = payslip_data_by_coach[coach.id]
+                coach_id_filename = payslip_data.get('coach_identifier_for_filename', f"coach_{coach.id}_unknown")
+                payslip_filename = f"payslip_{coach_id_filename}_{year}_{month:02d}.pdf"
+                try:
+                    with transaction.atomic():
+                        new_payslip = Payslip(
+                            coach=coach,
+                            year=year,
+                            month=month,
+                            total_amount=payslip_data.get('total_pay', Decimal('0.00')),
+                            generated_by=generating_user
+                        )
+                        new_payslip.file.save(payslip_filename, ContentFile(rendered_pdfs[coach.id]), save=False)
+                        new_payslip.save()
+                    finish(coach.id, 'success', f"Successfully generated and saved payslip: {payslip_filename}")
+                except Exception as e:
+                    finish(coach.id, 'error', f"Error saving payslip record: {e}")
+    except Exception as e:
+        # Deleting the payslips being replaced failed, so nothing was written
+        for coach_id in rendered_pdfs:
+            if coach_id not in statuses:
+                finish(coach_id, 'error', f"Error deleting existing payslip: {e}. Aborting.")
+    finished = time.perf_counter()
+
+    generated_count = sum(1 for status in statuses.values() if status == 'success')
+    error_count = sum(1 for status in statuses.values() if status == 'error')
+    skipped_count = sum(1 for status in statuses.values() if status == 'skipped')
+
+    detailed_messages = [f"Starting payslip generation for {month:02}/{year}."]
     if generating_user:
         detailed_messages.append(f"Payslips will be marked as generated by: {generating_user.username}")
-
     for coach in eligible_coaches:
-        result = generate_payslip_for_single_coach(
-            coach_id=coach.id,
-            year=year,
-            month=month,
-            generating_user_id=generating_user_id,
-            force_regeneration=force_regeneration
-        )
-        if result['status'] == 'success':
-            generated_count += 1
-        elif result['status'] == 'error':
-            error_count += 1
-        else: # 'skipped'
-            skipped_count += 1
-
-        detailed_messages.extend(result.get('details', []))
+        detailed_messages.extend(coach_messages[coach.id])
+    detailed_messages.append(
+        f"Timing: gather {(gathered - started) * 1000:.0f}ms, render {(rendered - gathered) * 1000:.0f}ms "
+        f"({max_workers} worker{'s' if max_workers != 1 else ''}), write {(finished - rendered) * 1000:.0f}ms."
+    )
 
     summary_message = (
         f"Payslip Generation for {month:02}/{year}: "
@@ -0,0 +1,122 @@
+import datetime
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
+from django.test import TestCase, TransactionTestCase, override_settings
+from accounts.models import Coach
+from finance.models import CoachSessionCompletion, Payslip, RecurringCoachAdjustment
+from finance import payslip_services
+from finance.payslip_services import create_all_payslips_for_period, get_payslip_data_for_coach, get_payslip_data_for_coaches
+from players.models import SchoolGroup
+from scheduling.models import Session, SessionCoach
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+@mock.patch('finance.payslip_services.generate_payslip_pdf_from_data', return_value=b'%PDF-test')
+class PayslipPipelineTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        group = SchoolGroup.objects.create(name="U11")
+        self.worked = Coach.objects.create(name="Worked", hourly_rate=Decimal('150.00'))
+        self.adjusted = Coach.objects.create(name="Adjusted", hourly_rate=Decimal('100.00'))
+        self.idle = Coach.objects.create(name="Idle", hourly_rate=Decimal('100.00'))
+        Coach.objects.create(name="No Rate")
+
+        for day, start in [(3, datetime.time(6, 0)), (10, datetime.time(15, 0))]:
+            session = Session.objects.create(school_group=group, session_date=datetime.date(2026, 3, day), session_start_time=start)
+            SessionCoach.objects.create(session=session, coach=self.worked, coaching_duration_minutes=45)
+            CoachSessionCompletion.objects.create(session=session, coach=self.worked, confirmed_for_payment=True)
+        RecurringCoachAdjustment.objects.create(coach=self.adjusted, description="Admin", amount=Decimal('250.00'))
+
+    def test_bulk_loader_returns_per_coach_data(self, render):
+        coach_ids = list(Coach.objects.values_list('id', flat=True)) + [999999]
+        with self.assertNumQueries(4):
+            data = get_payslip_data_for_coaches(coach_ids, 2026, 3)
+
+        self.assertNotIn(999999, data)
+        self.assertIsNone(data[self.idle.id])
+        worked = data[self.worked.id]
+        self.assertEqual([s['start_time'] for s in worked['sessions']], ['06:00', '15:00'])
+        self.assertEqual(worked['total_hours_str'], '1h 30m')
+        self.assertEqual(worked['total_bonus_amount'], Decimal('25.00'))
+        self.assertEqual(worked['total_pay'], Decimal('250.00'))
+        self.assertEqual(data[self.adjusted.id]['total_pay'], Decimal('250.00'))
+        self.assertEqual(get_payslip_data_for_coach(self.worked.id, 2026, 3), worked)
+
+    def test_query_count_does_not_grow_with_coaches(self, render):
+        group = SchoolGroup.objects.create(name="U15")
+        for index in range(5):
+            coach = Coach.objects.create(name=f"Extra {index}", hourly_rate=Decimal('90.00'))
+            session = Session.objects.create(school_group=group, session_date=datetime.date(2026, 3, 20), session_start_time=datetime.time(14, 0))
+            SessionCoach.objects.create(session=session, coach=coach, coaching_duration_minutes=60)
+            CoachSessionCompletion.objects.create(session=session, coach=coach, confirmed_for_payment=True)
+            RecurringCoachAdjustment.objects.create(coach=coach, description="Travel", amount=Decimal('20.00'))
+
+        coach_ids = list(Coach.objects.values_list('id', flat=True))
+        with self.assertNumQueries(4):
+            data = get_payslip_data_for_coaches(coach_ids, 2026, 3)
+        self.assertEqual(len([d for d in data.values() if d]), 7)
+
+    def test_generates_and_reports_each_coach(self, render):
+        progress = []
+        result = create_all_payslips_for_period(
+            2026, 3, None, max_workers=1,
+            progress_callback=lambda coach, status, message: progress.append((coach.name, status))
+        )
+
+        self.assertEqual((result['generated_count'], result['skipped_count'], result['error_count']), (2, 1, 0))
+        self.assertEqual(sorted(progress), [('Adjusted', 'success'), ('Idle', 'skipped'), ('Worked', 'success')])
+        self.assertEqual(result['details'][-1], result['summary_message'])
+        payslip = Payslip.objects.get(coach=self.worked)
+        self.assertEqual(payslip.total_amount, Decimal('250.00'))
+        self.assertEqual(payslip.file.read(), b'%PDF-test')
+
+    def test_existing_payslips_skipped_unless_forced(self, render):
+        create_all_payslips_for_period(2026, 3, None, max_workers=1)
+        rerun = create_all_payslips_for_period(2026, 3, None, max_workers=1)
+        self.assertEqual((rerun['generated_count'], rerun['skipped_count']), (0, 3))
+
+        forced = create_all_payslips_for_period(2026, 3, None, force_regeneration=True, max_workers=1)
+        self.assertEqual((forced['generated_count'], forced['skipped_count']), (2, 1))
+        self.assertEqual(Payslip.objects.count(), 2)
+
+    def test_workers_render_in_process_inside_a_transaction(self, render):
+        with mock.patch('finance.payslip_services.ProcessPoolExecutor', side_effect=OSError) as pool:
+            result = create_all_payslips_for_period(2026, 3, None, max_workers=2)
+        pool.assert_not_called()
+        self.assertEqual(result['generated_count'], 2)
+
+    def test_render_failure_is_an_error(self, render):
+        render.return_value = None
+        result = create_all_payslips_for_period(2026, 3, None, max_workers=1)
+        self.assertEqual((result['generated_count'], result['error_count']), (0, 2))
+        self.assertFalse(Payslip.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PayslipRenderPoolTest(TransactionTestCase):
+    """Outside a transaction the default multi-worker path renders real PDFs in a process pool."""
+
+    def setUp(self):
+        group = SchoolGroup.objects.create(name="U13")
+        for index in range(2):
+            coach = Coach.objects.create(name=f"Pool Coach {index}", hourly_rate=Decimal('120.00'))
+            session = Session.objects.create(school_group=group, session_date=datetime.date(2026, 4, 6 + index), session_start_time=datetime.time(15, 0))
+            SessionCoach.objects.create(session=session, coach=coach, coaching_duration_minutes=60)
+            CoachSessionCompletion.objects.create(session=session, coach=coach, confirmed_for_payment=True)
+
+    def test_renders_with_two_workers(self):
+        with mock.patch('finance.payslip_services.ProcessPoolExecutor', wraps=payslip_services.ProcessPoolExecutor) as pool:
+            result = create_all_payslips_for_period(2026, 4, None, max_workers=2)
+
+        self.assertEqual(pool.call_args.kwargs['max_workers'], 2)
+        self.assertEqual((result['generated_count'], result['error_count']), (2, 0))
+        for payslip in Payslip.objects.all():
+            self.assertTrue(payslip.file.read().startswith(b'%PDF'))
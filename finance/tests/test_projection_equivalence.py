@@ -0,0 +1,117 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+from django.test import TestCase
+from django.utils import timezone
+from finance.analytics_service import calculate_monthly_projection
+from finance.models import CoachSessionCompletion, RecurringCoachAdjustment
+from scheduling.models import Session, SessionCoach, ScheduledClass, Venue
+from players.models import SchoolGroup
+from accounts.models import Coach
+
+FIXED_NOW = timezone.make_aware(datetime.datetime(2026, 3, 15, 12, 0))
+
+
+class ProjectionEquivalenceTest(TestCase):
+    """
+    Fixture-driven check that the bulk projection reproduces the figures of the original
+    per-session implementation (expected values were recorded from it on this fixture).
+    """
+
+    def setUp(self):
+        venue = Venue.objects.create(name="Courts")
+        self.coaches = [
+            Coach.objects.create(name="Senior", hourly_rate=Decimal('275.50')),
+            Coach.objects.create(name="Junior", hourly_rate=Decimal('120.00')),
+            Coach.objects.create(name="Volunteer"),  # no rate
+            Coach.objects.create(name="Retired", hourly_rate=Decimal('400.00'), is_active=False),
+        ]
+        senior, junior, volunteer, retired = self.coaches
+        RecurringCoachAdjustment.objects.create(coach=senior, description="Admin", amount=Decimal('350.00'))
+        RecurringCoachAdjustment.objects.create(coach=retired, description="Old", amount=Decimal('999.00'))
+
+        self.rules = []
+        for index in range(3):
+            group = SchoolGroup.objects.create(name=f"Group {index}")
+            self.rules.append(ScheduledClass.objects.create(
+                school_group=group, day_of_week=index, start_time=datetime.time(14 + index, 0), default_venue=venue
+            ))
+        rule_a, rule_b, rule_c = self.rules
+
+        def make(day, rule=None, coaches=(), status='pending', duration=60, cancelled=False, start=datetime.time(10, 0)):
+            session = Session.objects.create(
+                session_date=day, session_start_time=start, generated_from_rule=rule, status=status,
+                planned_duration_minutes=duration, is_cancelled=cancelled
+            )
+            for coach, minutes in coaches:
+                SessionCoach.objects.create(session=session, coach=coach, coaching_duration_minutes=minutes)
+            return session
+
+        # History for rule A: seven finished sessions with varying staffing (only the last five count)
+        for week in range(7):
+            staff = [(senior, 45 + week * 5)] if week % 2 else [(senior, 60), (junior, 50 + week)]
+            make(datetime.date(2026, 1, 5) + datetime.timedelta(weeks=week), rule_a, staff, status='finished')
+        # History for rule B: only a finished session with an unrated coach, so the fallback is used
+        make(datetime.date(2026, 2, 3), rule_b, [(volunteer, 60)], status='finished')
+        # Rule C has no history at all
+
+        # March, past: realised, accrued and mixed
+        realised = make(datetime.date(2026, 3, 2), rule_a, [(senior, 60), (junior, 35)], status='finished')
+        CoachSessionCompletion.objects.create(session=realised, coach=senior, confirmed_for_payment=True)
+        CoachSessionCompletion.objects.create(session=realised, coach=junior, confirmed_for_payment=False)
+        accrued = make(datetime.date(2026, 3, 10), None, [(junior, 95), (volunteer, 60)])
+        CoachSessionCompletion.objects.create(session=accrued, coach=volunteer, confirmed_for_payment=True)
+        make(datetime.date(2026, 3, 11), rule_b, [(senior, 40)], cancelled=True)
+        make(datetime.date(2026, 3, 12), rule_c, [])
+
+        # March, today and future
+        make(datetime.date(2026, 3, 15), rule_a, [(senior, 60)])
+        make(datetime.date(2026, 3, 22), rule_a, [], start=datetime.time(9, 30))
+        make(datetime.date(2026, 3, 17), rule_b, [(junior, 60)], duration=75)
+        make(datetime.date(2026, 3, 18), rule_c, [], duration=50)
+        make(datetime.date(2026, 3, 20), None, [(senior, 90), (junior, 90), (volunteer, 90)])
+        make(datetime.date(2026, 3, 25), None, [], duration=45)
+
+        # Another month, must not leak in
+        other = make(datetime.date(2026, 4, 2), rule_a, [(senior, 60)], status='finished')
+        CoachSessionCompletion.objects.create(session=other, coach=senior, confirmed_for_payment=True)
+
+    def _project(self, **kwargs):
+        with mock.patch('django.utils.timezone.now', return_value=FIXED_NOW):
+            return calculate_monthly_projection(2026, 3, **kwargs)
+
+    def test_global_projection_matches_reference(self):
+        data = self._project()
+        self.assertEqual(data['realized_total'], Decimal('275.50'))
+        self.assertEqual(data['accrued_total'], Decimal('260.00'))
+        self.assertEqual(data['projected_total'], Decimal('1838.91'))
+        self.assertEqual(data['adjustments_total'], Decimal('350.00'))
+        self.assertEqual(data['grand_total'], Decimal('2724.41'))
+        self.assertEqual(data['breakdown'], {
+            'realized_count': 1,
+            'accrued_count': 2,
+            'projected_rules_count': 4,
+            'projected_manual_count': 2,
+            'projected_details': [],
+        })
+
+    def test_rule_filter_matches_reference(self):
+        data = self._project(scheduled_class_id=self.rules[0].id)
+        self.assertEqual(data['realized_total'], Decimal('275.50'))
+        self.assertEqual(data['accrued_total'], Decimal('70.00'))
+        self.assertEqual(data['projected_total'], Decimal('685.37'))
+        self.assertEqual(data['adjustments_total'], Decimal('0.00'))
+        self.assertEqual(data['grand_total'], Decimal('1030.87'))
+        self.assertEqual(data['breakdown']['accrued_count'], 1)
+        self.assertEqual(data['breakdown']['projected_rules_count'], 2)
+
+        data = self._project(scheduled_class_id=self.rules[1].id)
+        self.assertEqual(data['realized_total'], Decimal('0.00'))
+        self.assertEqual(data['projected_total'], Decimal('247.19'))
+        self.assertEqual(data['breakdown']['projected_rules_count'], 1)
+
+    def test_query_count_does_not_grow_with_sessions(self):
+        # Fixed set of bulk queries (the per-session implementation ran 46 on this fixture)
+        with mock.patch('django.utils.timezone.now', return_value=FIXED_NOW):
+            with self.assertNumQueries(11):
+                calculate_monthly_projection(2026, 3)
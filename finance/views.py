@@ -292,17 +292,11 @@ def completion_report(request):
     start_date = date(target_year, target_month, 1)
     end_date = date(target_year, target_month, num_days)
 
-    finished_sessions_in_period_qs = Session.objects.filter(
+    finished_sessions_in_period = Session.objects.filter(
         session_date__range=[start_date, end_date],
+        scheduled_start__lt=now_aware,
         is_cancelled=False,
-    ).exclude(
-        session_date__gt=today
     ).prefetch_related('sessioncoach_set__coach')
-    
-    finished_sessions_in_period = [
-        s for s in finished_sessions_in_period_qs
-        if s.session_date < today or (s.session_date == today and s.session_start_time < now_aware.time())
-    ]
 
     # Optimization: Bulk create CoachSessionCompletion records
     # 1. Get all session IDs
@@ -1,10 +1,11 @@
 import csv
 import io
 import re
-from rapidfuzz import fuzz
+import time
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from players.models import Player, SchoolGroup
+from players.registration_matching import PlayerMatcher, normalize_phone
 
 class Command(BaseCommand):
     help = 'Activates registered players from a CSV file and updates their information.'
@@ -23,19 +24,6 @@ class Command(BaseCommand):
             help='Run the script without making changes to the database.',
         )
 
-    def normalize_phone(self, phone):
-        if not phone:
-            return ''
-        # Remove non-digits
-        digits = re.sub(r'\D', '', str(phone))
-        # Handle SA numbers (start with 0 -> 27)
-        if digits.startswith('0') and len(digits) == 10:
-            return '27' + digits[1:]
-        # Handle already 27...
-        if digits.startswith('27') and len(digits) == 11:
-            return digits
-        return digits
-
     def parse_name(self, full_name):
         """
         Splits a full name string into first_name and last_name.
@@ -61,8 +49,8 @@ class Command(BaseCommand):
             'first_name': first_name,
             'last_name': last_name,
             'email': row.get('Parent/Guardian 1 Email', '').strip().lower(),
-            'contact_1': self.normalize_phone(row.get('Parent/Guardian 1 cell phone', '')),
-            'contact_2': self.normalize_phone(row.get('Player Cell Phone', '')),
+            'contact_1': normalize_phone(row.get('Parent/Guardian 1 cell phone', '')),
+            'contact_2': normalize_phone(row.get('Player Cell Phone', '')),
             'grade_raw': row.get('Grade in 2026', ''),
             'school': row.get('School', ''), # Assuming School column still exists or is not in mapping list provided but good to keep safe default
             'guardian_2_name': row.get('Guardian 2 Name', ''), # Not in new mapping, keeping safe default
@@ -73,67 +61,6 @@ class Command(BaseCommand):
             'gender_raw': row.get('Gender', '') # Not specified in mapping, assuming might be there or defaults
         }
 
-    def find_match(self, data, all_players):
-        """
-        Attempts to find a matching player using multi-step verification.
-        Returns: (match_type, player, score)
-        match_type: 'EMAIL', 'PHONE', 'FUZZY', or None
-        """
-        email = data['email']
-        contact_1 = data['contact_1']
-        contact_2 = data['contact_2']
-        
-        full_name = f"{data['first_name']} {data['last_name']}".lower().strip()
-
-        # Step 1: Email Match with Name Verification
-        if email:
-            for player in all_players:
-                if player.parent_email and player.parent_email.strip().lower() == email:
-                    # Verify Name Similarity to avoid merging siblings
-                    player_full_name = f"{player.first_name} {player.last_name}".lower()
-                    name_score = fuzz.token_sort_ratio(full_name, player_full_name)
-                    
-                    if name_score > 75:
-                        return 'EMAIL', player, name_score
-                    else:
-                        self.stdout.write(f"  [INFO] Found matching email for '{full_name}' but name mismatch with '{player.full_name}' (Score: {name_score}). Treating as different player.")
-
-        # Step 2: Phone Match with Name Verification
-        phone_contacts = [c for c in [contact_1, contact_2] if c]
-        
-        if phone_contacts:
-            for player in all_players:
-                p_parent_contact = self.normalize_phone(player.parent_contact_number)
-                p_contact = self.normalize_phone(player.contact_number)
-                
-                for search_num in phone_contacts:
-                    if (p_parent_contact and search_num == p_parent_contact) or \
-                       (p_contact and search_num == p_contact):
-                        
-                        # Verify Name Similarity
-                        player_full_name = f"{player.first_name} {player.last_name}".lower()
-                        name_score = fuzz.token_sort_ratio(full_name, player_full_name)
-                        
-                        if name_score > 75:
-                            return 'PHONE', player, name_score
-
-        # Step 3: Fuzzy Name Match
-        best_match = None
-        best_score = 0
-        
-        for player in all_players:
-            player_full_name = f"{player.first_name} {player.last_name}".lower()
-            ratio = fuzz.ratio(full_name, player_full_name)
-            
-            if ratio > best_score:
-                best_score = ratio
-                best_match = player
-
-        if best_score >= 90:
-            return 'FUZZY', best_match, best_score
-        
-        return None, None, 0
-
     def clean_grade(self, grade_str):
         if not grade_str:
             return None
@@ -174,14 +101,23 @@ class Command(BaseCommand):
         
         stats = {'updated': 0, 'created': 0, 'new_matches': 0, 'warnings': 0}
 
-        for row in rows:
-            data = self.extract_row_data(row)
-            
+        # Name scores don't change as rows are processed, so score every row up front in batches;
+        # the email/phone lookups run per row and see contacts updated by earlier rows
+        row_data = [self.extract_row_data(row) for row in rows]
+        to_match = [data for data in row_data if data['first_name'] or data['last_name']]
+        started = time.perf_counter()
+        matcher = PlayerMatcher(all_players)
+        fuzzy_matches = iter(matcher.fuzzy_matches(to_match))
+        self.stdout.write(f"Scored {len(to_match)} names against {len(all_players)} players in {time.perf_counter() - started:.2f}s.")
+
+        for row, data in zip(rows, row_data):
             if not data['first_name'] and not data['last_name']:
                 self.stdout.write(self.style.WARNING(f"Skipping row with missing name: {row}"))
                 continue
 
-            match_type, player, score = self.find_match(data, all_players)
+            match_type, player, score, notes = matcher.match(data, next(fuzzy_matches))
+            for note in notes:
+                self.stdout.write(f"  [INFO] {note}")
 
             if player:
                 players_to_activate_ids.add(player.id)
@@ -193,6 +129,7 @@ class Command(BaseCommand):
                 
                 if not dry_run:
                     self.update_player(player, data)
+                    matcher.update_contacts(player)
                     stats['updated'] += 1
             else:
                 self.stdout.write(self.style.SUCCESS(f"[NEW] Creating new player: {data['first_name']} {data['last_name']}"))
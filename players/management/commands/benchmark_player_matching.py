@@ -0,0 +1,102 @@
+import random
+import string
+import time
+from django.core.management.base import BaseCommand, CommandError
+from players.models import Player
+from players.registration_matching import PlayerMatcher, linear_match, normalize_phone
+
+FIRST_NAMES = [
+    'Ava', 'Ben', 'Cara', 'Daniel', 'Emma', 'Liam', 'Mia', 'Noah', 'Olivia', 'Ruan', 'Sipho', 'Thandi',
+    'Zara', 'Johan', 'Lerato', 'Pieter', 'Anika', 'Kabelo', 'Megan', 'Tyler', 'Chloe', 'Lwazi', 'Nina', 'Jaco',
+]
+SURNAMES = [
+    'Smith', 'Botha', 'Naidoo', 'Dlamini', 'van der Merwe', 'Nkosi', 'Pretorius', 'Jacobs', 'Mokoena', 'Pillay',
+    'Williams', 'Khumalo', 'Steyn', 'Fourie', 'Ndlovu', 'du Plessis', 'Adams', 'Coetzee', 'Govender', 'Venter',
+]
+
+
+class Command(BaseCommand):
+    help = 'Matches synthetic registration rows against synthetic players with the original linear scan and with PlayerMatcher, and reports the timings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--players', type=int, default=10000, help='Number of synthetic existing players.')
+        parser.add_argument('--rows', type=int, default=1000, help='Number of synthetic registration rows.')
+        parser.add_argument('--seed', type=int, default=2026, help='Random seed for the synthetic data.')
+        parser.add_argument('--skip-linear', action='store_true', help='Only time PlayerMatcher (the linear scan is slow at scale).')
+
+    def _name(self, rng):
+        # A random suffix keeps most synthetic names distinct while staying name-like
+        suffix = ''.join(rng.choices(string.ascii_lowercase, k=3))
+        return rng.choice(FIRST_NAMES), f"{rng.choice(SURNAMES)}{suffix}"
+
+    def _phone(self, rng):
+        return '0' + ''.join(rng.choices(string.digits, k=9))
+
+    def _typo(self, rng, text):
+        position = rng.randrange(1, len(text))
+        return text[:position] + rng.choice(string.ascii_lowercase) + text[position + 1:]
+
+    def _sample_players(self, rng, count):
+        players = []
+        for index in range(count):
+            first_name, last_name = self._name(rng)
+            players.append(Player(
+                id=index + 1, first_name=first_name, last_name=last_name,
+                parent_email=f"parent{index}@example.com" if rng.random() < 0.8 else '',
+                parent_contact_number=self._phone(rng) if rng.random() < 0.7 else '',
+                contact_number=self._phone(rng) if rng.random() < 0.2 else '',
+            ))
+        return players
+
+    def _sample_rows(self, rng, players, count):
+        """A mix of email, phone, misspelt-name and brand new registrations."""
+        rows = []
+        for _ in range(count):
+            player = rng.choice(players)
+            kind = rng.random()
+            row = {'first_name': player.first_name, 'last_name': player.last_name, 'email': '', 'contact_1': '', 'contact_2': ''}
+            if kind < 0.3 and player.parent_email:
+                row['email'] = player.parent_email
+            elif kind < 0.5 and player.parent_contact_number:
+                row['contact_1'] = normalize_phone(player.parent_contact_number)
+            elif kind < 0.8:
+                row['last_name'] = self._typo(rng, player.last_name)
+                row['email'] = f"new{rng.randrange(10 ** 6)}@example.com"
+            else:
+                row['first_name'], row['last_name'] = self._name(rng)
+                row['contact_1'] = normalize_phone(self._phone(rng))
+            rows.append(row)
+        return rows
+
+    def handle(self, *args, **options):
+        if options['players'] < 1 or options['rows'] < 1:
+            raise CommandError('--players and --rows must be at least 1.')
+
+        rng = random.Random(options['seed'])
+        players = self._sample_players(rng, options['players'])
+        rows = self._sample_rows(rng, players, options['rows'])
+        self.stdout.write(f"Matching {len(rows)} rows against {len(players)} players...")
+
+        started = time.perf_counter()
+        matches = PlayerMatcher(players).match_rows(rows)
+        indexed_seconds = time.perf_counter() - started
+        counts = {}
+        for match in matches:
+            counts[match.match_type or 'NEW'] = counts.get(match.match_type or 'NEW', 0) + 1
+        self.stdout.write(f"  Indexed (blocking + cdist): {indexed_seconds:.2f}s  " + ', '.join(f"{key}: {value}" for key, value in sorted(counts.items())))
+
+        if options['skip_linear']:
+            return
+
+        started = time.perf_counter()
+        expected = [linear_match(row, players) for row in rows]
+        linear_seconds = time.perf_counter() - started
+        self.stdout.write(f"  Linear (original loop):     {linear_seconds:.2f}s")
+
+        differences = sum(
+            1 for got, want in zip(matches, expected)
+            if (got.match_type, got.player and got.player.id) != (want.match_type, want.player and want.player.id)
+        )
+        speedup = linear_seconds / indexed_seconds if indexed_seconds else 0
+        style = self.style.SUCCESS if not differences else self.style.WARNING
+        self.stdout.write(style(f"Speed-up: {speedup:.1f}x, rows matched differently: {differences}"))
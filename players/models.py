@@ -20,6 +20,7 @@ class SchoolGroup(models.Model):
         max_length=1024, blank=True, null=True, verbose_name="Attendance Form URL",
         help_text="Link to the external Google Form or attendance sheet for this group."
     )
+    updated_at = models.DateTimeField(auto_now=True)  # Calendar feeds and week snapshots show the group name
     def __str__(self):
         return self.name
     class Meta:
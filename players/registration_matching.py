@@ -0,0 +1,221 @@
+# players/registration_matching.py
+
+import re
+from bisect import insort
+from collections import defaultdict, namedtuple
+
+from rapidfuzz import fuzz, process
+
+NAME_CHECK_THRESHOLD = 75  # An email/phone match must also look like the same name (siblings share contacts)
+FUZZY_MATCH_THRESHOLD = 90
+FUZZY_BATCH_SIZE = 256  # Rows scored per cdist call; each batch holds a rows x players score matrix
+
+Match = namedtuple('Match', ['match_type', 'player', 'score', 'notes'])
+
+_SOUNDEX_CODES = {
+    letter: str(code)
+    for code, letters in enumerate(['aehiouwy', 'bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r'])
+    for letter in letters
+}
+
+
+def normalize_phone(phone):
+    if not phone:
+        return ''
+    # Remove non-digits
+    digits = re.sub(r'\D', '', str(phone))
+    # Handle SA numbers (start with 0 -> 27)
+    if digits.startswith('0') and len(digits) == 10:
+        return '27' + digits[1:]
+    # Handle already 27...
+    if digits.startswith('27') and len(digits) == 11:
+        return digits
+    return digits
+
+
+def surname_key(name):
+    """Soundex code of the last word in a name, e.g. 'Ava Smyth' -> 'S530'; '' if it has no letters."""
+    words = name.split()
+    letters = [c for c in (words[-1].lower() if words else '') if c in _SOUNDEX_CODES]
+    if not letters:
+        return ''
+    key, previous = letters[0].upper(), _SOUNDEX_CODES[letters[0]]
+    for letter in letters[1:]:
+        code = _SOUNDEX_CODES[letter]
+        if code != '0' and code != previous:
+            key += code
+        if letter not in 'hw':  # h and w don't separate letters with the same code; vowels do
+            previous = code
+    return (key + '000')[:4]
+
+
+def _player_name(player):
+    return f"{player.first_name} {player.last_name}".lower()
+
+
+def _row_name(data):
+    return f"{data['first_name']} {data['last_name']}".lower().strip()
+
+
+class PlayerMatcher:
+    """
+    Matches registration rows (as built by activate_registered_players.extract_row_data) to existing
+    players, using the same rules and order as the original row-by-row loop:
+
+    1. EMAIL: a player with the same parent email whose name scores above NAME_CHECK_THRESHOLD
+       (token_sort_ratio); the first such player in queryset order.
+    2. PHONE: likewise for a player whose parent or own number matches either contact number.
+    3. FUZZY: the player with the best fuzz.ratio on the full name, if it is FUZZY_MATCH_THRESHOLD or more.
+
+    Steps 1 and 2 are lookups in indexes of normalised emails and phone numbers. Call
+    update_contacts() after changing a player's contact details so that later rows see them, as
+    they did when every row rescanned the player list. Step 3 doesn't depend on contact details,
+    so fuzzy_matches() scores all rows up front. A row whose exact name is in its surname
+    (Soundex) block takes that player. The rest are scored against every player with
+    process.cdist, FUZZY_BATCH_SIZE rows at a time.
+    """
+
+    def __init__(self, players):
+        self.players = list(players)
+        self.names = [_player_name(player) for player in self.players]
+        self.by_email = defaultdict(list)
+        self.by_phone = defaultdict(list)
+        self.by_surname = defaultdict(list)
+        self._indexed_contacts = {}
+        self._positions = {}
+        for index, player in enumerate(self.players):
+            self._positions[player.pk] = index
+            self._index_contacts(index)
+            key = surname_key(self.names[index])
+            if key:
+                self.by_surname[key].append(index)
+
+    def _index_contacts(self, index):
+        player = self.players[index]
+        email = (player.parent_email or '').strip().lower()
+        phones = {normalize_phone(player.parent_contact_number), normalize_phone(player.contact_number)} - {''}
+        self._indexed_contacts[index] = (email, phones)
+        # Index lists stay in player order, so the first match is the one the linear scan found
+        if email:
+            insort(self.by_email[email], index)
+        for phone in phones:
+            insort(self.by_phone[phone], index)
+
+    def update_contacts(self, player):
+        """Re-indexes a player's parent email and phone numbers after they were changed."""
+        index = self._positions.get(player.pk)
+        if index is None:
+            return
+        email, phones = self._indexed_contacts[index]
+        if email:
+            self.by_email[email].remove(index)
+        for phone in phones:
+            self.by_phone[phone].remove(index)
+        self.players[index] = player
+        self._index_contacts(index)
+
+    def fuzzy_matches(self, rows):
+        """Returns the best (player index, score) for each row's name, or None below the threshold."""
+        results = [None] * len(rows)
+        unresolved = []
+        for position, data in enumerate(rows):
+            full_name = _row_name(data)
+            index = self._exact_name_in_surname_block(full_name)
+            if index is not None:
+                results[position] = (index, 100.0)
+            else:
+                unresolved.append((position, full_name))
+
+        if not self.names:
+            return results
+        for start in range(0, len(unresolved), FUZZY_BATCH_SIZE):
+            batch = unresolved[start:start + FUZZY_BATCH_SIZE]
+            scores = process.cdist(
+                [full_name for _, full_name in batch], self.names,
+                scorer=fuzz.ratio, processor=None, score_cutoff=FUZZY_MATCH_THRESHOLD, workers=-1
+            )
+            for (position, full_name), index in zip(batch, scores.argmax(axis=1).tolist()):
+                # cdist scores are float32; rescore the winner so reported scores match fuzz.ratio exactly
+                score = fuzz.ratio(full_name, self.names[index])
+                if score >= FUZZY_MATCH_THRESHOLD:
+                    results[position] = (index, score)
+        return results
+
+    def match(self, data, fuzzy):
+        """Matches one row, given its entry from fuzzy_matches(). Unmatched rows get Match(None, None, 0, notes)."""
+        full_name = _row_name(data)
+        notes = []
+        match = self._match_contact(data, full_name, notes)
+        if match:
+            return match
+        if fuzzy:
+            index, score = fuzzy
+            return Match('FUZZY', self.players[index], score, notes)
+        return Match(None, None, 0, notes)
+
+    def match_rows(self, rows):
+        """Matches every row against the players as they are now; returns a Match per row, in order."""
+        return [self.match(data, fuzzy) for data, fuzzy in zip(rows, self.fuzzy_matches(rows))]
+
+    def _match_contact(self, data, full_name, notes):
+        if data['email']:
+            for index in self.by_email.get(data['email'], ()):
+                name_score = fuzz.token_sort_ratio(full_name, self.names[index])
+                if name_score > NAME_CHECK_THRESHOLD:
+                    return Match('EMAIL', self.players[index], name_score, notes)
+                notes.append(
+                    f"Found matching email for '{full_name}' but name mismatch with "
+                    f"'{self.players[index].full_name}' (Score: {name_score}). Treating as different player."
+                )
+
+        phones = [phone for phone in (data['contact_1'], data['contact_2']) if phone]
+        for index in sorted({index for phone in phones for index in self.by_phone.get(phone, ())}):
+            name_score = fuzz.token_sort_ratio(full_name, self.names[index])
+            if name_score > NAME_CHECK_THRESHOLD:
+                return Match('PHONE', self.players[index], name_score, notes)
+        return None
+
+    def _exact_name_in_surname_block(self, full_name):
+        # A perfect score can't be beaten, and identical names share a surname key, so the first
+        # exact hit in the block is the player the full scan would pick
+        for index in self.by_surname.get(surname_key(full_name), ()):
+            if self.names[index] == full_name:
+                return index
+        return None
+
+
+def linear_match(data, players):
+    """
+    The original O(players) scan for a single row, kept as the reference PlayerMatcher is checked
+    and benchmarked against. Takes the same row dict; returns a Match.
+    """
+    full_name = _row_name(data)
+    notes = []
+    if data['email']:
+        for player in players:
+            if player.parent_email and player.parent_email.strip().lower() == data['email']:
+                name_score = fuzz.token_sort_ratio(full_name, _player_name(player))
+                if name_score > NAME_CHECK_THRESHOLD:
+                    return Match('EMAIL', player, name_score, notes)
+                notes.append(
+                    f"Found matching email for '{full_name}' but name mismatch with "
+                    f"'{player.full_name}' (Score: {name_score}). Treating as different player."
+                )
+
+    phones = [phone for phone in (data['contact_1'], data['contact_2']) if phone]
+    if phones:
+        for player in players:
+            player_phones = {normalize_phone(player.parent_contact_number), normalize_phone(player.contact_number)} - {''}
+            if player_phones.intersection(phones):
+                name_score = fuzz.token_sort_ratio(full_name, _player_name(player))
+                if name_score > NAME_CHECK_THRESHOLD:
+                    return Match('PHONE', player, name_score, notes)
+
+    best_match, best_score = None, 0
+    for player in players:
+        score = fuzz.ratio(full_name, _player_name(player))
+        if score > best_score:
+            best_match, best_score = player, score
+    if best_score >= FUZZY_MATCH_THRESHOLD:
+        return Match('FUZZY', best_match, best_score, notes)
+    return Match(None, None, 0, notes)
@@ -0,0 +1,88 @@
+import io
+import os
+import tempfile
+from django.core.management import call_command
+from django.test import TestCase
+from players.models import Player
+from players.registration_matching import PlayerMatcher, linear_match, normalize_phone, surname_key
+
+
+def row(first_name, last_name, email='', contact_1='', contact_2=''):
+    return {'first_name': first_name, 'last_name': last_name, 'email': email, 'contact_1': contact_1, 'contact_2': contact_2}
+
+
+class RegistrationMatchingTest(TestCase):
+    def setUp(self):
+        self.ava = Player.objects.create(first_name='Ava', last_name='Smith', parent_email='smiths@example.com', parent_contact_number='082 123 4567')
+        self.sibling = Player.objects.create(first_name='Zoe', last_name='Smith', parent_email='smiths@example.com')
+        self.ben = Player.objects.create(first_name='Ben', last_name='Botha', contact_number='+27 71 555 0000')
+        self.johan = Player.objects.create(first_name='Johannes', last_name='Pretorius')
+        self.players = list(Player.objects.all())
+
+    def test_surname_key_and_phone(self):
+        self.assertEqual([surname_key(name) for name in ['Ava Smith', 'ava smyth', 'Ashcraft', 'Tymczak', '']], ['S530', 'S530', 'A261', 'T522', ''])
+        self.assertEqual(normalize_phone('082 123 4567'), '27821234567')
+
+    def test_same_results_as_linear_scan(self):
+        rows = [
+            row('Zoe', 'Smith', email='smiths@example.com'),           # email, after a sibling mismatch note
+            row('Benjamin', 'Botha', contact_2='27715550000'),          # phone via player's own number
+            row('Ava', 'Smith', contact_1='27821234567'),               # phone via parent number
+            row('Johannes', 'Pretorious'),                              # fuzzy, same surname block
+            row('Johannes', 'Bretorius'),                               # fuzzy, only found by the cdist fallback
+            row('Nobody', 'Here', email='smiths@example.com'),          # email mismatch, no match
+        ]
+        matches = PlayerMatcher(self.players).match_rows(rows)
+        self.assertEqual(
+            [(match.match_type, match.player) for match in matches],
+            [('EMAIL', self.sibling), ('PHONE', self.ben), ('PHONE', self.ava), ('FUZZY', self.johan), ('FUZZY', self.johan), (None, None)]
+        )
+        self.assertEqual(matches, [linear_match(data, self.players) for data in rows])
+        self.assertIn("name mismatch with 'Ava Smith'", matches[0].notes[0])
+
+    def test_best_fuzzy_score_wins_across_surname_blocks(self):
+        thompsen = Player.objects.create(first_name='Alexandr', last_name='Thompsen')
+        thomson = Player.objects.create(first_name='Alexander', last_name='Thomson')
+        players = list(Player.objects.all())
+        data = row('Alexander', 'Thompson')
+
+        match = PlayerMatcher(players).match_rows([data])[0]
+        self.assertEqual((match.match_type, match.player), ('FUZZY', thomson))
+        self.assertNotEqual(surname_key(thompsen.full_name), surname_key(thomson.full_name))
+        self.assertEqual(match, linear_match(data, players))
+
+    def test_updated_contacts_are_seen_by_later_rows(self):
+        matcher = PlayerMatcher(self.players)
+        swapped = row('Pretorius', 'Johannes', email='johan@example.com')
+        self.assertIsNone(matcher.match_rows([swapped])[0].player)
+
+        self.johan.parent_email = 'johan@example.com'
+        matcher.update_contacts(self.johan)
+        self.assertEqual(matcher.match_rows([swapped])[0][:2], ('EMAIL', self.johan))
+
+    def test_command_matches_on_contacts_from_earlier_rows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'registrations.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('Name and Surname of Player;Parent/Guardian 1 Email;Parent/Guardian 1 cell phone;Grade in 2026\n')
+                f.write('Johannes Pretorius;johan@example.com;;Grade 7\n')
+                f.write('Pretorius Johannes;johan@example.com;;Grade 7\n')  # Same child, names swapped
+            out = io.StringIO()
+            call_command('activate_registered_players', path, stdout=out)
+        self.assertIn('[CONFIRMED (EMAIL match)] Pretorius Johannes -> Johannes Pretorius', out.getvalue())
+        self.assertEqual(Player.objects.count(), 4)
+
+    def test_command_dry_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'registrations.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('Name and Surname of Player;Parent/Guardian 1 Email;Parent/Guardian 1 cell phone;Grade in 2026\n')
+                f.write('Johannes Pretorious;;;Grade 7\n')
+                f.write('New Kid;;;Grade 3\n')
+            out = io.StringIO()
+            call_command('activate_registered_players', path, '--dry-run', stdout=out)
+        output = out.getvalue()
+        self.assertIn("[CONFIRMED (FUZZY match) (Score: ", output)
+        self.assertIn(f"-> Johannes Pretorius (ID: {self.johan.id})", output)
+        self.assertIn('[NEW] Creating new player: New Kid', output)
+        self.assertIn('Would deactivate 3 players', output)
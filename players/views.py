@@ -2,7 +2,6 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test, permission_required
 from django.views.decorators.http import require_POST, require_http_methods
 from django.http import JsonResponse, HttpResponseForbidden
-from django.core.mail import send_mail
 from django.core.signing import TimestampSigner, BadSignature, SignatureExpired
 from django.conf import settings
 from django.urls import reverse
@@ -21,6 +20,7 @@ from scheduling.models import Session, AttendanceTracking, ScheduledClass
 from assessments.models import SessionAssessment, GroupAssessment
 from django.db.models import Count, Q, Value, Prefetch, Avg
 from django.db.models.functions import Concat
+from core.outbox import enqueue
 import json
 
 # Helper to convert date objects for JSON serialization
@@ -740,18 +740,14 @@ def notification_register_view(request):
                 # Debug: Print to console to ensure user can see it
                 print(f"\n\n{'='*50}\nVERIFICATION URL FOR {email}:\n{verify_url}\n{'='*50}\n\n")
 
-                try:
-                    send_mail(
-                        'Confirm your SquashSync Notification Email',
-                        f'Hi {player.first_name},\n\nPlease click the link below to verify your email address for session reminders:\n\n{verify_url}\n\nThis link expires in 48 hours.',
-                        settings.DEFAULT_FROM_EMAIL,
-                        [email],
-                        fail_silently=False,
-                    )
-                    messages.success(request, f"Verification email sent to {email}. Please check your inbox.")
-                    return redirect('players:notification_register')
-                except Exception as e:
-                    messages.error(request, f"Error sending email: {e}")
+                enqueue(
+                    'Confirm your SquashSync Notification Email',
+                    f'Hi {player.first_name},\n\nPlease click the link below to verify your email address for session reminders:\n\n{verify_url}\n\nThis link expires in 48 hours.',
+                    [email],
+                    category='notification_verification',
+                )
+                messages.success(request, f"Verification email sent to {email}. Please check your inbox.")
+                return redirect('players:notification_register')
             else:
                  messages.error(request, "Invalid email address.")
 
@@ -807,13 +803,12 @@ def update_player_notification_email(request, player_id):
         # Debug: Print to console to ensure user can see it
         print(f"\n\n{'='*50}\nVERIFICATION URL FOR {email}:\n{verify_url}\n{'='*50}\n\n")
         
-        # Send Email
-        send_mail(
+        # Queue Email
+        enqueue(
             'Confirm your SquashSync Notification Email',
             f'Hi {player.first_name},\n\nA coach has added this email address for session reminders.\n\nPlease click the link below to verify it starts receiving notifications:\n\n{verify_url}\n\nThis link expires in 48 hours.',
-            settings.DEFAULT_FROM_EMAIL,
             [email],
-            fail_silently=False,
+            category='notification_verification',
         )
         
         return JsonResponse({'status': 'success', 'message': f'Verification email sent to {email}.'})
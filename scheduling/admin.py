@@ -107,7 +107,7 @@ class ScheduledClassAdmin(admin.ModelAdmin):
 
                 results = generate_sessions_for_rules(queryset, start_date, end_date, overwrite)
 
-                messages.success(request, f"Session Generation Complete: {results['created']} created, {results['skipped_exists']} skipped, {results['errors']} errors.")
+                messages.success(request, f"Session Generation Complete: {results['created']} created, {results['skipped_exists']} skipped, {results['errors']} errors ({results['stats'].get('total_ms', 0)} ms).")
                 for detail in results['details']:
                     messages.info(request, detail)
 
@@ -1,8 +1,12 @@
-from django.shortcuts import get_object_or_404
+import hashlib
 from django.http import HttpResponse, Http404
+from django.core.cache import cache
 from django.core.signing import TimestampSigner, BadSignature, SignatureExpired
+from django.db.models import Count, Max
 from django.utils import timezone
-from .models import Session
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from .models import Session, SessionCoach
 from datetime import datetime, timedelta
 from django.conf import settings
 from django.urls import reverse
@@ -20,17 +24,80 @@ def coach_calendar_feed(request, token):
     except (BadSignature, SignatureExpired):
         raise Http404("Invalid calendar token")
 
-    # Get the sessions
-    now = timezone.now()
-    cutoff_past = now - timedelta(days=90) # Last 3 months
+    entry = get_coach_feed(user_id, request)
+    response = get_conditional_response(request, etag=entry['etag'], last_modified=int(entry['last_modified'].timestamp()))
+    if response is None:
+        response = HttpResponse(entry['body'], content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename=coach_schedule.ics'
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'].timestamp())
+    return response
+
+
+def _feed_cutoff():
+    """First session date included in the feed: the last 3 months plus everything upcoming."""
+    return (timezone.now() - timedelta(days=90)).date()
+
+
+def _feed_version(user_id, cutoff):
+    """
+    Cheap revision stamp for a coach's feed, taken with one aggregate query. Any edit to one
+    of their sessions or assignments, or to a venue or group those sessions show, moves a
+    timestamp; removing an assignment changes the count.
+    """
+    stamp = SessionCoach.objects.filter(
+        coach__user_id=user_id,
+        session__session_date__gte=cutoff
+    ).aggregate(
+        sessions_changed=Max('session__updated_at'),
+        assignments_changed=Max('updated_at'),
+        venues_changed=Max('session__venue__updated_at'),
+        groups_changed=Max('session__school_group__updated_at'),
+        assignments=Count('id')
+    )
+    return (
+        cutoff.isoformat(), stamp['sessions_changed'], stamp['assignments_changed'],
+        stamp['venues_changed'], stamp['groups_changed'], stamp['assignments']
+    )
+
 
-    # Query Sessions
-    # User is in coaches_attending.
-    # Future OR past 3 months.
+def get_coach_feed(user_id, request):
+    """
+    Returns {'version', 'etag', 'last_modified', 'body'} for a coach's iCal feed.
+    The rendered body is cached per coach and rebuilt only when the feed version changes.
+    """
+    cutoff = _feed_cutoff()
+    version = _feed_version(user_id, cutoff)
+    # Event descriptions link back to the site, so each host the feed is served on gets its own copy
+    site = hashlib.md5(request.build_absolute_uri('/').encode()).hexdigest()
+    cache_key = f"coach_calendar_feed:{user_id}:{site}"
+    cached = cache.get(cache_key)
+    if cached and cached['version'] == version:
+        return cached
+
+    body = build_coach_calendar(user_id, cutoff, request)
+    last_modified = max(filter(None, version[1:5]), default=None) or timezone.now()
+    if cached and last_modified <= cached['last_modified']:
+        # Something left the feed (an assignment was removed or sessions aged out) without
+        # leaving a newer timestamp behind
+        last_modified = timezone.now()
+
+    entry = {
+        'version': version,
+        'etag': quote_etag(hashlib.md5(body).hexdigest()),
+        'last_modified': last_modified,
+        'body': body,
+    }
+    cache.set(cache_key, entry, settings.COACH_CALENDAR_FEED_CACHE_SECONDS)
+    return entry
+
+
+def build_coach_calendar(user_id, cutoff, request):
+    """Renders the iCalendar document for every session of the coach from `cutoff` onwards."""
     sessions = Session.objects.filter(
         coaches_attending__user__id=user_id,
-        session_date__gte=cutoff_past.date()
-    ).select_related('venue', 'school_group')
+        session_date__gte=cutoff
+    ).select_related('venue', 'school_group').order_by('session_date', 'session_start_time', 'id')
 
     cal = icalendar.Calendar()
     cal.add('prodid', '-//SquashSync//squashsync.com//EN')
@@ -58,7 +125,10 @@ def coach_calendar_feed(request, token):
 
         event.add('dtstart', start_dt)
         event.add('dtend', end_dt)
-        event.add('dtstamp', now)
+        # Stamped with the session's last change (not the request time) so an unchanged
+        # session renders byte-for-byte the same and the feed's ETag stays stable
+        event.add('dtstamp', session.updated_at)
+        event.add('last-modified', session.updated_at)
         
         # Location
         if session.venue:
@@ -77,11 +147,9 @@ def coach_calendar_feed(request, token):
         event.add('uid', f"session_{session.id}@squashsync.com")
         
         # SEQUENCE
-        # Ideally we track updates, but defaulting to 0 as requested if not possible.
-        event.add('sequence', 0) 
+        # Bumped by Session.save() whenever the time, place, group or cancellation changes
+        event.add('sequence', session.sequence)
 
         cal.add_component(event)
 
-    response = HttpResponse(cal.to_ical(), content_type='text/calendar; charset=utf-8')
-    response['Content-Disposition'] = 'inline; filename=coach_schedule.ics'
-    return response
+    return cal.to_ical()
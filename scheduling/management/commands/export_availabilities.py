@@ -1,68 +1,56 @@
-import csv
 import datetime
-from django.core.management.base import BaseCommand
-from scheduling.models import CoachAvailability
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from core.csv_export import CHUNK_SIZE, EXPORTS, export_filename, export_rows, stream_csv
 
 class Command(BaseCommand):
-    help = 'Exports CoachAvailability data to a CSV file.'
+    help = 'Exports CoachAvailability data (or another dataset, see --dataset) to a CSV file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dataset',
+            choices=sorted(EXPORTS),
+            default='availabilities',
+            help='What to export (defaults to coach availabilities).',
+        )
+        parser.add_argument('--start', type=datetime.date.fromisoformat, help='Only rows on or after this date (YYYY-MM-DD).')
+        parser.add_argument('--end', type=datetime.date.fromisoformat, help='Only rows on or before this date (YYYY-MM-DD).')
+        parser.add_argument('--output', help="File to write; '-' for stdout. Defaults to a timestamped file in the current directory.")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows fetched from the database at a time.')
 
     def handle(self, *args, **options):
-        # Generate a filename with a timestamp
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"coach_availabilities_backup_{timestamp}.csv"
-
-        # Define the headers for your CSV
-        headers = [
-            'Coach Username',
-            'Coach Full Name',
-            'Session Date',
-            'Session Start Time',
-            'School Group',
-            'Venue',
-            'Status',
-            'Last Action',
-            'Notes',
-            'Updated At'
-        ]
+        name = options['dataset']
+        start, end = options['start'], options['end']
+        if start and end and end < start:
+            raise CommandError('--end cannot be before --start.')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+
+        filename = options['output']
+        if not filename:
+            # Generate a filename with a timestamp
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            stem = "coach_availabilities_backup" if name == 'availabilities' else export_filename(name, start, end)[:-len('.csv')]
+            filename = f"{stem}_{timestamp}.csv"
+
+        lines = stream_csv(export_rows(name, start, end, chunk_size=options['chunk_size']))
+        if filename == '-':
+            count = self._write(lines, sys.stdout)
+            self.stderr.write(f"Exported {count} records.")
+            return
 
         self.stdout.write(f"Starting export to {filename}...")
-
         try:
             with open(filename, mode='w', newline='', encoding='utf-8') as csv_file:
-                writer = csv.writer(csv_file)
-                writer.writerow(headers)
-
-                # Fetch all availabilities, using select_related to minimize database queries
-                availabilities = CoachAvailability.objects.select_related(
-                    'coach', 
-                    'session', 
-                    'session__school_group', 
-                    'session__venue'
-                ).all()
-
-                count = 0
-                for av in availabilities:
-                    # Handle potential None values safely
-                    group_name = av.session.school_group.name if av.session.school_group else "No Group"
-                    venue_name = av.session.venue.name if av.session.venue else "No Venue"
-                    coach_full_name = f"{av.coach.first_name} {av.coach.last_name}"
-                    
-                    row = [
-                        av.coach.username,
-                        coach_full_name,
-                        av.session.session_date,
-                        av.session.session_start_time,
-                        group_name,
-                        venue_name,
-                        av.get_status_display(),       # Gets the human-readable label (e.g., "Available")
-                        av.get_last_action_display(),  # Gets "Confirmed" or "Declined"
-                        av.notes,
-                        av.status_updated_at
-                    ]
-                    writer.writerow(row)
-                    count += 1
-
-            self.stdout.write(self.style.SUCCESS(f"Successfully exported {count} records to {filename}"))
-            
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Error exporting data: {str(e)}"))
+                count = self._write(lines, csv_file)
+        except OSError as e:
+            raise CommandError(f"Error exporting data: {e}")
+        self.stdout.write(self.style.SUCCESS(f"Successfully exported {count} records to {filename}"))
+
+    def _write(self, lines, out):
+        """Writes the CSV lines as they're produced; returns the number of data rows."""
+        count = -1  # The header isn't a record
+        for line in lines:
+            out.write(line)
+            count += 1
+        return count
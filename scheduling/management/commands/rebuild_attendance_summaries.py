@@ -0,0 +1,27 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from scheduling.stats import rebuild_attendance_summaries
+
+class Command(BaseCommand):
+    help = 'Rebuilds the monthly attendance summary table from the coach-marked attendance records.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only rebuild months from this date onwards (YYYY-MM-DD). Rebuilds everything by default.',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if not since:
+                raise CommandError(f'Invalid --since date "{options["since"]}". Use YYYY-MM-DD.')
+
+        started = time.perf_counter()
+        row_count = rebuild_attendance_summaries(since=since)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        scope = f"from {since:%Y-%m} onwards" if since else "for all months"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {row_count} attendance summary rows {scope} in {elapsed_ms:.0f}ms."))
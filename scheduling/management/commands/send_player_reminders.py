@@ -1,11 +1,9 @@
 import datetime
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from scheduling.models import Session
-from scheduling.notifications import build_player_attendance_email
+from scheduling.reminders import send_player_reminders
 from django.db.models import Q
-from django.core.mail import get_connection
-import time
 
 class Command(BaseCommand):
     help = 'Sends attendance reminder emails to parents for sessions occurring today and tomorrow.'
@@ -16,13 +14,20 @@ class Command(BaseCommand):
             action='store_true',
             help='Run the command without actually sending emails. Lists who would receive them.',
         )
+        parser.add_argument('--workers', type=int, help='Threads building emails (defaults to settings.PLAYER_REMINDER_WORKERS).')
+        parser.add_argument('--rate', type=float, help='Max emails per second, 0 for unlimited (defaults to settings.PLAYER_REMINDER_RATE_PER_SECOND).')
+        parser.add_argument('--burst', type=int, help='Emails sent back to back before the rate limit applies (defaults to settings.PLAYER_REMINDER_BURST).')
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
+        if options['workers'] is not None and options['workers'] < 1:
+            raise CommandError('--workers must be at least 1.')
+        if options['rate'] is not None and options['rate'] < 0:
+            raise CommandError('--rate cannot be negative.')
         now = timezone.now()
         today = now.date()
         tomorrow = today + datetime.timedelta(days=1)
-        
+
         mode_str = "[DRY RUN] " if dry_run else ""
         self.stdout.write(f"{mode_str}[{now:%Y-%m-%d %H:%M}] --- Starting player attendance reminders for {today:%Y-%m-%d} and {tomorrow:%Y-%m-%d} ---")
 
@@ -31,60 +36,39 @@ class Command(BaseCommand):
             Q(
                 session_date=today,
                 session_start_time__gte=now.time()
-            ) | 
+            ) |
             Q(
                 session_date=tomorrow
             ),
             is_cancelled=False
-        ).select_related('school_group').prefetch_related('school_group__players')
+        )
 
         if not sessions_to_notify.exists():
             self.stdout.write(self.style.SUCCESS(f"{mode_str}No upcoming sessions for today or tomorrow. Exiting."))
             return
 
-        sent_count = 0
-        total_players = 0
-        messages = []
-
-        # Open a single persistent connection
-        with get_connection() as connection:
-            for session in sessions_to_notify:
-                if not session.school_group:
-                    continue
+        def report(player, session, error):
+            if dry_run:
+                self.stdout.write(f"  [DRY RUN] Would send to: {player.full_name} <{player.notification_email}> ({session})")
+            elif error:
+                self.stdout.write(self.style.ERROR(f"  Error sending to {player.full_name} <{player.notification_email}>: {error}"))
 
-                self.stdout.write(f"Processing session: {session} for group '{session.school_group.name}'...")
-                
-                # STRICTLY filter only players with a set notification_email
-                players_to_notify = session.school_group.players.filter(
-                    is_active=True,
-                    notification_email__isnull=False
-                ).exclude(notification_email='')
+        stats = send_player_reminders(
+            sessions_to_notify,
+            dry_run=dry_run,
+            workers=options['workers'],
+            rate_per_second=options['rate'],
+            burst=options['burst'],
+            progress=report
+        )
 
-                for player in players_to_notify:
-                    total_players += 1
-                    
-                    if dry_run:
-                        self.stdout.write(f"  [DRY RUN] Would send to: {player.full_name} <{player.notification_email}>")
-                        sent_count += 1
-                    else:
-                        email_msg = build_player_attendance_email(player, session)
-                        if email_msg:
-                            messages.append(email_msg)
-                            
-                            # Batch send if we have enough messages
-                            if len(messages) >= 20:
-                                count = connection.send_messages(messages)
-                                sent_count += count
-                                messages = [] # Clear the list
-                                self.stdout.write(f"  Sent batch of {count} emails. Sleeping...")
-                                time.sleep(1) # Rate limiting
-            
-            # Send any remaining messages
-            if messages and not dry_run:
-                count = connection.send_messages(messages)
-                sent_count += count
-                self.stdout.write(f"  Sent final batch of {count} emails.")
-                
         self.stdout.write(self.style.SUCCESS(f"--- {mode_str}Process Complete ---"))
         action_verb = "would be sent" if dry_run else "sent"
-        self.stdout.write(f"Processed {total_players} verified players. Emails {action_verb}: {sent_count}.")
\ No newline at end of file
+        sent = stats['emails'] if dry_run else stats['sent']
+        self.stdout.write(f"Processed {stats['emails']} verified players in {stats['sessions']} sessions. Emails {action_verb}: {sent}.")
+        if stats['failed']:
+            self.stdout.write(self.style.WARNING(f"Failed: {stats['failed']}."))
+        self.stdout.write(
+            f"Throughput: {stats['emails_per_second']} emails/s over {stats['seconds']}s "
+            f"(render {stats['render_ms']} ms, send {stats['send_ms']} ms)."
+        )
@@ -0,0 +1,64 @@
+# Generated by Django 5.2 on 2026-10-17 01:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth
+
+
+def backfill_attendance_summaries(apps, schema_editor):
+    """
+    Populates the summary table from existing coach-marked attendance
+    (same aggregation as scheduling.stats.rebuild_attendance_summaries).
+    """
+    AttendanceTracking = apps.get_model('scheduling', 'AttendanceTracking')
+    AttendanceMonthlySummary = apps.get_model('scheduling', 'AttendanceMonthlySummary')
+
+    records = AttendanceTracking.objects.filter(
+        session__school_group__isnull=False,
+        session__is_cancelled=False,
+        attended__in=['YES', 'NO']
+    ).annotate(month=TruncMonth('session__session_date'))
+    counts = dict(tracked=Count('session_id', distinct=True), attended=Count('id', filter=Q(attended='YES')))
+
+    rows = [
+        AttendanceMonthlySummary(
+            school_group_id=row['session__school_group_id'], player_id=row.get('player_id'), month=row['month'],
+            sessions_tracked=row['tracked'], sessions_attended=row['attended']
+        )
+        for row in [
+            *records.values('session__school_group_id', 'month').annotate(**counts).order_by(),
+            *records.values('session__school_group_id', 'player_id', 'month').annotate(**counts).order_by(),
+        ]
+    ]
+    AttendanceMonthlySummary.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0011_alter_player_notification_email'),
+        ('scheduling', '0007_alter_scheduledclass_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the summarised month.')),
+                ('sessions_tracked', models.PositiveIntegerField(default=0)),
+                ('sessions_attended', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('player', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='players.player')),
+                ('school_group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='players.schoolgroup')),
+            ],
+            options={
+                'verbose_name': 'Attendance Monthly Summary',
+                'verbose_name_plural': 'Attendance Monthly Summaries',
+                'indexes': [models.Index(fields=['player', 'month'], name='scheduling__player__5d32f3_idx')],
+                'constraints': [models.UniqueConstraint(fields=('school_group', 'player', 'month'), name='unique_player_group_month_attendance'), models.UniqueConstraint(condition=models.Q(('player__isnull', True)), fields=('school_group', 'month'), name='unique_group_month_attendance')],
+            },
+        ),
+        migrations.RunPython(backfill_attendance_summaries, migrations.RunPython.noop),
+    ]
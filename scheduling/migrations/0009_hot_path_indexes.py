@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-17 01:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_coach_account_holder_name'),
+        ('players', '0011_alter_player_notification_email'),
+        ('scheduling', '0008_attendancemonthlysummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancetracking',
+            index=models.Index(fields=['session', 'attended'], name='scheduling__session_bbd905_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendancetracking',
+            index=models.Index(fields=['session', 'parent_response'], name='scheduling__session_37cdb7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coachavailability',
+            index=models.Index(fields=['session', 'status'], name='scheduling__session_5bba57_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coachavailability',
+            index=models.Index(fields=['coach', 'last_action'], name='scheduling__coach_i_9cf18f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['session_date', 'is_cancelled'], name='scheduling__session_780899_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['generated_from_rule', 'session_date'], name='scheduling__generat_8c5792_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['school_group', 'session_date'], name='scheduling__school__7dd789_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2 on 2026-10-17 01:29
+
+import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_scheduled_times(apps, schema_editor):
+    Session = apps.get_model('scheduling', 'Session')
+    batch = []
+    for session in Session.objects.only('id', 'session_date', 'session_start_time', 'planned_duration_minutes').iterator(chunk_size=2000):
+        start = timezone.make_aware(datetime.datetime.combine(session.session_date, session.session_start_time))
+        session.scheduled_start = start
+        session.scheduled_end = start + datetime.timedelta(minutes=session.planned_duration_minutes)
+        batch.append(session)
+        if len(batch) >= 2000:
+            Session.objects.bulk_update(batch, ['scheduled_start', 'scheduled_end'])
+            batch = []
+    if batch:
+        Session.objects.bulk_update(batch, ['scheduled_start', 'scheduled_end'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_coach_account_holder_name'),
+        ('players', '0011_alter_player_notification_email'),
+        ('scheduling', '0009_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='scheduled_end',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Planned end (start + planned duration), stored for querying.', null=True),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='scheduled_start',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Planned start (session date + start time), stored for querying.', null=True),
+        ),
+        migrations.RunPython(backfill_scheduled_times, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['scheduled_end', 'is_cancelled'], name='scheduling__schedul_f1c712_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['scheduled_start', 'is_cancelled'], name='scheduling__schedul_bfa20b_idx'),
+        ),
+    ]
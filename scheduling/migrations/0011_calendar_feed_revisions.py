@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-17 01:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0010_session_scheduled_times'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='sequence',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Revision number published as the iCalendar SEQUENCE.'),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='sessioncoach',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0011_calendar_feed_revisions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -12,6 +12,7 @@ class Venue(models.Model):
     address = models.TextField(blank=True, null=True, help_text="Optional: Full address of the venue.")
     notes = models.TextField(blank=True, null=True, help_text="Optional: Any notes about the venue (e.g., access instructions, number of courts).")
     is_active = models.BooleanField(default=True, help_text="Is this venue currently in use?")
+    updated_at = models.DateTimeField(auto_now=True)  # Calendar feeds and week snapshots show the venue name
 
     def __str__(self):
         return self.name
@@ -130,6 +131,30 @@ class Session(models.Model):
     
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
 
+    # Denormalised copies of start_datetime/end_datetime so "finished" and "upcoming" can be
+    # filtered in SQL. Kept in sync by save(); bulk writers must call sync_scheduled_times().
+    scheduled_start = models.DateTimeField(null=True, blank=True, editable=False, help_text="Planned start (session date + start time), stored for querying.")
+    scheduled_end = models.DateTimeField(null=True, blank=True, editable=False, help_text="Planned end (start + planned duration), stored for querying.")
+
+    # Last-modified marker and iCalendar SEQUENCE for calendar feeds. sequence is bumped by
+    # save() whenever a field that appears in the published event changes.
+    updated_at = models.DateTimeField(auto_now=True)
+    sequence = models.PositiveIntegerField(default=0, editable=False, help_text="Revision number published as the iCalendar SEQUENCE.")
+
+    SCHEDULE_FIELDS = ('session_date', 'session_start_time', 'planned_duration_minutes')
+    CALENDAR_FIELDS = SCHEDULE_FIELDS + ('school_group_id', 'venue_id', 'is_cancelled')
+    # Fields that decide which AttendanceMonthlySummary month (if any) the session counts towards
+    SUMMARY_FIELDS = ('school_group_id', 'session_date', 'is_cancelled')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded calendar fields so save() can tell whether the event changed
+        instance._loaded_calendar_values = {
+            name: getattr(instance, name) for name in cls.CALENDAR_FIELDS if name in instance.__dict__
+        }
+        return instance
+
     @property
     def start_datetime(self):
         if self.session_date and self.session_start_time:
@@ -143,33 +168,96 @@ class Session(models.Model):
             return start + datetime.timedelta(minutes=self.planned_duration_minutes)
         return None
 
+    def sync_scheduled_times(self):
+        """Copies start_datetime/end_datetime into the stored scheduled_start/scheduled_end fields."""
+        # Values assigned as strings (e.g. '2026-05-04', '15:00') are only parsed by the DB layer
+        self.session_date = self._meta.get_field('session_date').to_python(self.session_date)
+        self.session_start_time = self._meta.get_field('session_start_time').to_python(self.session_start_time)
+        self.scheduled_start = self.start_datetime
+        self.scheduled_end = self.end_datetime
+
+    def _calendar_fields_changed(self):
+        loaded = getattr(self, '_loaded_calendar_values', {})
+        return any(getattr(self, name) != value for name, value in loaded.items())
+
+    def save(self, *args, **kwargs):
+        self.sync_scheduled_times()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = {*update_fields, 'updated_at'}
+            if update_fields & set(self.SCHEDULE_FIELDS):
+                update_fields |= {'scheduled_start', 'scheduled_end'}
+        if self.pk and self._calendar_fields_changed():
+            self.sequence += 1
+            if update_fields is not None:
+                update_fields.add('sequence')
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        loaded = getattr(self, '_loaded_calendar_values', {})
+        summary_changed = any(name in loaded and getattr(self, name) != loaded[name] for name in self.SUMMARY_FIELDS)
+        super().save(*args, **kwargs)
+        if summary_changed:
+            # Moving, regrouping or (un)cancelling changes the totals of the month it left and the one it joined
+            from .stats import refresh_attendance_summaries
+            refresh_attendance_summaries([
+                (loaded.get('school_group_id', self.school_group_id), loaded.get('session_date', self.session_date)),
+                (self.school_group_id, self.session_date),
+            ])
+        self._loaded_calendar_values = {name: getattr(self, name) for name in self.CALENDAR_FIELDS}
+
+    def delete(self, *args, **kwargs):
+        group_month = (self.school_group_id, self.session_date)
+        result = super().delete(*args, **kwargs)
+        from .stats import refresh_attendance_summaries
+        refresh_attendance_summaries([group_month])
+        return result
+
     def get_head_coach(self):
         """
         Returns the Head Coach for this session.
         Logic:
         1. Checks for an explicit 'is_head_coach=True' in SessionCoach.
         2. Fallback: Returns the assigned coach with the highest hourly_rate.
+        Uses prefetched `sessioncoach_set` rows when available instead of querying.
         """
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        if 'sessioncoach_set' in prefetched:
+            return pick_head_coach(prefetched['sessioncoach_set'])
+
         # 1. Check for explicit Head Coach
         explicit_head = self.sessioncoach_set.filter(is_head_coach=True).select_related('coach').first()
         if explicit_head:
             return explicit_head.coach
         
-        # 2. Fallback: Highest hourly_rate
-        # We need to make sure we're looking at ASSIGNED coaches.
-        # coahces_attending uses the SessionCoach through model.
-        # We can query the Coach objects directly via coahces_attending.
-        # Assuming 'hourly_rate' is a field on the Coach model (or its profile).
-        # Based on context, Coach IS the user model or a profile? 
-        # Looking at imports: 'from accounts.models import Coach'
-        # Let's verify if we can order by hourly_rate.
-        
+        # 2. Fallback: Highest hourly_rate among the ASSIGNED coaches
         assigned_coaches = self.coaches_attending.all().order_by('-hourly_rate')
         if assigned_coaches.exists():
             return assigned_coaches.first()
             
         return None
 
+    @classmethod
+    def resolve_head_coaches(cls, sessions):
+        """
+        Bulk version of get_head_coach.
+        Takes a list or queryset of sessions (or session ids) and returns a {session_id: Coach} map
+        built from a single query. Sessions without assigned coaches are omitted.
+        """
+        session_ids = [getattr(s, 'pk', s) for s in sessions]
+        if not session_ids:
+            return {}
+
+        assignments = SessionCoach.objects.filter(session_id__in=session_ids).select_related('coach').order_by(
+            'session_id',
+            '-is_head_coach',
+            models.F('coach__hourly_rate').desc(nulls_last=True),
+            'id',
+        )
+        head_coaches = {}
+        for assignment in assignments:
+            head_coaches.setdefault(assignment.session_id, assignment.coach)
+        return head_coaches
+
     def __str__(self):
         group_name = self.school_group.name if self.school_group else "General"
         start_time_str = self.session_start_time.strftime('%H:%M')
@@ -182,6 +270,32 @@ class Session(models.Model):
         permissions = [
             ("can_view_all_sessions", "Can view all sessions on the calendar"),
         ]
+        indexes = [
+            models.Index(fields=['session_date', 'is_cancelled']),
+            models.Index(fields=['generated_from_rule', 'session_date']),
+            models.Index(fields=['school_group', 'session_date']),
+            models.Index(fields=['scheduled_end', 'is_cancelled']),
+            models.Index(fields=['scheduled_start', 'is_cancelled']),
+        ]
+
+def pick_head_coach(session_coaches):
+    """
+    Applies the Session.get_head_coach rule to already-loaded SessionCoach rows:
+    the explicit head coach if there is one, else the coach with the highest hourly rate.
+    """
+    session_coaches = list(session_coaches)
+    for session_coach in session_coaches:
+        if session_coach.is_head_coach:
+            return session_coach.coach
+    if not session_coaches:
+        return None
+    # Highest hourly rate first; coaches without a rate sort last.
+    ranked = sorted(
+        session_coaches,
+        key=lambda sc: (sc.coach.hourly_rate is None, -(sc.coach.hourly_rate or 0))
+    )
+    return ranked[0].coach
+
 
 # --- NEW MODEL: SessionCoach ---
 class SessionCoach(models.Model):
@@ -192,6 +306,7 @@ class SessionCoach(models.Model):
         help_text="The planned duration this coach will be at the session, in minutes."
     )
     is_head_coach = models.BooleanField(default=False, help_text="Designates if this coach is the Head Coach for the session.")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('session', 'coach')
@@ -229,6 +344,10 @@ class CoachAvailability(models.Model):
     class Meta:
         unique_together = ('coach', 'session')
         ordering = ['session__session_date', 'session__session_start_time', 'coach__username']
+        indexes = [
+            models.Index(fields=['session', 'status']),
+            models.Index(fields=['coach', 'last_action']),
+        ]
         verbose_name = "Coach Availability"
         verbose_name_plural = "Coach Availabilities"
 
@@ -290,13 +409,79 @@ class AttendanceTracking(models.Model):
 
     recorded_at = models.DateTimeField(auto_now=True, help_text="Timestamp of the last update.")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_mark = (instance.__dict__.get('session_id'), instance.__dict__.get('attended'))
+        return instance
+
+    def _refresh_summaries(self, marks):
+        """Refreshes the summary months of the sessions in `marks` ((session_id, attended) pairs) that carry a coach mark."""
+        session_ids = {session_id for session_id, attended in marks if session_id and attended not in (None, self.CoachAttended.UNSET)}
+        if session_ids:
+            from .stats import refresh_attendance_summaries
+            refresh_attendance_summaries(Session.objects.filter(pk__in=session_ids).values_list('school_group_id', 'session_date'))
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_mark', (None, None))
+        super().save(*args, **kwargs)
+        current = (self.session_id, self.attended)
+        if current != loaded:
+            self._refresh_summaries([loaded, current])
+        self._loaded_mark = current
+
+    def delete(self, *args, **kwargs):
+        mark = getattr(self, '_loaded_mark', (self.session_id, self.attended))
+        result = super().delete(*args, **kwargs)
+        self._refresh_summaries([mark])
+        return result
+
     class Meta:
         unique_together = ('session', 'player')
+        indexes = [
+            models.Index(fields=['session', 'attended']),
+            models.Index(fields=['session', 'parent_response']),
+        ]
         verbose_name = "Player Attendance Tracking"
 
     def __str__(self):
         return f"{self.player.full_name} - {self.session.session_date} - Parent: {self.get_parent_response_display()}, Coach: {self.get_attended_display()}"
 
+# --- MODEL: AttendanceMonthlySummary ---
+class AttendanceMonthlySummary(models.Model):
+    """
+    Pre-aggregated coach-marked attendance per school group per month, used by the
+    attendance stats instead of re-joining AttendanceTracking on every profile view.
+
+    Rows with a player hold that player's counts for the group's sessions. The row with
+    player=NULL holds the group totals; its sessions_tracked is the number of non-cancelled
+    sessions in the month where attendance was taken for anyone.
+    Maintained by scheduling.stats.refresh_attendance_summary, which Session and AttendanceTracking
+    call from save()/delete() when a change moves the totals. Queryset update()/delete() and bulk
+    writes bypass that, so bulk writers refresh themselves or run rebuild_attendance_summaries.
+    """
+    school_group = models.ForeignKey('players.SchoolGroup', on_delete=models.CASCADE, related_name='attendance_summaries')
+    player = models.ForeignKey('players.Player', on_delete=models.CASCADE, null=True, blank=True, related_name='attendance_summaries')
+    month = models.DateField(help_text="First day of the summarised month.")
+    sessions_tracked = models.PositiveIntegerField(default=0)
+    sessions_attended = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Attendance Monthly Summary"
+        verbose_name_plural = "Attendance Monthly Summaries"
+        constraints = [
+            models.UniqueConstraint(fields=['school_group', 'player', 'month'], name='unique_player_group_month_attendance'),
+            models.UniqueConstraint(fields=['school_group', 'month'], condition=models.Q(player__isnull=True), name='unique_group_month_attendance'),
+        ]
+        indexes = [
+            models.Index(fields=['player', 'month']),
+        ]
+
+    def __str__(self):
+        who = self.player.full_name if self.player else "All players"
+        return f"{self.school_group} - {who} - {self.month:%Y-%m}: {self.sessions_attended}/{self.sessions_tracked}"
+
 # --- MODEL: SessionNote ---
 class SessionNote(models.Model):
 
@@ -4,7 +4,7 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 # --- FIX: Import EmailMultiAlternatives ---
-from django.core.mail import send_mail, EmailMultiAlternatives
+from django.core.mail import EmailMultiAlternatives
 from django.shortcuts import get_object_or_404, redirect
 from django.template.loader import render_to_string
 from django.urls import reverse
@@ -27,6 +27,7 @@ from django.db.models import Prefetch
 from .models import Session, CoachAvailability, SessionCoach
 # Import the Payslip model
 from finance.models import Payslip
+from core.outbox import enqueue, enqueue_messages
 
 
 # Salt can be customized for better security between apps
@@ -61,49 +62,26 @@ def verify_bulk_confirmation_token(token, max_age_days=2):
     except (BadSignature, SignatureExpired):
         return None
 
-def send_consolidated_session_reminder_email(user, sessions_by_day, is_reminder=False):
+def build_consolidated_session_reminder_email(user, sessions_by_day, is_reminder=False, recipient=None):
     """
-    Sends a single reminder email with ALL assigned sessions for the upcoming days,
-    showing their current confirmation status.
+    Builds (but does not send) the consolidated reminder email for `user`.
+    `sessions_by_day` maps each relevant date to ALL of the user's non-cancelled sessions that
+    day, loaded with `coach_availabilities` and `sessioncoach_set` (with coaches) prefetched,
+    so building runs no queries. `recipient` overrides the user's address (test runs).
+    Returns an EmailMultiAlternatives, or None if there is nothing to send.
     """
-    if not user.email:
+    recipient = recipient or user.email
+    if not recipient:
         print(f"Cannot send email: User {user.username} has no email address.")
-        return False
+        return None
 
     site_url = getattr(settings, 'APP_SITE_URL', 'http://127.0.0.1:8000')
     subject_verb = "Reminder" if is_reminder else "Confirmation Required"
-
-    # Get all days included in the initial (unresponded) list
-    relevant_dates = sorted(list(sessions_by_day.keys())) # Ensure consistent order
+    relevant_dates = sorted(day for day, sessions in sessions_by_day.items() if sessions) # Ensure consistent order
 
     if not relevant_dates:
         print(f"No relevant dates found for reminder email to {user.username}.")
-        return False # Should not happen based on trigger script, but safety check
-
-    # --- NEW: Re-query ALL assigned sessions for these specific days ---
-    all_assigned_sessions_for_days = Session.objects.filter(
-        coaches_attending__user=user,
-        session_date__in=relevant_dates,
-        is_cancelled=False
-    ).select_related('school_group', 'venue').prefetch_related(
-        # Prefetch the specific coach's availability status
-        Prefetch(
-            'coach_availabilities',
-            queryset=CoachAvailability.objects.filter(coach=user),
-            to_attr='my_availability'
-        ),
-        # Prefetch the SessionCoach entry to get duration
-        Prefetch(
-            'sessioncoach_set',
-            queryset=SessionCoach.objects.filter(coach__user=user),
-            to_attr='my_session_coach_assignment'
-        )
-    ).order_by('session_date', 'session_start_time')
-
-    # --- NEW: Group ALL fetched sessions by day ---
-    all_sessions_grouped_by_day = defaultdict(list)
-    for session in all_assigned_sessions_for_days:
-        all_sessions_grouped_by_day[session.session_date].append(session)
+        return None
 
     # Generate a subject that covers all relevant days
     day_names = [day.strftime('%a, %d %b') for day in relevant_dates]
@@ -112,21 +90,16 @@ def send_consolidated_session_reminder_email(user, sessions_by_day, is_reminder=
 
     context = {
         'coach_name': user.first_name or user.username,
-        'sessions_by_day': {}, # This will be rebuilt below
+        'sessions_by_day': {},
         'is_reminder': is_reminder,
         'site_name': getattr(settings, 'SITE_NAME', 'SquashSync'),
     }
 
-    # --- NEW: Build context using ALL sessions for the days ---
     for day in relevant_dates:
-        sessions_for_this_day = all_sessions_grouped_by_day.get(day, [])
-        if not sessions_for_this_day:
-            continue # Skip if somehow no sessions were found for this day
-
         session_details_with_status = []
-        for session in sessions_for_this_day:
+        for session in sessions_by_day[day]:
             # Determine current status
-            availability = session.my_availability[0] if session.my_availability else None
+            availability = next((a for a in session.coach_availabilities.all() if a.coach_id == user.id), None)
             status = "Pending"
             if availability:
                 if availability.status == CoachAvailability.Status.UNAVAILABLE:
@@ -135,34 +108,61 @@ def send_consolidated_session_reminder_email(user, sessions_by_day, is_reminder=
                     status = "Confirmed"
 
             # Get duration
-            assignment = session.my_session_coach_assignment[0] if session.my_session_coach_assignment else None
+            assignment = next((sc for sc in session.sessioncoach_set.all() if sc.coach.user_id == user.id), None)
             duration = assignment.coaching_duration_minutes if assignment else session.planned_duration_minutes
+            head_coach = session.get_head_coach()
 
             session_details_with_status.append({
                 'session_obj': session,
                 'duration': duration,
                 'status': status, # Add the current status
-                'is_head_coach': getattr(session.get_head_coach(), 'user', None) == user,
+                'is_head_coach': getattr(head_coach, 'user_id', None) == user.id,
             })
 
-        # Generate bulk action tokens (remain the same)
+        # Generate bulk action tokens
         token = create_bulk_confirmation_token(user.id, day)
         date_str = day.strftime('%Y-%m-%d')
         context['sessions_by_day'][day] = {
-            'sessions': session_details_with_status, # Use the new list with statuses
+            'sessions': session_details_with_status,
             'confirm_url': site_url + reverse('scheduling:confirm_all_for_day', args=[date_str, token]),
             'decline_url': site_url + reverse('scheduling:decline_all_for_day_reason', args=[date_str, token]),
         }
 
     html_message = render_to_string('scheduling/emails/consolidated_session_reminder.html', context)
+    email = EmailMultiAlternatives(subject=subject, body='', from_email=settings.DEFAULT_FROM_EMAIL, to=[recipient])
+    email.attach_alternative(html_message, "text/html")
+    return email
 
-    try:
-        send_mail(subject, '', settings.DEFAULT_FROM_EMAIL, [user.email], html_message=html_message)
-        print(f"Sent consolidated reminder (showing all sessions) to {user.email}.")
-        return True
-    except Exception as e:
-        print(f"Error sending consolidated reminder to {user.email}: {e}")
+
+def send_consolidated_session_reminder_email(user, sessions_by_day, is_reminder=False):
+    """
+    Queues a single reminder email with ALL assigned sessions for the upcoming days,
+    showing their current confirmation status. The send_outbox worker delivers it.
+    """
+    relevant_dates = list(sessions_by_day.keys())
+
+    # Re-query ALL assigned sessions for these specific days
+    all_assigned_sessions_for_days = Session.objects.filter(
+        coaches_attending__user=user,
+        session_date__in=relevant_dates,
+        is_cancelled=False
+    ).select_related('school_group', 'venue').prefetch_related(
+        # The specific coach's availability status
+        Prefetch('coach_availabilities', queryset=CoachAvailability.objects.filter(coach=user)),
+        # Every assignment, for durations and the head coach
+        Prefetch('sessioncoach_set', queryset=SessionCoach.objects.select_related('coach'))
+    ).order_by('session_date', 'session_start_time')
+
+    all_sessions_grouped_by_day = defaultdict(list)
+    for session in all_assigned_sessions_for_days:
+        all_sessions_grouped_by_day[session.session_date].append(session)
+
+    email = build_consolidated_session_reminder_email(user, all_sessions_grouped_by_day, is_reminder)
+    if not email:
         return False
+    enqueue_messages([email], category='session_reminder')
+    print(f"Queued consolidated reminder (showing all sessions) for {user.email}.")
+    return True
 
 # --- THIS IS THE UPDATED FUNCTION ---
 
@@ -224,7 +224,7 @@ def send_payslip_email(payslip: Payslip):
 
 def send_coach_decline_notification_email(declining_coach, session, reason):
     """
-    Sends a notification to all superusers when a coach declines a session.
+    Queues a notification to all superusers when a coach declines a session.
     """
     superusers = User.objects.filter(is_superuser=True, is_active=True)
     recipient_list = [user.email for user in superusers if user.email]
@@ -249,13 +249,9 @@ def send_coach_decline_notification_email(declining_coach, session, reason):
     
     html_message = render_to_string('scheduling/emails/admin_decline_notification.html', context)
 
-    try:
-        send_mail(subject, '', settings.DEFAULT_FROM_EMAIL, recipient_list, html_message=html_message)
-        print(f"Sent decline notification to {len(recipient_list)} admin(s) for session {session.id}.")
-        return True
-    except Exception as e:
-        print(f"Error sending admin decline notification: {e}")
-        return False
+    enqueue(subject, '', recipient_list, html_message=html_message, category='decline_notification')
+    print(f"Queued decline notification for {len(recipient_list)} admin(s) for session {session.id}.")
+    return True
 
 # Your views seem correct but ensure they are in a `views.py` file within the `scheduling` app
 # and that your urls.py is configured to point to them.
@@ -0,0 +1,239 @@
+# scheduling/reminders.py
+
+import datetime
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Prefetch
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.html import escape
+
+from .models import AttendanceTracking, Session, SessionCoach
+from .notifications import build_consolidated_session_reminder_email, player_attendance_signer
+from core.outbox import TokenBucket
+from players.models import Player
+
+RESPONDED_ACTIONS = ('CONFIRM', 'DECLINE')
+
+
+def collect_coach_reminders(now):
+    """
+    Stage 1 of the coach reminder run: works out who needs a reminder for sessions later today
+    or tomorrow, in three queries whatever the number of coaches (sessions, assignments with
+    coaches and users, availabilities).
+
+    Returns [(coach_user, sessions_by_day)] where sessions_by_day holds, for every day on which
+    the coach has at least one session they haven't confirmed or declined, ALL of the coach's
+    sessions that day, ready for build_consolidated_session_reminder_email().
+    """
+    today = now.date()
+    tomorrow = today + datetime.timedelta(days=1)
+    sessions = Session.objects.filter(
+        session_date__in=[today, tomorrow],
+        is_cancelled=False
+    ).select_related('school_group', 'venue').prefetch_related(
+        Prefetch('sessioncoach_set', queryset=SessionCoach.objects.select_related('coach__user')),
+        'coach_availabilities'
+    ).order_by('session_date', 'session_start_time')
+
+    users = {}
+    sessions_by_user = defaultdict(lambda: defaultdict(list))
+    days_to_remind = defaultdict(set)
+    for session in sessions:
+        needs_reminder = session.session_date == tomorrow or session.session_start_time >= now.time()
+        responded = {a.coach_id for a in session.coach_availabilities.all() if a.last_action in RESPONDED_ACTIONS}
+        for assignment in session.sessioncoach_set.all():
+            user = assignment.coach.user
+            if not user:
+                continue
+            users[user.id] = user
+            sessions_by_user[user.id][session.session_date].append(session)
+            if needs_reminder and user.id not in responded:
+                days_to_remind[user.id].add(session.session_date)
+
+    return [
+        (users[user_id], {day: sessions_by_user[user_id][day] for day in sorted(days)})
+        for user_id, days in sorted(days_to_remind.items(), key=lambda item: users[item[0]].username)
+    ]
+
+
+def build_coach_reminder_emails(reminders, is_reminder=True, recipient_override=None):
+    """
+    Stage 2: renders one consolidated email per (coach_user, sessions_by_day) from the preloaded
+    data, without further queries. Returns [(coach_user, email)], skipping coaches without an address.
+    """
+    emails = []
+    for user, sessions_by_day in reminders:
+        email = build_consolidated_session_reminder_email(user, sessions_by_day, is_reminder=is_reminder, recipient=recipient_override)
+        if email:
+            emails.append((user, email))
+    return emails
+
+
+# Placeholders rendered into a session's player reminder and swapped for each player's values.
+PLAYER_NAME_SLOT = 'reminderslotplayername'
+ATTEND_URL_SLOT = 'reminderslotattendurl'
+DECLINE_URL_SLOT = 'reminderslotdeclineurl'
+TOKEN_SLOT = 'reminderslottoken'
+
+
+class PlayerReminderTemplate:
+    """
+    The player attendance reminder for one session, rendered once with placeholders for the
+    per-player fields. build() fills them in with string replacement and fresh response tokens,
+    producing the same email as notifications.build_player_attendance_email().
+    """
+
+    def __init__(self, session):
+        self.session = session
+        site_url = getattr(settings, 'APP_SITE_URL', 'http://127.0.0.1:8000')
+        self.response_url = site_url + reverse('scheduling:player_attendance_response', args=[TOKEN_SLOT])
+        self.subject = f"Squash Session Reminder for {PLAYER_NAME_SLOT} - {session.session_date.strftime('%A, %d %b')}"
+        self.html = render_to_string('scheduling/emails/player_attendance_reminder.html', {
+            'player': {'first_name': PLAYER_NAME_SLOT},
+            'session': session,
+            'url_attend': ATTEND_URL_SLOT,
+            'url_decline': DECLINE_URL_SLOT,
+            'site_name': getattr(settings, 'SITE_NAME', 'SquashSync'),
+        })
+
+    def build(self, player, tracking_id):
+        url_attend = self.response_url.replace(TOKEN_SLOT, player_attendance_signer.sign(f"{tracking_id}:ATTENDING"))
+        url_decline = self.response_url.replace(TOKEN_SLOT, player_attendance_signer.sign(f"{tracking_id}:NOT_ATTENDING"))
+        html_message = (
+            self.html
+            .replace(PLAYER_NAME_SLOT, escape(player.first_name))
+            .replace(ATTEND_URL_SLOT, escape(url_attend))
+            .replace(DECLINE_URL_SLOT, escape(url_decline))
+        )
+        email = EmailMultiAlternatives(
+            subject=self.subject.replace(PLAYER_NAME_SLOT, player.first_name),
+            body='',
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[player.notification_email]
+        )
+        email.attach_alternative(html_message, "text/html")
+        return email
+
+
+def collect_player_reminders(sessions, create_tracking=True):
+    """
+    Works out every (session, player) reminder for `sessions`: active players in the session's
+    group with a notification email. Tracking records (whose ids go into the response tokens)
+    are loaded with one query and the missing ones bulk-created, unless create_tracking is False
+    (dry runs), in which case new pairs get tracking_id None.
+    Returns [(session, player, tracking_id)].
+    """
+    sessions = list(sessions.filter(school_group__isnull=False).select_related('school_group', 'venue').prefetch_related(
+        Prefetch(
+            'school_group__players',
+            queryset=Player.objects.filter(is_active=True, notification_email__isnull=False).exclude(notification_email=''),
+            to_attr='reminder_players'
+        )
+    ))
+    tracking_ids = {
+        (session_id, player_id): record_id
+        for session_id, player_id, record_id in AttendanceTracking.objects.filter(
+            session__in=sessions
+        ).values_list('session_id', 'player_id', 'id')
+    }
+
+    reminders = []
+    for session in sessions:
+        for player in session.school_group.reminder_players:
+            reminders.append((session, player, tracking_ids.get((session.id, player.id))))
+
+    missing = [AttendanceTracking(session=session, player=player) for session, player, record_id in reminders if record_id is None]
+    if missing and create_tracking:
+        AttendanceTracking.objects.bulk_create(missing, ignore_conflicts=True)
+        # ignore_conflicts doesn't return ids, so read back the rows just written
+        tracking_ids.update({
+            (session_id, player_id): record_id
+            for session_id, player_id, record_id in AttendanceTracking.objects.filter(
+                session__in={record.session_id for record in missing},
+                player__in={record.player_id for record in missing}
+            ).values_list('session_id', 'player_id', 'id')
+        })
+        reminders = [(session, player, tracking_ids.get((session.id, player.id))) for session, player, _ in reminders]
+    return reminders
+
+
+def send_player_reminders(sessions, dry_run=False, connection=None, workers=None, rate_per_second=None, burst=None, sleep=time.sleep, progress=None):
+    """
+    Sends the attendance reminder to every verified player in each session's group.
+
+    Each session's email is rendered once (PlayerReminderTemplate); a thread pool fills in the
+    per-player fields and signs tokens, and built messages are streamed to one connection as
+    they come out of the pool, paced by a token bucket (rate_per_second, 0 disables it).
+    A failed send is reported through progress(player, session, error) and doesn't stop the run.
+    With dry_run nothing is written or sent, but every email is still built so the timing holds.
+
+    Returns {'sessions', 'emails', 'sent', 'failed', 'render_ms', 'send_ms', 'seconds', 'emails_per_second'}.
+    """
+    workers = workers or settings.PLAYER_REMINDER_WORKERS
+    rate_per_second = settings.PLAYER_REMINDER_RATE_PER_SECOND if rate_per_second is None else rate_per_second
+    burst = burst or settings.PLAYER_REMINDER_BURST
+    limiter = TokenBucket(rate_per_second, burst=burst, sleep=sleep) if rate_per_second else None
+
+    started = time.perf_counter()
+    reminders = collect_player_reminders(sessions, create_tracking=not dry_run)
+
+    render_started = time.perf_counter()
+    templates = {}
+    for session, _, _ in reminders:
+        if session.id not in templates:
+            templates[session.id] = PlayerReminderTemplate(session)
+    render_seconds = time.perf_counter() - render_started
+
+    def build(reminder):
+        session, player, tracking_id = reminder
+        build_started = time.perf_counter()
+        email = templates[session.id].build(player, tracking_id)
+        return reminder, email, time.perf_counter() - build_started
+
+    stats = {'sessions': len(templates), 'emails': len(reminders), 'sent': 0, 'failed': 0}
+    send_seconds = 0.0
+    connection = connection or get_connection()
+    is_open = False
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for (session, player, _), email, build_seconds in executor.map(build, reminders):
+                render_seconds += build_seconds
+                if dry_run:
+                    if progress:
+                        progress(player, session, None)
+                    continue
+                if limiter:
+                    limiter.wait()
+                send_started = time.perf_counter()
+                try:
+                    if not is_open:
+                        connection.open()
+                        is_open = True
+                    connection.send_messages([email])
+                    stats['sent'] += 1
+                    error = None
+                except Exception as e:
+                    stats['failed'] += 1
+                    error = e
+                    connection.close()
+                    is_open = False
+                send_seconds += time.perf_counter() - send_started
+                if progress:
+                    progress(player, session, error)
+    finally:
+        if is_open:
+            connection.close()
+
+    seconds = time.perf_counter() - started
+    stats.update({
+        'render_ms': round(render_seconds * 1000, 1),
+        'send_ms': round(send_seconds * 1000, 1),
+        'seconds': round(seconds, 3),
+        'emails_per_second': round((stats['emails'] if dry_run else stats['sent']) / seconds, 1) if seconds else 0.0,
+    })
+    return stats
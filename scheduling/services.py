@@ -1,5 +1,13 @@
-from .models import Session, AttendanceTracking
-from players.models import Player
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from .models import Session, AttendanceTracking, CoachAvailability, SessionCoach
+from players.models import Player, SchoolGroup, AttendanceDiscrepancy
+from .stats import refresh_attendance_summary
 
 class SessionService:
     @staticmethod
@@ -89,3 +97,423 @@ class SessionService:
             all_players_for_display.sort(key=lambda p: p['name'])
             
         return all_players_for_display, players_for_grouping
+
+
+class StaffingService:
+    @staticmethod
+    def attach_session_counts(sessions):
+        """
+        Attaches per-session counts used by the staffing board, for a whole list of sessions at once:
+        - `total_players`: active players in the session's school group
+        - `confirmed_players_count`: ATTENDING parent responses for the session
+        - `head_coach`: resolved from the prefetched `sessioncoach_set` (see Session.get_head_coach)
+        Runs two grouped aggregate queries regardless of the number of sessions.
+        """
+        sessions = list(sessions)
+        if not sessions:
+            return sessions
+
+        group_ids = {s.school_group_id for s in sessions if s.school_group_id}
+        active_players_by_group = dict(
+            SchoolGroup.objects.filter(id__in=group_ids).annotate(
+                active_players=Count('players', filter=Q(players__is_active=True))
+            ).values_list('id', 'active_players')
+        ) if group_ids else {}
+
+        attending_by_session = dict(
+            AttendanceTracking.objects.filter(
+                session_id__in=[s.id for s in sessions],
+                parent_response=AttendanceTracking.ParentResponse.ATTENDING
+            ).values('session_id').annotate(total=Count('id')).values_list('session_id', 'total')
+        )
+
+        for session in sessions:
+            session.total_players = active_players_by_group.get(session.school_group_id, 0) if session.school_group_id else 0
+            session.confirmed_players_count = attending_by_session.get(session.id, 0)
+            session.head_coach = session.get_head_coach()
+
+        return sessions
+
+    @staticmethod
+    def apply_assignment_changes(changes):
+        """
+        Sets the assigned coaches of many sessions in one transaction.
+        `changes` maps Session -> (coach_ids, head_coach_id). Unchanged assignments keep their row
+        (and any custom duration); removed ones go in one delete, new ones in one bulk_create and
+        head coach flag changes in one bulk_update.
+        Returns {session_id: {'added': set, 'removed': set, 'durations': {coach_id: minutes}}}.
+        """
+        sessions_by_id = {session.id: session for session in changes}
+        existing = defaultdict(dict)
+        for assignment in SessionCoach.objects.filter(session_id__in=sessions_by_id):
+            existing[assignment.session_id][assignment.coach_id] = assignment
+
+        to_delete, to_create, to_update = [], [], []
+        deltas = {}
+        for session, (coach_ids, head_coach_id) in changes.items():
+            current = existing[session.id]
+            wanted = set(coach_ids)
+            for coach_id, assignment in current.items():
+                if coach_id not in wanted:
+                    to_delete.append(assignment.id)
+                elif assignment.is_head_coach != (coach_id == head_coach_id):
+                    assignment.is_head_coach = coach_id == head_coach_id
+                    to_update.append(assignment)
+            added = [coach_id for coach_id in coach_ids if coach_id not in current]
+            to_create.extend(
+                SessionCoach(
+                    session=session,
+                    coach_id=coach_id,
+                    coaching_duration_minutes=session.planned_duration_minutes,
+                    is_head_coach=coach_id == head_coach_id
+                )
+                for coach_id in added
+            )
+            durations = {coach_id: a.coaching_duration_minutes for coach_id, a in current.items() if coach_id in wanted}
+            durations.update({coach_id: session.planned_duration_minutes for coach_id in added})
+            deltas[session.id] = {'added': set(added), 'removed': set(current) - wanted, 'durations': durations}
+
+        with transaction.atomic():
+            if to_delete:
+                SessionCoach.objects.filter(pk__in=to_delete).delete()
+            if to_create:
+                SessionCoach.objects.bulk_create(to_create)
+            if to_update:
+                # bulk_update skips auto_now, so stamp the rows for the calendar feed/snapshot versions
+                now = timezone.now()
+                for assignment in to_update:
+                    assignment.updated_at = now
+                SessionCoach.objects.bulk_update(to_update, ['is_head_coach', 'updated_at'])
+        return deltas
+
+
+class WeekSnapshotService:
+    """
+    Loads one Monday-Sunday week of non-cancelled sessions with their assignments and
+    availabilities, grouped per day and sorted for display. Shared by the staffing board
+    and the staffing overview modal.
+    """
+    DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+    @staticmethod
+    def week_start_for(day):
+        return day - timedelta(days=day.weekday())
+
+    @staticmethod
+    def sort_day_sessions(sessions):
+        """
+        Orders one day's sessions for display: sessions are grouped by venue and sorted by
+        start time within each venue, and venue groups are ordered by their earliest session.
+        """
+        sessions_by_venue = defaultdict(list)
+        for session in sessions:
+            sessions_by_venue[session.venue_id or 'no_venue'].append(session)
+
+        venue_groups = sorted(
+            (sorted(venue_sessions, key=lambda s: s.session_start_time) for venue_sessions in sessions_by_venue.values()),
+            key=lambda venue_sessions: venue_sessions[0].session_start_time
+        )
+        return [session for venue_sessions in venue_groups for session in venue_sessions]
+
+    @staticmethod
+    def week_version(week_start):
+        """
+        Revision stamp of everything the snapshot shows, taken with one aggregate query.
+        Edits move a timestamp (including renamed venues and groups, and edited coaches, whose
+        rates pick the fallback head coach); deleted sessions, assignments or availabilities
+        change a count.
+        """
+        stamp = Session.objects.filter(
+            session_date__range=[week_start, week_start + timedelta(days=6)]
+        ).aggregate(
+            sessions_changed=Max('updated_at'),
+            sessions=Count('id', distinct=True),
+            assignments_changed=Max('sessioncoach__updated_at'),
+            assignments=Count('sessioncoach', distinct=True),
+            availability_changed=Max('coach_availabilities__timestamp'),
+            availabilities=Count('coach_availabilities', distinct=True),
+            venues_changed=Max('venue__updated_at'),
+            groups_changed=Max('school_group__updated_at'),
+            coaches_changed=Max('sessioncoach__coach__updated_at'),
+        )
+        return tuple(stamp[key] for key in sorted(stamp))
+
+    @staticmethod
+    def load_week(week_start):
+        """
+        Builds the snapshot for the week starting on `week_start` (a Monday) in a constant
+        number of queries:
+        {'week_start', 'week_end', 'sessions': [...], 'days': [{'day_name', 'date', 'sessions': [...]}]}
+        Sessions come with `sessioncoach_set__coach__user` and `coach_availabilities` prefetched.
+        """
+        week_end = week_start + timedelta(days=6)
+        sessions = list(
+            Session.objects.filter(
+                session_date__range=[week_start, week_end],
+                is_cancelled=False
+            ).select_related(
+                'school_group', 'venue'
+            ).prefetch_related(
+                'sessioncoach_set__coach__user',
+                'coach_availabilities'
+            )
+        )
+
+        sessions_by_date = defaultdict(list)
+        for session in sessions:
+            sessions_by_date[session.session_date].append(session)
+
+        days = []
+        for offset, day_name in enumerate(WeekSnapshotService.DAY_NAMES):
+            current_day = week_start + timedelta(days=offset)
+            days.append({
+                'day_name': day_name,
+                'date': current_day,
+                'sessions': WeekSnapshotService.sort_day_sessions(sessions_by_date[current_day]),
+            })
+
+        return {'week_start': week_start, 'week_end': week_end, 'sessions': sessions, 'days': days}
+
+    @staticmethod
+    def get_week(week_start, use_cache=True):
+        """
+        Returns load_week(week_start), cached per week. The cached snapshot is reused while
+        week_version() is unchanged, so it is rebuilt as soon as anything it shows for that
+        week changes.
+        """
+        if not use_cache:
+            return WeekSnapshotService.load_week(week_start)
+
+        version = WeekSnapshotService.week_version(week_start)
+        cache_key = f"week_snapshot:{week_start.isoformat()}"
+        cached = cache.get(cache_key)
+        if cached and cached['version'] == version:
+            return cached['snapshot']
+
+        snapshot = WeekSnapshotService.load_week(week_start)
+        cache.set(cache_key, {'version': version, 'snapshot': snapshot}, settings.WEEK_SNAPSHOT_CACHE_SECONDS)
+        return snapshot
+
+
+class AvailabilityService:
+    @staticmethod
+    def apply_bulk_availability(user, rule_statuses, start_date, end_date):
+        """
+        Sets the coach's availability for every non-cancelled session generated from the given
+        rules between start_date and end_date. `rule_statuses` maps rule_id -> CoachAvailability status.
+        Only sessions from tomorrow onwards are touched (today and past sessions are historical).
+
+        Loads the sessions and the coach's existing rows once, then writes only the rows whose
+        status differs in a single upsert. Returns the number of rows actually changed.
+        """
+        future_start_date = max(start_date, timezone.now().date() + timedelta(days=1))
+
+        session_rules = dict(
+            Session.objects.filter(
+                generated_from_rule_id__in=list(rule_statuses),
+                session_date__gte=future_start_date,
+                session_date__lte=end_date,
+                is_cancelled=False
+            ).values_list('id', 'generated_from_rule_id')
+        )
+        if not session_rules:
+            return 0
+
+        current_statuses = dict(
+            CoachAvailability.objects.filter(
+                coach=user, session_id__in=list(session_rules)
+            ).values_list('session_id', 'status')
+        )
+
+        changes = [
+            CoachAvailability(coach=user, session_id=session_id, status=rule_statuses[rule_id])
+            for session_id, rule_id in session_rules.items()
+            if current_statuses.get(session_id) != rule_statuses[rule_id]
+        ]
+        if changes:
+            with transaction.atomic():
+                # New rows are inserted; existing rows only get their status (and timestamp) replaced
+                CoachAvailability.objects.bulk_create(
+                    changes,
+                    update_conflicts=True,
+                    unique_fields=['coach', 'session'],
+                    update_fields=['status', 'timestamp']
+                )
+        return len(changes)
+
+    @staticmethod
+    def save_session_availability(user, submitted):
+        """
+        Saves the weekly availability form. `submitted` maps session_id -> (status, notes).
+        Rows that already hold the submitted status and notes are skipped; everything else is
+        written with one upsert. Returns (updated_count, missing_session_ids).
+        """
+        submitted = {
+            session_id: (status, notes) for session_id, (status, notes) in submitted.items()
+            if status in CoachAvailability.Status.values
+        }
+        if not submitted:
+            return 0, []
+
+        known_session_ids = set(Session.objects.filter(id__in=list(submitted)).values_list('id', flat=True))
+        current = {
+            session_id: (status, notes)
+            for session_id, status, notes in CoachAvailability.objects.filter(
+                coach=user, session_id__in=list(known_session_ids)
+            ).values_list('session_id', 'status', 'notes')
+        }
+
+        changes = [
+            CoachAvailability(coach=user, session_id=session_id, status=status, notes=notes)
+            for session_id, (status, notes) in submitted.items()
+            if session_id in known_session_ids
+            and (status, notes) != current.get(session_id, (CoachAvailability.Status.PENDING, ""))
+        ]
+        if changes:
+            with transaction.atomic():
+                CoachAvailability.objects.bulk_create(
+                    changes,
+                    update_conflicts=True,
+                    unique_fields=['coach', 'session'],
+                    update_fields=['status', 'notes', 'timestamp']
+                )
+        missing_session_ids = sorted(set(submitted) - known_session_ids)
+        return len(changes), missing_session_ids
+
+    @staticmethod
+    def ensure_pending_availability(user, sessions, coach):
+        """
+        Creates PENDING availability rows for sessions the coach is assigned to but hasn't
+        answered yet, in one bulk insert. Expects `sessions` to have `coaches_attending` and the
+        coach's availability prefetched into `my_availability`; the new rows are appended there
+        so callers can render them without re-querying.
+        """
+        missing = [
+            session for session in sessions
+            if not session.my_availability and coach in session.coaches_attending.all()
+        ]
+        if not missing:
+            return 0
+
+        new_rows = [
+            CoachAvailability(coach=user, session=session, status=CoachAvailability.Status.PENDING)
+            for session in missing
+        ]
+        CoachAvailability.objects.bulk_create(new_rows, ignore_conflicts=True)
+        for session, row in zip(missing, new_rows):
+            session.my_availability = [row]
+        return len(new_rows)
+
+
+class AttendanceCommitService:
+    @staticmethod
+    def _discrepancy_type(parent_response, final_attendance):
+        if parent_response == AttendanceTracking.ParentResponse.ATTENDING and final_attendance == AttendanceTracking.CoachAttended.NO:
+            return AttendanceDiscrepancy.DiscrepancyType.NO_SHOW
+        if parent_response == AttendanceTracking.ParentResponse.NOT_ATTENDING and final_attendance == AttendanceTracking.CoachAttended.YES:
+            return AttendanceDiscrepancy.DiscrepancyType.UNEXPECTED
+        if parent_response == AttendanceTracking.ParentResponse.PENDING and final_attendance == AttendanceTracking.CoachAttended.NO:
+            return AttendanceDiscrepancy.DiscrepancyType.NEVER_NOTIFIED
+        return None
+
+    @staticmethod
+    def commit(session, attending_player_ids):
+        """
+        Records final coach-marked attendance for every active player in the session's group:
+        players in `attending_player_ids` are YES, everyone else NO. Discrepancies against the
+        parent responses are created, updated or cleared to match.
+
+        Tracking and discrepancy rows are loaded once, the new state is computed in memory and
+        written with bulk_create/bulk_update and a single delete inside one transaction.
+        Returns a summary dict of what changed.
+        """
+        attending = set()
+        for player_id in attending_player_ids:
+            try:
+                attending.add(int(player_id))
+            except (TypeError, ValueError):
+                continue
+
+        player_ids = list(session.school_group.players.filter(is_active=True).values_list('id', flat=True))
+        tracking = {
+            record.player_id: record
+            for record in AttendanceTracking.objects.filter(session=session, player_id__in=player_ids)
+        }
+        discrepancies = {
+            discrepancy.player_id: discrepancy
+            for discrepancy in AttendanceDiscrepancy.objects.filter(session=session, player_id__in=player_ids)
+        }
+
+        now = timezone.now()
+        final = {
+            player_id: AttendanceTracking.CoachAttended.YES if player_id in attending else AttendanceTracking.CoachAttended.NO
+            for player_id in player_ids
+        }
+        tracking_to_create, tracking_to_update = [], []
+        discrepancies_to_create, discrepancies_to_update, discrepancy_ids_to_delete = [], [], []
+        open_discrepancies = 0
+
+        for player_id in player_ids:
+            record = tracking.get(player_id)
+            if record is None:
+                tracking[player_id] = AttendanceTracking(session=session, player_id=player_id, attended=final[player_id])
+                tracking_to_create.append(tracking[player_id])
+            elif record.attended != final[player_id]:
+                record.attended = final[player_id]
+                record.recorded_at = now
+                tracking_to_update.append(record)
+
+        with transaction.atomic():
+            if tracking_to_create:
+                # A parent may respond between the read above and this insert; their row wins the
+                # insert and gets the coach's mark (and its parent response) applied below instead.
+                AttendanceTracking.objects.bulk_create(tracking_to_create, ignore_conflicts=True)
+                created_ids = [record.player_id for record in tracking_to_create]
+                for record in AttendanceTracking.objects.filter(session=session, player_id__in=created_ids):
+                    tracking[record.player_id] = record
+                    if record.attended != final[record.player_id]:
+                        record.attended = final[record.player_id]
+                        record.recorded_at = now
+                        tracking_to_update.append(record)
+            if tracking_to_update:
+                AttendanceTracking.objects.bulk_update(tracking_to_update, ['attended', 'recorded_at'])
+
+            for player_id in player_ids:
+                record, final_attendance = tracking[player_id], final[player_id]
+                discrepancy_type = AttendanceCommitService._discrepancy_type(record.parent_response, final_attendance)
+                existing = discrepancies.get(player_id)
+                if discrepancy_type:
+                    open_discrepancies += 1
+                if discrepancy_type is None:
+                    if existing:
+                        discrepancy_ids_to_delete.append(existing.id)
+                elif existing is None:
+                    discrepancies_to_create.append(AttendanceDiscrepancy(
+                        player_id=player_id, session=session, discrepancy_type=discrepancy_type,
+                        parent_response=record.parent_response, coach_marked_attendance=final_attendance
+                    ))
+                elif (existing.discrepancy_type, existing.parent_response, existing.coach_marked_attendance) != (discrepancy_type, record.parent_response, final_attendance):
+                    existing.discrepancy_type = discrepancy_type
+                    existing.parent_response = record.parent_response
+                    existing.coach_marked_attendance = final_attendance
+                    existing.recorded_at = now
+                    discrepancies_to_update.append(existing)
+
+            if discrepancies_to_create:
+                AttendanceDiscrepancy.objects.bulk_create(discrepancies_to_create)
+            if discrepancies_to_update:
+                AttendanceDiscrepancy.objects.bulk_update(
+                    discrepancies_to_update, ['discrepancy_type', 'parent_response', 'coach_marked_attendance', 'recorded_at']
+                )
+            if discrepancy_ids_to_delete:
+                AttendanceDiscrepancy.objects.filter(id__in=discrepancy_ids_to_delete).delete()
+            if tracking_to_create or tracking_to_update:
+                refresh_attendance_summary(session.school_group_id, session.session_date)
+
+        return {
+            'players': len(player_ids),
+            'attended': len(attending.intersection(player_ids)),
+            'attendance_changed': len({record.player_id for record in tracking_to_create + tracking_to_update}),
+            'discrepancies': open_discrepancies,
+            'discrepancies_cleared': len(discrepancy_ids_to_delete),
+        }
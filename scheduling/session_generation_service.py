@@ -1,21 +1,39 @@
 # scheduling/session_generation_service.py
 
+import time
 from datetime import date, timedelta
 from django.db import transaction
 
 # Import models from their correct new app locations
-from .models import ScheduledClass, Session
+from .models import ScheduledClass, Session, SessionCoach
 from players.models import Player
 from accounts.models import Coach
 
+GENERATION_BATCH_SIZE = 500
+
+
+def _rule_dates(rule, period_start_date, period_end_date):
+    """Yields every date in the period that falls on the rule's day of week."""
+    offset = (rule.day_of_week - period_start_date.weekday()) % 7
+    current_date = period_start_date + timedelta(days=offset)
+    while current_date <= period_end_date:
+        yield current_date
+        current_date += timedelta(days=7)
+
+
 def generate_sessions_for_rules(
     scheduled_classes_qs,
     period_start_date: date,
     period_end_date: date,
-    overwrite_existing_non_generated: bool = False
+    overwrite_existing_non_generated: bool = False,
+    batch_size: int = GENERATION_BATCH_SIZE
 ):
     """
     Generates Session instances based on ScheduledClass rules for a given date range.
+
+    All rule x date candidates are planned in memory. Existing generated sessions and clashing
+    manual sessions for the whole period are loaded with one query each, then new sessions,
+    their SessionCoach rows and attendee rows are written with bulk_create in batches.
     """
     sessions_created_count = 0
     sessions_skipped_exists_count = 0
@@ -24,69 +42,131 @@ def generate_sessions_for_rules(
 
     if period_start_date > period_end_date:
         action_details.append(f"Error: Start date ({period_start_date}) cannot be after end date ({period_end_date}).")
-        return {'created': 0, 'skipped_exists': 0, 'errors': 1, 'details': action_details}
+        return {'created': 0, 'skipped_exists': 0, 'errors': 1, 'details': action_details, 'stats': {}}
+
+    started = time.perf_counter()
+
+    rules = list(
+        scheduled_classes_qs.filter(is_active=True)
+        .select_related('school_group', 'default_venue')
+        .prefetch_related('default_coaches')
+    )
+    rule_ids = [rule.id for rule in rules]
+    group_ids = {rule.school_group_id for rule in rules if rule.school_group_id}
+
+    # --- 1. Load existing state for the whole period ---
+    existing_generated = set(
+        Session.objects.filter(
+            generated_from_rule_id__in=rule_ids,
+            session_date__range=[period_start_date, period_end_date]
+        ).values_list('generated_from_rule_id', 'session_date')
+    )
+
+    manual_sessions = {}
+    for session in Session.objects.filter(
+        school_group_id__in=group_ids,
+        session_date__range=[period_start_date, period_end_date],
+        generated_from_rule__isnull=True
+    ):
+        manual_sessions.setdefault((session.school_group_id, session.session_date, session.session_start_time), session)
+
+    active_players_by_group = {}
+    for group_id, player_id in Player.school_groups.through.objects.filter(
+        schoolgroup_id__in=group_ids, player__is_active=True
+    ).values_list('schoolgroup_id', 'player_id'):
+        active_players_by_group.setdefault(group_id, []).append(player_id)
 
-    current_date = period_start_date
-    
+    # --- 2. Plan all candidates in memory (by date, then rule order) ---
+    candidates = sorted(
+        (
+            (current_date, rule_index, rule)
+            for rule_index, rule in enumerate(rules)
+            for current_date in _rule_dates(rule, period_start_date, period_end_date)
+        ),
+        key=lambda c: (c[0], c[1])
+    )
+
+    sessions_to_link = []
+    sessions_to_create = []
+    for current_date, _, rule in candidates:
+        # Check if a session from this rule already exists
+        if (rule.id, current_date) in existing_generated:
+            sessions_skipped_exists_count += 1
+            continue
+
+        # Check for a manual session clashing
+        clashing_manual_session = manual_sessions.get((rule.school_group_id, current_date, rule.start_time))
+        if clashing_manual_session:
+            if overwrite_existing_non_generated:
+                # Link the manual session to the rule
+                clashing_manual_session.generated_from_rule = rule
+                sessions_to_link.append(clashing_manual_session)
+                sessions_created_count += 1
+                action_details.append(f"Updated and linked manual session for '{rule.school_group}' on {current_date}.")
+            else:
+                sessions_skipped_exists_count += 1
+            continue
+
+        new_session = Session(
+            school_group=rule.school_group,
+            session_date=current_date,
+            session_start_time=rule.start_time,
+            planned_duration_minutes=rule.default_duration_minutes,
+            venue=rule.default_venue,
+            notes=f"Generated from rule: {rule}",
+            generated_from_rule=rule
+        )
+        # bulk_create bypasses save(), so fill the stored start/end here
+        new_session.sync_scheduled_times()
+        sessions_to_create.append((rule, new_session))
+
+    planned = time.perf_counter()
+
+    # --- 3. Apply with bulk writes ---
+    attendee_model = Session.attendees.through
     with transaction.atomic():
-        while current_date <= period_end_date:
-            current_day_of_week = current_date.weekday()
-
-            for rule in scheduled_classes_qs.filter(is_active=True):
-                if rule.day_of_week == current_day_of_week:
-                    # Check if a session from this rule already exists
-                    if Session.objects.filter(generated_from_rule=rule, session_date=current_date).exists():
-                        sessions_skipped_exists_count += 1
-                        continue
-
-                    # Check for a manual session clashing
-                    clashing_manual_session = Session.objects.filter(
-                        school_group=rule.school_group,
-                        session_date=current_date,
-                        session_start_time=rule.start_time,
-                        generated_from_rule__isnull=True
-                    ).first()
-
-                    if clashing_manual_session:
-                        if overwrite_existing_non_generated:
-                            # Link the manual session to the rule
-                            clashing_manual_session.generated_from_rule = rule
-                            clashing_manual_session.save()
-                            sessions_created_count += 1
-                            action_details.append(f"Updated and linked manual session for '{rule.school_group}' on {current_date}.")
-                        else:
-                            sessions_skipped_exists_count += 1
-                        continue
-
-                    # Create a new session
-                    try:
-                        new_session = Session.objects.create(
-                            school_group=rule.school_group,
-                            session_date=current_date,
-                            session_start_time=rule.start_time,
-                            planned_duration_minutes=rule.default_duration_minutes,
-                            venue=rule.default_venue,
-                            notes=f"Generated from rule: {rule}",
-                            generated_from_rule=rule
-                        )
-                        if rule.default_coaches.exists():
-                            new_session.coaches_attending.set(rule.default_coaches.all())
-                        
-                        if rule.school_group:
-                            active_players = Player.objects.filter(school_groups=rule.school_group, is_active=True)
-                            if active_players.exists():
-                                new_session.attendees.set(active_players)
-                        
-                        sessions_created_count += 1
-                    except Exception as e:
-                        errors_count += 1
-                        action_details.append(f"Error creating session for '{rule}' on {current_date}: {e}")
-
-            current_date += timedelta(days=1)
+        if sessions_to_link:
+            Session.objects.bulk_update(sessions_to_link, ['generated_from_rule'], batch_size=batch_size)
+
+        for batch_start in range(0, len(sessions_to_create), batch_size):
+            batch = sessions_to_create[batch_start:batch_start + batch_size]
+            try:
+                # Each batch gets its own savepoint so one failure doesn't abort the whole run
+                with transaction.atomic():
+                    created_sessions = Session.objects.bulk_create([session for _, session in batch])
+
+                    session_coaches = []
+                    attendee_rows = []
+                    for (rule, _), new_session in zip(batch, created_sessions):
+                        for coach in rule.default_coaches.all():
+                            session_coaches.append(SessionCoach(
+                                session=new_session,
+                                coach=coach,
+                                coaching_duration_minutes=rule.default_duration_minutes
+                            ))
+                        for player_id in active_players_by_group.get(rule.school_group_id, []):
+                            attendee_rows.append(attendee_model(session_id=new_session.id, player_id=player_id))
+
+                    SessionCoach.objects.bulk_create(session_coaches, batch_size=batch_size)
+                    attendee_model.objects.bulk_create(attendee_rows, batch_size=batch_size)
+                sessions_created_count += len(batch)
+            except Exception as e:
+                errors_count += len(batch)
+                for rule, session in batch:
+                    action_details.append(f"Error creating session for '{rule}' on {session.session_date}: {e}")
+
+    finished = time.perf_counter()
 
     return {
         'created': sessions_created_count,
         'skipped_exists': sessions_skipped_exists_count,
         'errors': errors_count,
-        'details': action_details
-    }
\ No newline at end of file
+        'details': action_details,
+        'stats': {
+            'rules': len(rules),
+            'candidates': len(candidates),
+            'plan_ms': round((planned - started) * 1000, 1),
+            'write_ms': round((finished - planned) * 1000, 1),
+            'total_ms': round((finished - started) * 1000, 1),
+        }
+    }
@@ -0,0 +1,286 @@
+# scheduling/staffing_solver.py
+
+import hashlib
+import time
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from itertools import groupby
+
+from django.db import transaction
+
+from .models import CoachAvailability, Session, SessionCoach
+from .utils import _conflict_message
+from accounts.models import Coach
+
+# Assignment costs. Real choices always cost less than leaving a slot unfilled, and leaving a
+# slot unfilled always costs less than an impossible assignment (unavailable or conflicting).
+EMERGENCY_PENALTY = 500
+LOAD_COST_PER_HOUR = 10
+UNFILLED_COST = 10_000
+INFEASIBLE_COST = 1_000_000
+
+CANDIDATE_STATUSES = (CoachAvailability.Status.AVAILABLE, CoachAvailability.Status.EMERGENCY)
+
+
+def min_cost_assignment(costs):
+    """
+    Solves the rectangular assignment problem for a list of rows (len(rows) <= len(columns)):
+    returns, for each row, the column index that minimises the total cost, with every column
+    used at most once. Hungarian algorithm with potentials, O(rows^2 * columns).
+    """
+    n = len(costs)
+    if not n:
+        return []
+    m = len(costs[0])
+    inf = float('inf')
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    owner = [0] * (m + 1)   # owner[j]: row (1-based) assigned to column j, 0 if free
+    way = [0] * (m + 1)
+
+    for row in range(1, n + 1):
+        owner[0] = row
+        col0 = 0
+        min_to = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[col0] = True
+            row0 = owner[col0]
+            delta = inf
+            col1 = 0
+            row_costs = costs[row0 - 1]
+            for col in range(1, m + 1):
+                if used[col]:
+                    continue
+                reduced = row_costs[col - 1] - u[row0] - v[col]
+                if reduced < min_to[col]:
+                    min_to[col] = reduced
+                    way[col] = col0
+                if min_to[col] < delta:
+                    delta = min_to[col]
+                    col1 = col
+            for col in range(m + 1):
+                if used[col]:
+                    u[owner[col]] += delta
+                    v[col] -= delta
+                else:
+                    min_to[col] -= delta
+            col0 = col1
+            if owner[col0] == 0:
+                break
+        while col0:
+            col1 = way[col0]
+            owner[col0] = owner[col1]
+            col0 = col1
+
+    assignment = [None] * n
+    for col in range(1, m + 1):
+        if owner[col]:
+            assignment[owner[col] - 1] = col - 1
+    return assignment
+
+
+class _CoachCalendar:
+    """Sessions a coach holds in the plan, per date, for travel/overlap checks as slots get filled."""
+
+    def __init__(self, travel_time_minutes):
+        self.travel_delta = timedelta(minutes=travel_time_minutes)
+        self._sessions = defaultdict(lambda: defaultdict(list))
+        self.minutes = defaultdict(int)
+
+    def add(self, coach_id, session, minutes):
+        self._sessions[coach_id][session.session_date].append(session)
+        self.minutes[coach_id] += minutes
+
+    def conflict(self, coach_id, session):
+        """Same rules and messages as check_for_conflicts."""
+        start, end = session.start_datetime, session.end_datetime
+        by_date = self._sessions.get(coach_id, {})
+        for day in (session.session_date - timedelta(days=1), session.session_date, session.session_date + timedelta(days=1)):
+            for other in by_date.get(day, ()):
+                if other.id == session.id:
+                    continue
+                message = _conflict_message(session, start, end, other, other.start_datetime, other.end_datetime, self.travel_delta)
+                if message:
+                    return message
+        return None
+
+
+def _coaches_needed(session, coaches_per_session):
+    if coaches_per_session:
+        return coaches_per_session
+    if session.generated_from_rule_id:
+        return max(len(session.generated_from_rule.default_coaches.all()), 1)
+    return 1
+
+
+def _slot_cost(coach, slot, status, calendar):
+    hours = Decimal(slot['session'].planned_duration_minutes) / Decimal(60)
+    rate = coach.hourly_rate or Decimal('0')
+    if slot['is_head']:
+        # Head coach slots prefer the most senior (highest rate) coach, as Session.get_head_coach does
+        rate_cost = (slot['max_rate'] - rate) * hours
+    else:
+        rate_cost = rate * hours
+    load_cost = Decimal(calendar.minutes[coach.id]) / Decimal(60) * LOAD_COST_PER_HOUR
+    emergency_cost = EMERGENCY_PENALTY if status == CoachAvailability.Status.EMERGENCY else 0
+    return float(rate_cost + load_cost) + emergency_cost
+
+
+def propose_staffing(start_date, end_date, coaches_per_session=None, replace_existing=False, travel_time_minutes=30):
+    """
+    Proposes coach assignments for every non-cancelled session between start_date and end_date.
+
+    Sessions are staffed in chronological waves (sessions starting at the same time). Each wave
+    is solved as a min-cost assignment of open slots to coaches who marked themselves AVAILABLE
+    (preferred) or EMERGENCY for that session and have no overlap/travel conflict with what they
+    already hold, preferring cheaper and less-loaded coaches; the first slot of an otherwise
+    empty session is its head coach slot. Existing assignments are kept (and count towards
+    conflicts and load) unless replace_existing is set.
+
+    Returns a plan for preview and apply_staffing():
+    {'start_date', 'end_date', 'sessions': [...], 'fingerprint', 'stats'}
+    where each session entry is {'session', 'needed', 'kept', 'removed', 'added', 'unfilled'}.
+    """
+    started = time.perf_counter()
+    sessions = list(
+        Session.objects.filter(
+            session_date__range=[start_date, end_date],
+            is_cancelled=False
+        ).select_related(
+            'school_group', 'venue', 'generated_from_rule'
+        ).prefetch_related(
+            'sessioncoach_set__coach', 'coach_availabilities', 'generated_from_rule__default_coaches'
+        )
+    )
+    sessions = [s for s in sessions if s.start_datetime and s.end_datetime]
+    sessions.sort(key=lambda s: (s.start_datetime, s.id))
+    session_ids = {s.id for s in sessions}
+
+    coaches = list(Coach.objects.filter(is_active=True, user__isnull=False).select_related('user').order_by('id'))
+    max_rate = max((coach.hourly_rate or Decimal('0') for coach in coaches), default=Decimal('0'))
+
+    # Assignments just outside the range still block travel and overlaps at the edges
+    calendar = _CoachCalendar(travel_time_minutes)
+    for assignment in SessionCoach.objects.filter(
+        session__session_date__range=[start_date - timedelta(days=1), end_date + timedelta(days=1)],
+        session__is_cancelled=False
+    ).exclude(session_id__in=session_ids).select_related('session__school_group', 'session__venue'):
+        calendar.add(assignment.coach_id, assignment.session, assignment.coaching_duration_minutes)
+
+    entries = []
+    for session in sessions:
+        assignments = list(session.sessioncoach_set.all())
+        kept = [] if replace_existing else assignments
+        for assignment in kept:
+            calendar.add(assignment.coach_id, session, assignment.coaching_duration_minutes)
+        entries.append({
+            'session': session,
+            'needed': _coaches_needed(session, coaches_per_session),
+            'kept': [a.coach for a in kept],
+            'removed': [a.coach for a in assignments] if replace_existing else [],
+            'removed_assignment_ids': [a.id for a in assignments] if replace_existing else [],
+            'added': [],
+            'unfilled': 0,
+        })
+
+    slot_count = 0
+    for _, wave in groupby(entries, key=lambda e: e['session'].start_datetime):
+        wave = list(wave)
+        slots = []
+        for entry in wave:
+            for index in range(max(entry['needed'] - len(entry['kept']), 0)):
+                slots.append({
+                    'entry': entry,
+                    'session': entry['session'],
+                    'is_head': index == 0 and not entry['kept'],
+                    'max_rate': max_rate,
+                })
+        if not slots:
+            continue
+        slot_count += len(slots)
+
+        costs = []
+        for slot in slots:
+            session = slot['session']
+            statuses = {a.coach_id: a.status for a in session.coach_availabilities.all()}
+            taken = {c.id for c in slot['entry']['kept']}
+            row = []
+            for coach in coaches:
+                status = statuses.get(coach.user_id)
+                if status not in CANDIDATE_STATUSES or coach.id in taken or calendar.conflict(coach.id, session):
+                    row.append(INFEASIBLE_COST)
+                else:
+                    row.append(_slot_cost(coach, slot, status, calendar))
+            # One "leave unfilled" column per slot keeps the problem feasible
+            row.extend([UNFILLED_COST] * len(slots))
+            costs.append(row)
+
+        for slot, row, column in zip(slots, costs, min_cost_assignment(costs)):
+            entry = slot['entry']
+            if column >= len(coaches) or row[column] >= INFEASIBLE_COST:
+                entry['unfilled'] += 1
+                continue
+            coach = coaches[column]
+            status = next(a.status for a in slot['session'].coach_availabilities.all() if a.coach_id == coach.user_id)
+            entry['added'].append({
+                'coach': coach,
+                'is_head': slot['is_head'],
+                'is_emergency': status == CoachAvailability.Status.EMERGENCY,
+            })
+            calendar.add(coach.id, slot['session'], slot['session'].planned_duration_minutes)
+
+    added = [a for entry in entries for a in entry['added']]
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'sessions': entries,
+        'fingerprint': plan_fingerprint(entries),
+        'stats': {
+            'sessions': len(entries),
+            'open_slots': slot_count,
+            'filled': len(added),
+            'emergency': sum(1 for a in added if a['is_emergency']),
+            'unfilled': sum(entry['unfilled'] for entry in entries),
+            'removed': sum(len(entry['removed']) for entry in entries),
+            'solve_ms': round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
+
+
+def plan_fingerprint(entries):
+    """Stable hash of a plan's changes, used to check that the previewed plan is the one applied."""
+    changes = sorted(
+        (
+            entry['session'].id,
+            tuple(sorted((a['coach'].id, a['is_head']) for a in entry['added'])),
+            tuple(sorted(c.id for c in entry['removed'])),
+        )
+        for entry in entries
+        if entry['added'] or entry['removed']
+    )
+    return hashlib.sha1(repr(changes).encode()).hexdigest()
+
+
+def apply_staffing(plan):
+    """
+    Writes a plan from propose_staffing(): removed assignments go in one delete and new ones
+    in one bulk_create, inside a single transaction. Returns (created_count, removed_count).
+    """
+    removed_ids = [assignment_id for entry in plan['sessions'] for assignment_id in entry['removed_assignment_ids']]
+    new_assignments = [
+        SessionCoach(
+            session=entry['session'],
+            coach=added['coach'],
+            coaching_duration_minutes=entry['session'].planned_duration_minutes,
+            is_head_coach=added['is_head']
+        )
+        for entry in plan['sessions']
+        for added in entry['added']
+    ]
+
+    with transaction.atomic():
+        removed_count, _ = SessionCoach.objects.filter(pk__in=removed_ids).delete() if removed_ids else (0, None)
+        SessionCoach.objects.bulk_create(new_assignments)
+    return len(new_assignments), removed_count
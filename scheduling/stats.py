@@ -1,11 +1,167 @@
+import calendar
 from django.utils import timezone
-from datetime import date
-from scheduling.models import Session, AttendanceTracking
+from django.utils.dateparse import parse_date
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from datetime import date, timedelta
+from scheduling.models import Session, AttendanceTracking, AttendanceMonthlySummary
 from players.models import SchoolGroup
 
+TRACKED_STATUSES = [AttendanceTracking.CoachAttended.YES, AttendanceTracking.CoachAttended.NO]
+
+
+def _month_start(day):
+    return day.replace(day=1)
+
+
+def _month_end(day):
+    return day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+
+def _as_date(value, default):
+    if isinstance(value, str):
+        return parse_date(value) or default
+    return value or default
+
+
+def _split_range(start_date, end_date):
+    """
+    Splits [start_date, end_date] into the whole months it covers and the partial edge spans.
+    Returns (first_full_month, last_full_month, edge_spans); the months are None when the
+    range covers no complete month.
+    """
+    first_full = start_date if start_date.day == 1 else _month_start(_month_end(start_date) + timedelta(days=1))
+    last_full = _month_start(end_date) if end_date == _month_end(end_date) else _month_start(_month_start(end_date) - timedelta(days=1))
+
+    if start_date > end_date or first_full > last_full:
+        return None, None, [(start_date, end_date)] if start_date <= end_date else []
+
+    edges = []
+    if start_date < first_full:
+        edges.append((start_date, first_full - timedelta(days=1)))
+    if end_date > _month_end(last_full):
+        edges.append((_month_end(last_full) + timedelta(days=1), end_date))
+    return first_full, last_full, edges
+
+
+def _tracked_sessions(group_ids, start_date, end_date):
+    """Non-cancelled sessions of the groups in the span where attendance was taken for anyone."""
+    return Session.objects.filter(
+        school_group_id__in=group_ids,
+        session_date__range=[start_date, end_date],
+        is_cancelled=False,
+        player_attendances__attended__in=TRACKED_STATUSES
+    ).distinct()
+
+
+def _attended_records(group_ids, start_date, end_date):
+    return AttendanceTracking.objects.filter(
+        session__school_group_id__in=group_ids,
+        session__session_date__range=[start_date, end_date],
+        session__is_cancelled=False,
+        attended=AttendanceTracking.CoachAttended.YES
+    )
+
+
+def _summary_rows(group_ids, first_month, last_month):
+    if first_month is None:
+        return AttendanceMonthlySummary.objects.none()
+    return AttendanceMonthlySummary.objects.filter(school_group_id__in=group_ids, month__range=[first_month, last_month])
+
+
+def _summed(rows, field):
+    return rows.aggregate(total=Sum(field))['total'] or 0
+
+
+def refresh_attendance_summary(school_group_id, month):
+    """
+    Recomputes the summary rows of one school group for the month containing `month`.
+    Call this after coach-marked attendance for any of the group's sessions in that month changes.
+    """
+    first_day, last_day = _month_start(month), _month_end(month)
+    records = AttendanceTracking.objects.filter(
+        session__school_group_id=school_group_id,
+        session__session_date__range=[first_day, last_day],
+        session__is_cancelled=False,
+        attended__in=TRACKED_STATUSES
+    )
+    sessions_tracked = records.values('session_id').distinct().count()
+    player_counts = list(records.values('player_id').annotate(
+        tracked=Count('session_id', distinct=True),
+        attended=Count('id', filter=Q(attended=AttendanceTracking.CoachAttended.YES))
+    ).order_by())
+
+    rows = []
+    if sessions_tracked:
+        rows.append(AttendanceMonthlySummary(
+            school_group_id=school_group_id, month=first_day,
+            sessions_tracked=sessions_tracked,
+            sessions_attended=sum(row['attended'] for row in player_counts)
+        ))
+        rows.extend(
+            AttendanceMonthlySummary(
+                school_group_id=school_group_id, player_id=row['player_id'], month=first_day,
+                sessions_tracked=row['tracked'], sessions_attended=row['attended']
+            )
+            for row in player_counts
+        )
+
+    with transaction.atomic():
+        AttendanceMonthlySummary.objects.filter(school_group_id=school_group_id, month=first_day).delete()
+        AttendanceMonthlySummary.objects.bulk_create(rows)
+
+
+def refresh_attendance_summaries(group_months):
+    """Refreshes each distinct month in an iterable of (school_group_id, date); pairs missing either are skipped."""
+    for school_group_id, month in {(group_id, _month_start(day)) for group_id, day in group_months if group_id and day}:
+        refresh_attendance_summary(school_group_id, month)
+
+
+def rebuild_attendance_summaries(since=None, batch_size=1000):
+    """
+    Rebuilds every summary row (or those from the month of `since` onwards) from
+    AttendanceTracking with two grouped queries. Returns the number of rows written.
+    """
+    records = AttendanceTracking.objects.filter(
+        session__school_group__isnull=False,
+        session__is_cancelled=False,
+        attended__in=TRACKED_STATUSES
+    )
+    existing = AttendanceMonthlySummary.objects.all()
+    if since:
+        since = _month_start(since)
+        records = records.filter(session__session_date__gte=since)
+        existing = existing.filter(month__gte=since)
+    records = records.annotate(month=TruncMonth('session__session_date'))
+
+    group_counts = records.values('session__school_group_id', 'month').annotate(
+        tracked=Count('session_id', distinct=True),
+        attended=Count('id', filter=Q(attended=AttendanceTracking.CoachAttended.YES))
+    ).order_by()
+    player_counts = records.values('session__school_group_id', 'player_id', 'month').annotate(
+        tracked=Count('session_id', distinct=True),
+        attended=Count('id', filter=Q(attended=AttendanceTracking.CoachAttended.YES))
+    ).order_by()
+
+    rows = [
+        AttendanceMonthlySummary(
+            school_group_id=row['session__school_group_id'], player_id=row.get('player_id'), month=row['month'],
+            sessions_tracked=row['tracked'], sessions_attended=row['attended']
+        )
+        for row in [*group_counts, *player_counts]
+    ]
+    with transaction.atomic():
+        existing.delete()
+        AttendanceMonthlySummary.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
 def calculate_player_attendance_stats(player, start_date=None, end_date=None, school_group_id=None):
     """
     Calculates attendance statistics for a given player within a date range.
+    Whole months are read from AttendanceMonthlySummary; only the partial months at the
+    edges of the range are counted from AttendanceTracking.
     """
     today = timezone.now().date()
     current_year_start = date(today.year, 1, 1)
@@ -16,34 +172,23 @@ def calculate_player_attendance_stats(player, start_date=None, end_date=None, sc
     if not end_date:
         end_date = today.strftime('%Y-%m-%d')
 
-    # Base queryset for all sessions within the selected filter range
-    sessions_in_range_qs = Session.objects.filter(
-        school_group__in=player.school_groups.all(),
-        session_date__range=[start_date, end_date],
-        is_cancelled=False
-    )
+    # Only sessions up to today count towards the player's stats
+    range_start = _as_date(start_date, current_year_start)
+    range_end = min(_as_date(end_date, today), today)
 
+    groups = player.school_groups.all()
     if school_group_id:
-        sessions_in_range_qs = sessions_in_range_qs.filter(school_group__id=school_group_id)
-
-    # Find only the sessions in the date range where any attendance was marked.
-    sessions_with_attendance_taken = sessions_in_range_qs.filter(
-        session_date__lte=today,
-        player_attendances__attended__in=[
-            AttendanceTracking.CoachAttended.YES,
-            AttendanceTracking.CoachAttended.NO
-        ]
-    ).distinct()
+        groups = groups.filter(id=school_group_id)
+    group_ids = list(groups.values_list('id', flat=True))
 
-    # The total number of sessions is the count of this filtered set.
-    total_sessions = sessions_with_attendance_taken.count()
+    first_month, last_month, edges = _split_range(range_start, range_end)
+    summary_rows = _summary_rows(group_ids, first_month, last_month)
+    total_sessions = _summed(summary_rows.filter(player__isnull=True), 'sessions_tracked')
+    attended_sessions = _summed(summary_rows.filter(player=player), 'sessions_attended')
 
-    # Count attended sessions only from within the sessions where attendance was taken.
-    attended_sessions = AttendanceTracking.objects.filter(
-        player=player,
-        session__in=sessions_with_attendance_taken,
-        attended=AttendanceTracking.CoachAttended.YES
-    ).count()
+    for edge_start, edge_end in edges:
+        total_sessions += _tracked_sessions(group_ids, edge_start, edge_end).count()
+        attended_sessions += _attended_records(group_ids, edge_start, edge_end).filter(player=player).count()
 
     attendance_percentage = (attended_sessions / total_sessions * 100) if total_sessions > 0 else 0
 
@@ -58,33 +203,26 @@ def calculate_player_attendance_stats(player, start_date=None, end_date=None, sc
 def calculate_group_attendance_stats(school_group, start_date, end_date):
     """
     Calculates attendance statistics for a school group within a date range.
+    Whole months are read from AttendanceMonthlySummary; only the partial months at the
+    edges of the range are counted from AttendanceTracking.
     """
-    sessions_in_range = Session.objects.filter(
-        school_group=school_group,
-        session_date__range=[start_date, end_date],
-        is_cancelled=False
-    )
-    
-    players_in_group = school_group.players.filter(is_active=True)
-
-    # Find sessions where attendance was actually recorded for at least one player.
-    sessions_with_attendance_taken = sessions_in_range.filter(
-        player_attendances__attended__in=[
-            AttendanceTracking.CoachAttended.YES,
-            AttendanceTracking.CoachAttended.NO
-        ]
-    ).distinct()
-    
+    range_start = _as_date(start_date, None)
+    range_end = _as_date(end_date, None)
+
+    player_ids = list(school_group.players.filter(is_active=True).values_list('id', flat=True))
+
+    first_month, last_month, edges = _split_range(range_start, range_end)
+    summary_rows = _summary_rows([school_group.id], first_month, last_month)
+    tracked_sessions = _summed(summary_rows.filter(player__isnull=True), 'sessions_tracked')
+    actual_attendances = _summed(summary_rows.filter(player_id__in=player_ids), 'sessions_attended')
+
+    for edge_start, edge_end in edges:
+        tracked_sessions += _tracked_sessions([school_group.id], edge_start, edge_end).count()
+        actual_attendances += _attended_records([school_group.id], edge_start, edge_end).filter(player_id__in=player_ids).count()
+
     # Total possible attendances is the number of players multiplied by the number of *tracked* sessions.
-    total_possible_attendances = sessions_with_attendance_taken.count() * players_in_group.count()
-    
-    # Actual attendances are counted only from within those tracked sessions.
-    actual_attendances = AttendanceTracking.objects.filter(
-        session__in=sessions_with_attendance_taken,
-        player__in=players_in_group,
-        attended=AttendanceTracking.CoachAttended.YES
-    ).count()
-    
+    total_possible_attendances = tracked_sessions * len(player_ids)
+
     attendance_percentage = (actual_attendances / total_possible_attendances * 100) if total_possible_attendances > 0 else 0
 
     return {
@@ -0,0 +1,110 @@
+import datetime
+import json
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from players.models import AttendanceDiscrepancy, Player, SchoolGroup
+from scheduling.models import AttendanceTracking, Session
+from scheduling.services import AttendanceCommitService
+
+Response = AttendanceTracking.ParentResponse
+Attended = AttendanceTracking.CoachAttended
+Discrepancy = AttendanceDiscrepancy.DiscrepancyType
+
+
+class AttendanceCommitServiceTest(TestCase):
+    def setUp(self):
+        self.group = SchoolGroup.objects.create(name="U13")
+        self.session = Session.objects.create(
+            school_group=self.group, session_date=datetime.date(2026, 3, 2), session_start_time=datetime.time(15, 0)
+        )
+
+    def _players(self, count, prefix="P"):
+        players = [Player.objects.create(first_name=f"{prefix}{i}", last_name="Player") for i in range(count)]
+        self.group.players.add(*players)
+        return players
+
+    def test_marks_attendance_and_discrepancies(self):
+        no_show, unexpected, never_notified, expected, absent_ok = self._players(5)
+        AttendanceTracking.objects.create(session=self.session, player=no_show, parent_response=Response.ATTENDING)
+        AttendanceTracking.objects.create(session=self.session, player=unexpected, parent_response=Response.NOT_ATTENDING)
+        AttendanceTracking.objects.create(session=self.session, player=expected, parent_response=Response.ATTENDING)
+        AttendanceTracking.objects.create(session=self.session, player=absent_ok, parent_response=Response.NOT_ATTENDING)
+        # Stale discrepancy that the new marks resolve
+        AttendanceDiscrepancy.objects.create(
+            player=expected, session=self.session, discrepancy_type=Discrepancy.NO_SHOW,
+            parent_response=Response.ATTENDING, coach_marked_attendance=Attended.NO
+        )
+
+        summary = AttendanceCommitService.commit(self.session, [str(unexpected.id), expected.id, 'bad'])
+
+        self.assertEqual(summary, {'players': 5, 'attended': 2, 'attendance_changed': 5, 'discrepancies': 3, 'discrepancies_cleared': 1})
+        marks = dict(AttendanceTracking.objects.filter(session=self.session).values_list('player_id', 'attended'))
+        self.assertEqual(marks, {
+            no_show.id: Attended.NO, unexpected.id: Attended.YES, never_notified.id: Attended.NO,
+            expected.id: Attended.YES, absent_ok.id: Attended.NO,
+        })
+        discrepancies = dict(AttendanceDiscrepancy.objects.filter(session=self.session).values_list('player_id', 'discrepancy_type'))
+        self.assertEqual(discrepancies, {
+            no_show.id: Discrepancy.NO_SHOW, unexpected.id: Discrepancy.UNEXPECTED, never_notified.id: Discrepancy.NEVER_NOTIFIED,
+        })
+
+        # Re-committing the same marks changes nothing
+        again = AttendanceCommitService.commit(self.session, [unexpected.id, expected.id])
+        self.assertEqual((again['attendance_changed'], again['discrepancies'], again['discrepancies_cleared']), (0, 3, 0))
+
+    def test_query_count_does_not_grow_with_group_size(self):
+        def commit_queries(players):
+            with CaptureQueriesContext(connection) as context:
+                AttendanceCommitService.commit(self.session, [p.id for p in players[::2]])
+            return len(context.captured_queries)
+
+        small = commit_queries(self._players(3, prefix="S"))
+        AttendanceTracking.objects.all().delete()
+        AttendanceDiscrepancy.objects.all().delete()
+        large = commit_queries(self._players(30, prefix="L"))
+        self.assertEqual(small, large)
+
+
+    def test_parent_response_inserted_during_commit(self):
+        late, other = self._players(2)
+        bulk_create = AttendanceTracking.objects.bulk_create
+
+        def parent_responds_first(objs, **kwargs):
+            # The parent's row lands between the commit's read and its insert
+            AttendanceTracking.objects.create(session=self.session, player=late, parent_response=Response.ATTENDING)
+            return bulk_create(objs, **kwargs)
+
+        with mock.patch.object(AttendanceTracking.objects, 'bulk_create', side_effect=parent_responds_first):
+            summary = AttendanceCommitService.commit(self.session, [other.id])
+
+        self.assertEqual(summary['attendance_changed'], 2)
+        record = AttendanceTracking.objects.get(session=self.session, player=late)
+        self.assertEqual((record.parent_response, record.attended), (Response.ATTENDING, Attended.NO))
+        self.assertEqual(AttendanceDiscrepancy.objects.get(session=self.session).discrepancy_type, Discrepancy.NO_SHOW)
+
+
+class CommitAttendanceApiTest(TestCase):
+    def setUp(self):
+        get_user_model().objects.create_user(username='coach', password='password', is_staff=True)
+        self.client.login(username='coach', password='password')
+        group = SchoolGroup.objects.create(name="U13")
+        self.players = [Player.objects.create(first_name=f"P{i}", last_name="Player") for i in range(2)]
+        group.players.add(*self.players)
+        self.session = Session.objects.create(school_group=group, session_date=datetime.date(2026, 3, 2), session_start_time=datetime.time(15, 0))
+        self.url = reverse('scheduling:commit_attendance', args=[self.session.id])
+
+    def test_commits_in_one_request(self):
+        response = self.client.post(self.url, json.dumps({'attending_player_ids': [self.players[0].id]}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['attended'], 1)
+        self.assertEqual(AttendanceTracking.objects.get(player=self.players[1]).attended, Attended.NO)
+
+    def test_rejects_bad_payload(self):
+        response = self.client.post(self.url, json.dumps({'attending_player_ids': 'all'}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,131 @@
+import datetime
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from players.models import Player, SchoolGroup
+from scheduling.models import AttendanceMonthlySummary, AttendanceTracking, Session
+from scheduling.stats import (
+    calculate_group_attendance_stats, calculate_player_attendance_stats, rebuild_attendance_summaries
+)
+
+FIXED_NOW = timezone.make_aware(datetime.datetime(2026, 3, 31, 12, 0))
+YES, NO = AttendanceTracking.CoachAttended.YES, AttendanceTracking.CoachAttended.NO
+
+
+class AttendanceSummaryTest(TestCase):
+    def setUp(self):
+        self.group = SchoolGroup.objects.create(name="Group G")
+        self.other_group = SchoolGroup.objects.create(name="Group H")
+        self.p1 = Player.objects.create(first_name="Pat", last_name="One")
+        self.p2 = Player.objects.create(first_name="Sam", last_name="Two")
+        self.p3 = Player.objects.create(first_name="Old", last_name="Three", is_active=False)
+        for player in (self.p1, self.p2, self.p3):
+            player.school_groups.add(self.group)
+        self.p1.school_groups.add(self.other_group)
+
+        def session(day, marks, group=None, cancelled=False):
+            s = Session.objects.create(
+                school_group=group or self.group, session_date=day,
+                session_start_time=datetime.time(15, 0), is_cancelled=cancelled
+            )
+            for player, attended in marks:
+                AttendanceTracking.objects.create(session=s, player=player, attended=attended)
+            return s
+
+        session(datetime.date(2026, 1, 10), [(self.p1, YES), (self.p2, NO), (self.p3, YES)])
+        session(datetime.date(2026, 1, 20), [(self.p1, AttendanceTracking.CoachAttended.UNSET)])
+        session(datetime.date(2026, 2, 5), [(self.p1, YES), (self.p2, YES)])
+        session(datetime.date(2026, 2, 12), [(self.p1, YES)], cancelled=True)
+        session(datetime.date(2026, 2, 15), [(self.p1, YES)], group=self.other_group)
+        session(datetime.date(2026, 3, 3), [(self.p1, NO), (self.p2, YES)])
+        self.march_20 = session(datetime.date(2026, 3, 20), [(self.p1, YES)])
+
+        rebuild_attendance_summaries()
+
+    def _player_stats(self, *args, **kwargs):
+        with mock.patch('django.utils.timezone.now', return_value=FIXED_NOW):
+            return calculate_player_attendance_stats(*args, **kwargs)
+
+    def _rows(self):
+        return set(AttendanceMonthlySummary.objects.values_list(
+            'school_group_id', 'player_id', 'month', 'sessions_tracked', 'sessions_attended'
+        ))
+
+    def test_player_stats_combine_summary_and_edge_months(self):
+        stats = self._player_stats(self.p1, '2026-01-15', '2026-03-10')
+        self.assertEqual((stats['total_sessions'], stats['attended_sessions']), (3, 2))
+        self.assertEqual(stats['start_date'], '2026-01-15')
+
+        stats = self._player_stats(self.p1, '2026-01-01', '2026-03-31', school_group_id=self.other_group.id)
+        self.assertEqual((stats['total_sessions'], stats['attended_sessions']), (1, 1))
+
+    def test_group_stats_only_count_active_members(self):
+        stats = calculate_group_attendance_stats(self.group, datetime.date(2026, 1, 1), datetime.date(2026, 3, 31))
+        self.assertEqual(stats['total_possible'], 8)
+        self.assertEqual(stats['actual_attendances'], 5)
+
+        # A range inside one month is answered from AttendanceTracking alone
+        stats = calculate_group_attendance_stats(self.group, datetime.date(2026, 2, 2), datetime.date(2026, 2, 20))
+        self.assertEqual((stats['total_possible'], stats['actual_attendances']), (2, 2))
+
+    def test_full_months_are_read_from_summary(self):
+        AttendanceTracking.objects.filter(session__session_date__month=2).update(attended=NO)
+        stats = calculate_group_attendance_stats(self.group, datetime.date(2026, 2, 1), datetime.date(2026, 2, 28))
+        self.assertEqual(stats['actual_attendances'], 2)
+
+    def test_visual_attendance_refreshes_month(self):
+        User = get_user_model()
+        User.objects.create_user(username='coach', password='password', is_staff=True)
+        self.client.login(username='coach', password='password')
+
+        self.client.post(reverse('scheduling:visual_attendance', args=[self.march_20.id]), {'attendees': [self.p2.id]})
+
+        refreshed = self._rows()
+        rebuild_attendance_summaries()
+        self.assertEqual(refreshed, self._rows())
+        group_row = AttendanceMonthlySummary.objects.get(school_group=self.group, player=None, month=datetime.date(2026, 3, 1))
+        self.assertEqual((group_row.sessions_tracked, group_row.sessions_attended), (2, 2))
+
+    def test_session_and_mark_changes_refresh_summaries(self):
+        def group_totals(group=None):
+            stats = calculate_group_attendance_stats(group or self.group, datetime.date(2026, 1, 1), datetime.date(2026, 3, 31))
+            return stats['total_possible'], stats['actual_attendances']
+
+        def assert_matches_rebuild():
+            refreshed = self._rows()
+            rebuild_attendance_summaries()
+            self.assertEqual(refreshed, self._rows())
+
+        feb_5 = Session.objects.get(session_date=datetime.date(2026, 2, 5))
+        feb_5.is_cancelled = True
+        feb_5.save()
+        self.assertEqual(group_totals(), (6, 3))
+        assert_matches_rebuild()
+
+        feb_5.is_cancelled = False
+        feb_5.save()
+        self.assertEqual(group_totals(), (8, 5))
+
+        # Moving a session to another month and group refreshes both sides
+        march_3 = Session.objects.get(session_date=datetime.date(2026, 3, 3))
+        march_3.session_date = datetime.date(2026, 2, 20)
+        march_3.school_group = self.other_group
+        march_3.save()
+        self.assertEqual(group_totals(), (6, 4))
+        self.assertEqual(group_totals(self.other_group), (2, 1))
+        assert_matches_rebuild()
+
+        record = AttendanceTracking.objects.get(session=self.march_20, player=self.p1)
+        record.attended = NO
+        record.save()
+        self.assertEqual(group_totals(), (6, 3))
+        record.delete()  # Its only mark, so the session no longer counts as tracked
+        self.assertEqual(group_totals(), (4, 3))
+        assert_matches_rebuild()
+
+        feb_5.delete()
+        self.assertEqual(group_totals(), (2, 1))
+        assert_matches_rebuild()
+
@@ -0,0 +1,76 @@
+import datetime
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import Coach
+from players.models import SchoolGroup
+from scheduling.models import CoachAvailability, ScheduledClass, Session, Venue
+from scheduling.services import AvailabilityService
+
+User = get_user_model()
+FIXED_NOW = timezone.make_aware(datetime.datetime(2026, 3, 10, 12, 0))
+Status = CoachAvailability.Status
+
+
+@mock.patch('django.utils.timezone.now', return_value=FIXED_NOW)
+class BulkAvailabilityTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='coach', password='password', is_staff=True)
+        Coach.objects.create(user=self.user, name='Coach')
+        venue = Venue.objects.create(name="Courts")
+        group = SchoolGroup.objects.create(name="U13")
+        self.monday = ScheduledClass.objects.create(school_group=group, day_of_week=0, start_time=datetime.time(15, 0), default_venue=venue)
+        self.wednesday = ScheduledClass.objects.create(school_group=group, day_of_week=2, start_time=datetime.time(15, 0), default_venue=venue)
+
+        def session(rule, day, cancelled=False):
+            return Session.objects.create(
+                generated_from_rule=rule, school_group=group, venue=venue, is_cancelled=cancelled,
+                session_date=datetime.date(2026, 3, day), session_start_time=datetime.time(15, 0)
+            )
+
+        self.past = session(self.monday, 9)
+        self.kept = session(self.monday, 16)
+        self.new_monday = session(self.monday, 23)
+        self.wednesdays = [session(self.wednesday, 11), session(self.wednesday, 18)]
+        self.cancelled = session(self.wednesday, 25, cancelled=True)
+
+        CoachAvailability.objects.create(coach=self.user, session=self.past, status=Status.UNAVAILABLE)
+        CoachAvailability.objects.create(coach=self.user, session=self.kept, status=Status.AVAILABLE, notes="keep")
+
+    def _statuses(self):
+        return dict(CoachAvailability.objects.filter(coach=self.user).values_list('session_id', 'status'))
+
+    def test_writes_only_changed_future_sessions(self, _now):
+        self.client.login(username='coach', password='password')
+        url = reverse('scheduling:set_bulk_availability')
+        data = {'month': 3, 'year': 2026, f'availability_rule_{self.monday.id}': 'AVAILABLE'}
+
+        response = self.client.post(url, data, follow=True)
+        self.assertContains(response, "Your availability for 3 future sessions in March 2026 has been updated.")
+        self.assertEqual(self._statuses(), {
+            self.past.id: Status.UNAVAILABLE,
+            self.kept.id: Status.AVAILABLE,
+            self.new_monday.id: Status.AVAILABLE,
+            self.wednesdays[0].id: Status.UNAVAILABLE,
+            self.wednesdays[1].id: Status.UNAVAILABLE,
+        })
+        self.assertEqual(CoachAvailability.objects.get(session=self.kept).notes, "keep")
+
+        response = self.client.post(url, data, follow=True)
+        self.assertContains(response, "was already up to date")
+
+    def test_updates_existing_rows_in_place(self, _now):
+        changed = AvailabilityService.apply_bulk_availability(
+            self.user, {self.monday.id: Status.EMERGENCY}, datetime.date(2026, 3, 1), datetime.date(2026, 3, 31)
+        )
+        self.assertEqual(changed, 2)
+        kept = CoachAvailability.objects.get(session=self.kept)
+        self.assertEqual((kept.status, kept.notes), (Status.EMERGENCY, "keep"))
+        self.assertEqual(CoachAvailability.objects.get(session=self.past).status, Status.UNAVAILABLE)
+
+    def test_query_count_is_constant(self, _now):
+        rules = {self.monday.id: Status.AVAILABLE, self.wednesday.id: Status.EMERGENCY}
+        with self.assertNumQueries(5):
+            AvailabilityService.apply_bulk_availability(self.user, rules, datetime.date(2026, 3, 1), datetime.date(2026, 3, 31))
@@ -0,0 +1,100 @@
+import datetime
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signing import TimestampSigner
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import Coach
+from players.models import SchoolGroup
+from scheduling.models import Session, SessionCoach, Venue
+
+User = get_user_model()
+
+
+class CoachCalendarFeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='coach', password='password', is_staff=True)
+        self.coach = Coach.objects.create(user=self.user, name="Coach", hourly_rate=Decimal('100.00'))
+        self.group = SchoolGroup.objects.create(name="U15")
+        self.session = self._assigned_session(days=3)
+        self.url = reverse('scheduling:coach_calendar_feed', args=[TimestampSigner().sign(self.user.id)])
+
+    def _assigned_session(self, days):
+        session = Session.objects.create(
+            school_group=self.group, session_date=timezone.now().date() + datetime.timedelta(days=days),
+            session_start_time=datetime.time(15, 0)
+        )
+        SessionCoach.objects.create(session=session, coach=self.coach, coaching_duration_minutes=60)
+        return session
+
+    def test_unchanged_feed_is_not_modified(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn(b'SEQUENCE:0', first.content)
+
+        with self.assertNumQueries(1):
+            by_etag = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(by_etag.status_code, 304)
+
+        by_date = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(by_date.status_code, 304)
+
+    def test_rescheduling_bumps_sequence_and_etag(self):
+        first = self.client.get(self.url)
+
+        self.session.refresh_from_db()
+        self.session.session_start_time = datetime.time(16, 0)
+        self.session.save()
+        self.session.notes = "Bring cones"
+        self.session.save()
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.sequence, 1)
+
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn(b'SEQUENCE:1', changed.content)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+    def test_new_and_removed_assignments_change_the_feed(self):
+        first = self.client.get(self.url)
+        extra = self._assigned_session(days=5)
+        added = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(added.status_code, 200)
+        self.assertIn(f"session_{extra.id}@".encode(), added.content)
+
+        SessionCoach.objects.filter(session=extra).delete()
+        removed = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=added['Last-Modified'], HTTP_IF_NONE_MATCH=added['ETag'])
+        self.assertEqual(removed.status_code, 200)
+        self.assertNotIn(f"session_{extra.id}@".encode(), removed.content)
+
+    def test_renamed_venue_and_group_change_the_feed(self):
+        venue = Venue.objects.create(name="Main Courts")
+        self.session.venue = venue
+        self.session.save()
+        first = self.client.get(self.url)
+        self.assertIn(b'LOCATION:Main Courts', first.content)
+
+        venue.name = "Centre Courts"
+        venue.save()
+        renamed_venue = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(renamed_venue.status_code, 200)
+        self.assertIn(b'LOCATION:Centre Courts', renamed_venue.content)
+
+        self.group.name = "U16"
+        self.group.save()
+        renamed_group = self.client.get(self.url, HTTP_IF_NONE_MATCH=renamed_venue['ETag'])
+        self.assertEqual(renamed_group.status_code, 200)
+        self.assertIn(b'SUMMARY:U16 Session', renamed_group.content)
+
+    @override_settings(ALLOWED_HOSTS=['testserver', 'squash.example.com'])
+    def test_each_host_gets_its_own_links(self):
+        self.assertIn(b'http://testserver/', self.client.get(self.url).content.replace(b'\r\n ', b''))
+        other = self.client.get(self.url, HTTP_HOST='squash.example.com')
+        self.assertIn(b'http://squash.example.com/', other.content.replace(b'\r\n ', b''))
+
+    def test_invalid_token_is_404(self):
+        response = self.client.get(reverse('scheduling:coach_calendar_feed', args=['bad-token']))
+        self.assertEqual(response.status_code, 404)
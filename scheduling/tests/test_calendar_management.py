@@ -55,3 +55,44 @@ class CalendarManagementTest(TestCase):
         response = self.client.post(url, json.dumps(data), content_type='application/json')
         self.assertEqual(response.status_code, 200)
         self.assertFalse(Session.objects.filter(pk=self.session.id).exists())
+
+
+class CalendarEventsFeedTest(TestCase):
+    def setUp(self):
+        self.superuser = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.venue = Venue.objects.create(name="Test Venue")
+        self.inside = Session.objects.create(session_date=date(2026, 3, 10), session_start_time=time(10, 0), venue=self.venue)
+        self.outside = Session.objects.create(session_date=date(2026, 5, 10), session_start_time=time(10, 0), venue=self.venue)
+        self.url = reverse('scheduling:session_calendar_events')
+
+    def test_returns_only_requested_range(self):
+        self.client.force_login(self.superuser)
+        response = self.client.get(self.url, {'start': '2026-03-01T00:00:00+02:00', 'end': '2026-04-01T00:00:00+02:00'})
+        self.assertEqual(response.status_code, 200)
+        events = json.loads(response.content)
+        self.assertEqual([e['id'] for e in events], [self.inside.id])
+        self.assertEqual(events[0]['url'], reverse('scheduling:session_detail', args=[self.inside.id]))
+        self.assertEqual(events[0]['extendedProps']['admin_url'], reverse('admin:scheduling_session_change', args=[self.inside.id]))
+
+    def test_unchanged_range_returns_304(self):
+        self.client.force_login(self.superuser)
+        params = {'start': '2026-03-01', 'end': '2026-04-01'}
+        first = self.client.get(self.url, params)
+        second = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+
+        self.inside.notes = 'Changed'
+        self.inside.save()
+        third = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(third.status_code, 200)
+
+    def test_missing_range_is_rejected(self):
+        self.client.force_login(self.superuser)
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+    def test_calendar_page_does_not_embed_sessions(self):
+        self.client.force_login(self.superuser)
+        response = self.client.get(reverse('scheduling:session_calendar'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('events_json', response.context)
+        self.assertContains(response, self.url)
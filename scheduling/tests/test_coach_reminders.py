@@ -0,0 +1,80 @@
+import datetime
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from accounts.models import Coach
+from core.models import OutboundEmail
+from players.models import SchoolGroup
+from scheduling.models import CoachAvailability, Session, SessionCoach, Venue
+from scheduling.reminders import build_coach_reminder_emails, collect_coach_reminders
+
+User = get_user_model()
+
+
+class CoachReminderPipelineTest(TestCase):
+    def setUp(self):
+        self.venue = Venue.objects.create(name="Courts")
+        self.group = SchoolGroup.objects.create(name="U11")
+        self.tomorrow = timezone.now().date() + datetime.timedelta(days=1)
+        self.coaches = []
+
+    def _coach(self, username):
+        user = User.objects.create_user(username=username, email=f'{username}@example.com', password='password', is_staff=True)
+        coach = Coach.objects.create(user=user, name=username.title())
+        self.coaches.append(coach)
+        return coach
+
+    def _session(self, start, *coaches):
+        session = Session.objects.create(
+            session_date=self.tomorrow, session_start_time=start, venue=self.venue,
+            school_group=self.group, planned_duration_minutes=60
+        )
+        for coach in coaches:
+            SessionCoach.objects.create(session=session, coach=coach, coaching_duration_minutes=45)
+        return session
+
+    def test_only_days_with_unresponded_sessions_are_reminded(self):
+        alice, bob = self._coach('alice'), self._coach('bob')
+        confirmed = self._session('09:00', alice, bob)
+        self._session('11:00', alice)
+        CoachAvailability.objects.create(coach=bob.user, session=confirmed, status=CoachAvailability.Status.AVAILABLE, last_action='CONFIRM')
+        CoachAvailability.objects.create(coach=alice.user, session=confirmed, status=CoachAvailability.Status.AVAILABLE, last_action='CONFIRM')
+
+        reminders = collect_coach_reminders(timezone.now())
+        self.assertEqual([user.username for user, _ in reminders], ['alice'])
+        # The email still lists every session that day, with its status
+        self.assertEqual(len(reminders[0][1][self.tomorrow]), 2)
+        (_, email), = build_coach_reminder_emails(reminders)
+        html = email.alternatives[0][0]
+        self.assertIn("Confirmed", html)
+        self.assertIn("45 min", html)
+
+    def test_query_count_does_not_grow_with_coaches(self):
+        def count():
+            with self.assertNumQueries(3):
+                reminders = collect_coach_reminders(timezone.now())
+            with self.assertNumQueries(0):
+                build_coach_reminder_emails(reminders)
+            return len(reminders)
+
+        self._session('09:00', self._coach('c0'))
+        self.assertEqual(count(), 1)
+        for i in range(1, 6):
+            self._session(f'{9 + i:02d}:00', self._coach(f'c{i}'), self.coaches[0])
+        self.assertEqual(count(), 6)
+
+    def test_command_dry_run_and_send(self):
+        self._session('09:00', self._coach('alice'))
+        out = StringIO()
+        call_command('send_session_reminders', '--dry-run', stdout=out)
+        self.assertIn("Would send to: alice", out.getvalue())
+        self.assertIn("Timing:", out.getvalue())
+        self.assertFalse(OutboundEmail.objects.exists())
+
+        call_command('send_session_reminders', '--email', 'test@example.com', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['test@example.com'])
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.Status.SENT)
@@ -0,0 +1,61 @@
+from datetime import date, time
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from accounts.models import Coach
+from players.models import SchoolGroup
+from scheduling.models import Session, SessionCoach, Venue
+from scheduling.utils import check_for_conflicts, CoachConflictIndex
+
+User = get_user_model()
+
+class CoachConflictIndexTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='coach', password='password', is_staff=True)
+        self.coach = Coach.objects.create(user=user, name='Coach')
+        self.venue_a = Venue.objects.create(name='Venue A')
+        self.venue_b = Venue.objects.create(name='Venue B')
+        self.group = SchoolGroup.objects.create(name='Group')
+        self.day = date(2026, 3, 2)
+
+        # Assigned sessions: 10:00 at A, 12:00 at B, 15:00 at A
+        for hour, venue in [(10, self.venue_a), (12, self.venue_b), (15, self.venue_a)]:
+            session = Session.objects.create(
+                session_date=self.day, session_start_time=time(hour, 0),
+                planned_duration_minutes=60, venue=venue, school_group=self.group
+            )
+            SessionCoach.objects.create(session=session, coach=self.coach, coaching_duration_minutes=60)
+
+    def _sessions(self):
+        return list(Session.objects.select_related('school_group', 'venue').prefetch_related('sessioncoach_set'))
+
+    def _candidate(self, hour, minute, venue, duration=60):
+        return Session.objects.create(
+            session_date=self.day, session_start_time=time(hour, minute),
+            planned_duration_minutes=duration, venue=venue, school_group=self.group
+        )
+
+    def test_matches_pairwise_check(self):
+        """The index reports exactly what check_for_conflicts reports for each candidate."""
+        candidates = [
+            self._candidate(10, 30, self.venue_a),   # overlap
+            self._candidate(11, 10, self.venue_a),   # travel to B at 12:00
+            self._candidate(13, 15, self.venue_a),   # travel from B at 12:00
+            self._candidate(17, 0, self.venue_b),    # free
+            self._candidate(9, 0, self.venue_a, duration=480),  # overlaps everything
+        ]
+        sessions = self._sessions()
+        index = CoachConflictIndex(sessions)
+        coach_sessions = [s for s in sessions if any(sc.coach_id == self.coach.id for sc in s.sessioncoach_set.all())]
+
+        for candidate in candidates:
+            expected = check_for_conflicts(self.coach, candidate, coach_sessions)
+            self.assertEqual(index.conflict_for(self.coach.id, candidate), expected)
+
+        self.assertIsNone(index.conflict_for(self.coach.id, candidates[3]))
+        self.assertEqual(index.conflicts_for_session(candidates[3]), {})
+        self.assertIn(self.coach.id, index.conflicts_for_session(candidates[0]))
+
+    def test_unindexed_coach_has_no_conflicts(self):
+        index = CoachConflictIndex(self._sessions())
+        candidate = self._candidate(10, 0, self.venue_a)
+        self.assertIsNone(index.conflict_for(self.coach.id + 100, candidate))
@@ -107,3 +107,35 @@ class HeadCoachDisplayTest(TestCase):
         response = self.client.get(reverse('homepage'))
         self.assertContains(response, "Head")
         self.assertContains(response, "Assistant")
+
+
+class HeadCoachResolverTest(TestCase):
+    def setUp(self):
+        self.cheap = Coach.objects.create(name="Cheap", hourly_rate=100)
+        self.pricey = Coach.objects.create(name="Pricey", hourly_rate=300)
+        self.unrated = Coach.objects.create(name="Unrated")
+        today = timezone.now().date()
+
+        self.flagged = Session.objects.create(session_date=today, session_start_time='09:00')
+        self.by_rate = Session.objects.create(session_date=today, session_start_time='11:00')
+        self.empty = Session.objects.create(session_date=today, session_start_time='13:00')
+
+        for coach in (self.pricey, self.cheap):
+            SessionCoach.objects.create(session=self.flagged, coach=coach, coaching_duration_minutes=60, is_head_coach=(coach == self.cheap))
+        for coach in (self.unrated, self.cheap, self.pricey):
+            SessionCoach.objects.create(session=self.by_rate, coach=coach, coaching_duration_minutes=60)
+
+    def test_bulk_resolver_matches_get_head_coach(self):
+        sessions = [self.flagged, self.by_rate, self.empty]
+        with self.assertNumQueries(1):
+            head_coaches = Session.resolve_head_coaches(sessions)
+
+        self.assertEqual(head_coaches, {self.flagged.id: self.cheap, self.by_rate.id: self.pricey})
+        for session in sessions:
+            self.assertEqual(head_coaches.get(session.id), session.get_head_coach())
+
+    def test_get_head_coach_uses_prefetched_assignments(self):
+        sessions = list(Session.objects.filter(pk__in=[self.flagged.pk, self.by_rate.pk]).order_by('session_start_time').prefetch_related('sessioncoach_set__coach'))
+        with self.assertNumQueries(0):
+            self.assertEqual(sessions[0].get_head_coach(), self.cheap)
+            self.assertEqual(sessions[1].get_head_coach(), self.pricey)
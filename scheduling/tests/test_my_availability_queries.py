@@ -0,0 +1,82 @@
+import datetime
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import Coach
+from players.models import SchoolGroup
+from scheduling.models import CoachAvailability, Session, SessionCoach, Venue
+
+User = get_user_model()
+Status = CoachAvailability.Status
+
+
+class MyAvailabilityQueryCountTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='coach', password='password', is_staff=True)
+        self.coach = Coach.objects.create(user=self.user, name='Coach')
+        self.client.login(username='coach', password='password')
+        self.venue = Venue.objects.create(name="Courts")
+        self.group = SchoolGroup.objects.create(name="U13")
+        today = timezone.now().date()
+        self.week_start = today - datetime.timedelta(days=today.weekday()) + datetime.timedelta(weeks=1)
+        self.url = reverse('scheduling:my_availability') + '?week=1'
+
+    def _add_sessions(self, count):
+        sessions = []
+        for index in range(count):
+            session = Session.objects.create(
+                school_group=self.group, venue=self.venue,
+                session_date=self.week_start + datetime.timedelta(days=index % 7),
+                session_start_time=datetime.time(8 + index, 0)
+            )
+            SessionCoach.objects.create(session=session, coach=self.coach, coaching_duration_minutes=60)
+            sessions.append(session)
+        return sessions
+
+    def _count_queries(self, method, *args):
+        with CaptureQueriesContext(connection) as context:
+            response = method(*args)
+        self.assertIn(response.status_code, (200, 302))
+        return len(context.captured_queries), response
+
+    def test_get_creates_pending_records_in_constant_queries(self):
+        self._add_sessions(2)
+        small_week, _ = self._count_queries(self.client.get, self.url)
+        CoachAvailability.objects.all().delete()
+
+        sessions = self._add_sessions(6)
+        large_week, response = self._count_queries(self.client.get, self.url)
+
+        self.assertEqual(small_week, large_week)
+        self.assertEqual(CoachAvailability.objects.filter(coach=self.user, status=Status.PENDING).count(), 8)
+        rendered = [s for day in response.context['display_week'] for s in day['sessions']]
+        self.assertEqual(len(rendered), 8)
+        self.assertTrue(all(s['current_status'] == Status.PENDING and s['is_assigned'] for s in rendered))
+        self.assertIn(sessions[0], [s['session_obj'] for s in rendered])
+
+    def test_post_writes_changes_in_constant_queries(self):
+        def submit(sessions, status):
+            data = {f'availability_session_{s.id}': status for s in sessions}
+            data.update({f'notes_session_{s.id}': 'note' for s in sessions[:1]})
+            return self._count_queries(self.client.post, self.url, data)
+
+        small_week, _ = submit(self._add_sessions(2), Status.AVAILABLE)
+        sessions = self._add_sessions(6)
+        large_week, _ = submit(sessions, Status.EMERGENCY)
+
+        self.assertEqual(small_week, large_week)
+        self.assertEqual(CoachAvailability.objects.filter(status=Status.EMERGENCY).count(), 6)
+        self.assertEqual(CoachAvailability.objects.get(session=sessions[0]).notes, 'note')
+
+    def test_post_reports_unknown_sessions_and_skips_unchanged(self):
+        session = self._add_sessions(1)[0]
+        CoachAvailability.objects.create(coach=self.user, session=session, status=Status.AVAILABLE)
+        response = self.client.post(self.url, {
+            f'availability_session_{session.id}': Status.AVAILABLE,
+            'availability_session_999999': Status.AVAILABLE,
+        }, follow=True)
+        self.assertContains(response, "Could not find session with ID 999999.")
+        self.assertContains(response, "No changes to your availability were saved.")
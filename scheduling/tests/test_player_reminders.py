@@ -0,0 +1,79 @@
+import datetime
+from io import StringIO
+from unittest import mock
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from players.models import Player, SchoolGroup
+from scheduling.models import AttendanceTracking, Session, Venue
+from scheduling.notifications import build_player_attendance_email
+from scheduling.reminders import send_player_reminders
+
+
+class FlakyBackend(EmailBackend):
+    def send_messages(self, messages):
+        if any(to.startswith('bounce') for message in messages for to in message.to):
+            raise ConnectionError("mailbox unavailable")
+        return super().send_messages(messages)
+
+
+class PlayerReminderEngineTest(TestCase):
+    def setUp(self):
+        self.venue = Venue.objects.create(name="Courts")
+        self.group = SchoolGroup.objects.create(name="U13 <A>")
+        self.session = Session.objects.create(
+            session_date=timezone.now().date() + datetime.timedelta(days=1), session_start_time='15:00',
+            venue=self.venue, school_group=self.group, planned_duration_minutes=60
+        )
+        self.players = [self._player(f"P{i}", f"parent{i}@example.com") for i in range(3)]
+        self._player("NoEmail", "")
+        self._player("Inactive", "inactive@example.com", is_active=False)
+
+    def _player(self, first_name, email, **kwargs):
+        player = Player.objects.create(first_name=first_name, last_name="Player", notification_email=email or None, **kwargs)
+        player.school_groups.add(self.group)
+        return player
+
+    def _sessions(self):
+        return Session.objects.filter(pk=self.session.pk)
+
+    def test_matches_single_email_builder(self):
+        player = self._player("O'Brien & Co", "obrien@example.com")
+        with mock.patch('django.core.signing.time.time', return_value=1_800_000_000):
+            send_player_reminders(self._sessions(), rate_per_second=0)
+            expected = build_player_attendance_email(player, self.session)
+        sent = next(message for message in mail.outbox if message.to == ["obrien@example.com"])
+        self.assertEqual(sent.subject, expected.subject)
+        self.assertEqual(sent.alternatives, expected.alternatives)
+
+    def test_sends_to_verified_players_and_creates_tracking_in_bulk(self):
+        existing = AttendanceTracking.objects.create(session=self.session, player=self.players[0])
+        with self.assertNumQueries(5):  # sessions, players, tracking, insert, read back
+            stats = send_player_reminders(self._sessions(), rate_per_second=0)
+        self.assertEqual((stats['emails'], stats['sent'], stats['sessions']), (3, 3, 1))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), [f"parent{i}@example.com" for i in range(3)])
+        self.assertEqual(AttendanceTracking.objects.filter(session=self.session).count(), 3)
+        self.assertTrue(AttendanceTracking.objects.filter(pk=existing.pk).exists())
+
+    def test_rate_limit_and_failures(self):
+        self._player("Bounce", "bounce@example.com")
+        slept, errors = [], []
+        stats = send_player_reminders(
+            self._sessions(), connection=FlakyBackend(), rate_per_second=10, burst=2,
+            sleep=slept.append, progress=lambda player, session, error: error and errors.append(player.first_name)
+        )
+        self.assertEqual((stats['sent'], stats['failed']), (3, 1))
+        self.assertEqual(errors, ["Bounce"])
+        # Two sends go straight through, the other two wait for tokens
+        self.assertEqual(len(slept), 2)
+        self.assertGreater(stats['emails_per_second'], 0)
+
+    def test_command_dry_run_writes_nothing(self):
+        out = StringIO()
+        call_command('send_player_reminders', '--dry-run', stdout=out)
+        self.assertIn("Would send to: P0 Player <parent0@example.com>", out.getvalue())
+        self.assertIn("Throughput:", out.getvalue())
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(AttendanceTracking.objects.exists())
@@ -0,0 +1,110 @@
+import datetime
+import re
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import Coach
+from finance.analytics_service import calculate_monthly_projection
+from finance.models import CoachSessionCompletion
+from players.models import Player, SchoolGroup
+from scheduling.models import AttendanceTracking, CoachAvailability, ScheduledClass, Session, SessionCoach, Venue
+from scheduling.stats import calculate_group_attendance_stats, calculate_player_attendance_stats
+
+User = get_user_model()
+
+# Tables on the hot paths; a query may read them via an index but never by scanning the whole table
+HOT_TABLES = {
+    'scheduling_session', 'scheduling_attendancetracking', 'scheduling_coachavailability',
+    'scheduling_sessioncoach', 'finance_coachsessioncompletion',
+}
+FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+
+
+class QueryPlanTest(TestCase):
+    """
+    Runs the critical pages and services, then EXPLAIN QUERY PLANs every SELECT they issued
+    and fails if one of them reads a hot table with a full table scan.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', password='password')
+        cls.coach_user = User.objects.create_user(username='coach', password='password', is_staff=True)
+        cls.coach = Coach.objects.create(user=cls.coach_user, name='Coach', hourly_rate=Decimal('100.00'))
+        venue = Venue.objects.create(name='Courts')
+        cls.group = SchoolGroup.objects.create(name='U13')
+        cls.player = Player.objects.create(first_name='Pat', last_name='Player')
+        cls.player.school_groups.add(cls.group)
+        rule = ScheduledClass.objects.create(school_group=cls.group, day_of_week=0, start_time=datetime.time(15, 0), default_venue=venue)
+
+        today = timezone.now().date()
+        for offset in range(-10, 11, 2):
+            session = Session.objects.create(
+                school_group=cls.group, venue=venue, generated_from_rule=rule,
+                session_date=today + datetime.timedelta(days=offset), session_start_time=datetime.time(15, 0),
+                status='finished' if offset < 0 else 'pending'
+            )
+            SessionCoach.objects.create(session=session, coach=cls.coach, coaching_duration_minutes=60)
+            CoachAvailability.objects.create(coach=cls.coach_user, session=session, status=CoachAvailability.Status.AVAILABLE)
+            AttendanceTracking.objects.create(session=session, player=cls.player, attended=AttendanceTracking.CoachAttended.YES)
+            if offset < 0:
+                CoachSessionCompletion.objects.create(session=session, coach=cls.coach, confirmed_for_payment=True)
+
+    def _full_scans(self, queries):
+        scans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                for row in cursor.fetchall():
+                    match = FULL_SCAN.search(row[-1])
+                    if match and match.group(1) in HOT_TABLES:
+                        scans.append(f"{row[-1]}\n    in: {sql}")
+        return scans
+
+    def _assert_no_full_scans(self, run):
+        with CaptureQueriesContext(connection) as context:
+            run()
+        scans = self._full_scans(context.captured_queries)
+        self.assertEqual(scans, [], "Full table scans on hot tables:\n" + "\n".join(scans))
+
+    def _get(self, username, url, **params):
+        def run():
+            self.client.login(username=username, password='password')
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+        return run
+
+    def test_calendar_feed(self):
+        today = timezone.now().date()
+        self._assert_no_full_scans(self._get(
+            'admin', reverse('scheduling:session_calendar_events'),
+            start=(today - datetime.timedelta(days=7)).isoformat(), end=(today + datetime.timedelta(days=7)).isoformat()
+        ))
+
+    def test_staffing(self):
+        self._assert_no_full_scans(self._get('admin', reverse('scheduling:session_staffing')))
+
+    def test_admin_dashboard(self):
+        self._assert_no_full_scans(self._get('admin', reverse('homepage')))
+
+    def test_coach_dashboard(self):
+        self._assert_no_full_scans(self._get('coach', reverse('homepage')))
+
+    def test_projection(self):
+        today = timezone.now().date()
+        self._assert_no_full_scans(lambda: calculate_monthly_projection(today.year, today.month))
+
+    def test_attendance_stats(self):
+        today = timezone.now().date()
+        start = today - datetime.timedelta(days=90)
+        self._assert_no_full_scans(lambda: (
+            calculate_player_attendance_stats(self.player, start.isoformat(), today.isoformat()),
+            calculate_group_attendance_stats(self.group, start, today),
+        ))
@@ -0,0 +1,64 @@
+from datetime import date, time
+from django.test import TestCase
+from accounts.models import Coach
+from players.models import Player, SchoolGroup
+from scheduling.models import ScheduledClass, Session, SessionCoach, Venue
+from scheduling.session_generation_service import generate_sessions_for_rules
+
+
+class SessionGenerationTest(TestCase):
+    def setUp(self):
+        self.venue = Venue.objects.create(name="Main Courts")
+        self.group = SchoolGroup.objects.create(name="U13")
+        self.coach = Coach.objects.create(name="Coach")
+        self.active = Player.objects.create(first_name="Active", last_name="Player")
+        self.inactive = Player.objects.create(first_name="Inactive", last_name="Player", is_active=False)
+        self.active.school_groups.add(self.group)
+        self.inactive.school_groups.add(self.group)
+
+        # Mondays at 15:00, 90 minutes
+        self.rule = ScheduledClass.objects.create(
+            school_group=self.group, day_of_week=0, start_time=time(15, 0),
+            default_duration_minutes=90, default_venue=self.venue
+        )
+        self.rule.default_coaches.add(self.coach)
+        # March 2026 has five Mondays: 2, 9, 16, 23, 30
+        self.start, self.end = date(2026, 3, 1), date(2026, 3, 31)
+
+    def test_creates_sessions_with_coaches_and_attendees(self):
+        results = generate_sessions_for_rules(ScheduledClass.objects.all(), self.start, self.end)
+
+        self.assertEqual((results['created'], results['skipped_exists'], results['errors']), (5, 0, 0))
+        self.assertIn('total_ms', results['stats'])
+        sessions = Session.objects.filter(generated_from_rule=self.rule)
+        self.assertEqual(sorted(s.session_date.day for s in sessions), [2, 9, 16, 23, 30])
+        self.assertEqual(SessionCoach.objects.filter(session__in=sessions, coach=self.coach, coaching_duration_minutes=90).count(), 5)
+        for session in sessions:
+            self.assertEqual(list(session.attendees.all()), [self.active])
+
+    def test_skips_existing_and_clashing_manual_sessions(self):
+        Session.objects.create(school_group=self.group, session_date=date(2026, 3, 2), session_start_time=time(15, 0), generated_from_rule=self.rule)
+        manual = Session.objects.create(school_group=self.group, session_date=date(2026, 3, 9), session_start_time=time(15, 0))
+
+        results = generate_sessions_for_rules(ScheduledClass.objects.all(), self.start, self.end)
+        self.assertEqual((results['created'], results['skipped_exists']), (3, 2))
+        manual.refresh_from_db()
+        self.assertIsNone(manual.generated_from_rule)
+
+        # Re-running is idempotent
+        rerun = generate_sessions_for_rules(ScheduledClass.objects.all(), self.start, self.end)
+        self.assertEqual((rerun['created'], rerun['skipped_exists']), (0, 5))
+
+    def test_overwrite_links_manual_session(self):
+        manual = Session.objects.create(school_group=self.group, session_date=date(2026, 3, 9), session_start_time=time(15, 0))
+
+        results = generate_sessions_for_rules(ScheduledClass.objects.all(), self.start, self.end, overwrite_existing_non_generated=True)
+        self.assertEqual(results['created'], 5)
+        self.assertEqual(len(results['details']), 1)
+        manual.refresh_from_db()
+        self.assertEqual(manual.generated_from_rule, self.rule)
+        self.assertEqual(Session.objects.filter(session_date=date(2026, 3, 9)).count(), 1)
+
+    def test_invalid_period(self):
+        results = generate_sessions_for_rules(ScheduledClass.objects.all(), self.end, self.start)
+        self.assertEqual(results['errors'], 1)
@@ -0,0 +1,63 @@
+import datetime
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import Coach
+from players.models import SchoolGroup
+from scheduling.models import ScheduledClass, Session, SessionCoach
+from scheduling.session_generation_service import generate_sessions_for_rules
+
+User = get_user_model()
+
+
+class SessionScheduledTimesTest(TestCase):
+    def setUp(self):
+        self.group = SchoolGroup.objects.create(name="U12")
+
+    def test_save_stores_start_and_end(self):
+        session = Session.objects.create(
+            school_group=self.group, session_date=datetime.date(2026, 5, 4),
+            session_start_time=datetime.time(15, 30), planned_duration_minutes=90
+        )
+        session.refresh_from_db()
+        self.assertEqual(session.scheduled_start, session.start_datetime)
+        self.assertEqual(session.scheduled_end, session.start_datetime + datetime.timedelta(minutes=90))
+
+    def test_save_with_update_fields_keeps_times_in_sync(self):
+        session = Session.objects.create(school_group=self.group, session_date=datetime.date(2026, 5, 4), session_start_time=datetime.time(15, 0))
+        session.planned_duration_minutes = 30
+        session.save(update_fields=['planned_duration_minutes'])
+        session.refresh_from_db()
+        self.assertEqual(session.scheduled_end - session.scheduled_start, datetime.timedelta(minutes=30))
+
+    def test_generated_sessions_store_times(self):
+        rule = ScheduledClass.objects.create(school_group=self.group, day_of_week=0, start_time=datetime.time(14, 0), default_duration_minutes=45)
+        generate_sessions_for_rules(ScheduledClass.objects.filter(pk=rule.pk), datetime.date(2026, 5, 4), datetime.date(2026, 5, 17))
+        sessions = list(Session.objects.filter(generated_from_rule=rule))
+        self.assertEqual(len(sessions), 2)
+        for session in sessions:
+            self.assertEqual((session.scheduled_start, session.scheduled_end), (session.start_datetime, session.end_datetime))
+
+
+class FinishedSessionFilteringTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='coach', password='password', is_staff=True)
+        self.coach = Coach.objects.create(user=self.user, name="Coach", hourly_rate=Decimal('100.00'))
+        group = SchoolGroup.objects.create(name="U14")
+        now = timezone.localtime()
+        self.finished = self._session(group, now - datetime.timedelta(hours=3))
+        self.running = self._session(group, now - datetime.timedelta(minutes=30))
+
+    def _session(self, group, start):
+        session = Session.objects.create(
+            school_group=group, session_date=start.date(), session_start_time=start.time(), planned_duration_minutes=60
+        )
+        SessionCoach.objects.create(session=session, coach=self.coach, coaching_duration_minutes=60)
+        return session
+
+    def test_feedback_list_only_contains_finished_sessions(self):
+        self.client.login(username='coach', password='password')
+        response = self.client.get(reverse('homepage'))
+        self.assertEqual(list(response.context['recent_sessions_for_feedback']), [self.finished])
@@ -0,0 +1,117 @@
+import datetime
+import itertools
+import random
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from accounts.models import Coach
+from players.models import SchoolGroup
+from scheduling.models import CoachAvailability, Session, SessionCoach, Venue
+from scheduling.staffing_solver import apply_staffing, min_cost_assignment, propose_staffing
+
+User = get_user_model()
+MONDAY = datetime.date(2026, 6, 1)
+
+
+class MinCostAssignmentTest(TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        for _ in range(25):
+            rows, cols = rng.randint(1, 4), rng.randint(4, 6)
+            costs = [[rng.randint(0, 50) for _ in range(cols)] for _ in range(rows)]
+            assignment = min_cost_assignment(costs)
+            self.assertEqual(len(set(assignment)), rows)
+            best = min(sum(costs[r][c] for r, c in enumerate(perm)) for perm in itertools.permutations(range(cols), rows))
+            self.assertEqual(sum(costs[r][c] for r, c in enumerate(assignment)), best)
+
+
+class StaffingSolverTest(TestCase):
+    def setUp(self):
+        self.group = SchoolGroup.objects.create(name="U13")
+        self.courts = Venue.objects.create(name="Courts")
+        self.club = Venue.objects.create(name="Club")
+        self.senior = self._coach('senior', '300.00')
+        self.junior = self._coach('junior', '100.00')
+        self.emergency = self._coach('emergency', '50.00')
+
+    def _coach(self, username, rate):
+        user = User.objects.create_user(username=username, password='password', is_staff=True)
+        return Coach.objects.create(user=user, name=username.title(), hourly_rate=Decimal(rate))
+
+    def _session(self, start, venue, day=0, available=(), emergency=()):
+        session = Session.objects.create(
+            school_group=self.group, venue=venue, session_date=MONDAY + datetime.timedelta(days=day),
+            session_start_time=datetime.time(*start), planned_duration_minutes=60
+        )
+        for coach in available:
+            CoachAvailability.objects.create(coach=coach.user, session=session, status=CoachAvailability.Status.AVAILABLE)
+        for coach in emergency:
+            CoachAvailability.objects.create(coach=coach.user, session=session, status=CoachAvailability.Status.EMERGENCY)
+        return session
+
+    def _added(self, plan):
+        return {entry['session'].id: [(a['coach'], a['is_head']) for a in entry['added']] for entry in plan['sessions']}
+
+    def test_head_slot_goes_to_senior_and_extra_slots_to_cheapest(self):
+        session = self._session((15, 0), self.courts, available=[self.senior, self.junior], emergency=[self.emergency])
+        plan = propose_staffing(MONDAY, MONDAY, coaches_per_session=2)
+        self.assertEqual(sorted(self._added(plan)[session.id], key=lambda a: not a[1]), [(self.senior, True), (self.junior, False)])
+
+    def test_available_preferred_over_emergency_and_unavailable_ignored(self):
+        session = self._session((15, 0), self.courts, available=[self.junior], emergency=[self.emergency])
+        CoachAvailability.objects.create(coach=self.senior.user, session=session, status=CoachAvailability.Status.UNAVAILABLE)
+        plan = propose_staffing(MONDAY, MONDAY)
+        self.assertEqual(self._added(plan)[session.id], [(self.junior, True)])
+
+        lone = self._session((9, 0), self.courts, day=1, emergency=[self.emergency])
+        plan = propose_staffing(MONDAY, MONDAY + datetime.timedelta(days=1))
+        self.assertEqual(self._added(plan)[lone.id], [(self.emergency, True)])
+        self.assertEqual(plan['stats']['emergency'], 1)
+
+    def test_conflicts_and_existing_assignments_are_respected(self):
+        kept = self._session((15, 0), self.courts, available=[self.senior])
+        SessionCoach.objects.create(session=kept, coach=self.senior, coaching_duration_minutes=60)
+        # Starts as `kept` ends but at another venue: no travel time for the senior coach
+        travel = self._session((16, 0), self.club, available=[self.senior])
+        # Same venue right after is fine
+        same_venue = self._session((16, 0), self.courts, available=[self.senior])
+
+        plan = propose_staffing(MONDAY, MONDAY)
+        added = self._added(plan)
+        self.assertEqual(added[kept.id], [])
+        self.assertEqual(added[travel.id], [])
+        self.assertEqual(added[same_venue.id], [(self.senior, True)])
+        self.assertEqual(plan['stats']['unfilled'], 1)
+
+    def test_apply_writes_plan_in_bulk(self):
+        replaced = self._session((10, 0), self.courts, available=[self.junior])
+        SessionCoach.objects.create(session=replaced, coach=self.emergency, coaching_duration_minutes=60)
+        other = self._session((12, 0), self.courts, available=[self.senior])
+
+        plan = propose_staffing(MONDAY, MONDAY, replace_existing=True)
+        with self.assertNumQueries(4):  # savepoint, delete, insert, release
+            created, removed = apply_staffing(plan)
+        self.assertEqual((created, removed), (2, 1))
+        self.assertEqual(
+            set(SessionCoach.objects.values_list('session_id', 'coach_id', 'is_head_coach')),
+            {(replaced.id, self.junior.id, True), (other.id, self.senior.id, True)}
+        )
+
+    def test_preview_then_apply(self):
+        session = self._session((15, 0), self.courts, available=[self.junior])
+        admin = User.objects.create_superuser(username='admin', password='password')
+        self.client.force_login(admin)
+        params = {'start': MONDAY.isoformat(), 'end': MONDAY.isoformat()}
+
+        preview = self.client.get(reverse('scheduling:staffing_solver'), params)
+        self.assertEqual(preview.status_code, 200)
+        self.assertFalse(SessionCoach.objects.exists())
+
+        stale = self.client.post(reverse('scheduling:staffing_solver'), {**params, 'fingerprint': 'stale'})
+        self.assertEqual(stale.status_code, 200)
+        self.assertFalse(SessionCoach.objects.exists())
+
+        applied = self.client.post(reverse('scheduling:staffing_solver'), {**params, 'fingerprint': preview.context['plan']['fingerprint']})
+        self.assertEqual(applied.status_code, 302)
+        self.assertTrue(SessionCoach.objects.filter(session=session, coach=self.junior, is_head_coach=True).exists())
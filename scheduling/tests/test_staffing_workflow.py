@@ -8,6 +8,7 @@ from scheduling.models import Session, Venue, SessionCoach, CoachAvailability
 from players.models import SchoolGroup
 from accounts.models import Coach
 from scheduling.notifications import send_consolidated_session_reminder_email
+from core.outbox import deliver_outbox
 from datetime import timedelta
 import json
 
@@ -89,6 +90,8 @@ class StaffingWorkflowTest(TestCase):
         
         sent = send_consolidated_session_reminder_email(self.coach_user, sessions_by_day, is_reminder=True)
         self.assertTrue(sent)
+        self.assertEqual(len(mail.outbox), 0)  # Queued, not sent inline
+        deliver_outbox(rate_per_second=0)
         
         # Verify email
         self.assertEqual(len(mail.outbox), 1)
@@ -120,3 +123,155 @@ class StaffingWorkflowTest(TestCase):
                 found = True
                 break
         self.assertTrue(found, "Assigned session not found in coach's homepage card.")
+
+
+class StaffingQueryCountTest(TestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(username='admin', email='admin@example.com', password='password')
+        self.venue = Venue.objects.create(name="Test Venue")
+        self.group = SchoolGroup.objects.create(name="Test Group")
+        self.coaches = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'coach{i}', password='password', is_staff=True)
+            self.coaches.append(Coach.objects.create(user=user, name=f'Coach {i}'))
+        today = timezone.now().date()
+        self.week_start = today - timedelta(days=today.weekday())
+
+    def _add_sessions(self, count):
+        for i in range(count):
+            session = Session.objects.create(
+                session_date=self.week_start + timedelta(days=i % 7),
+                session_start_time=f'{8 + i % 10:02d}:00',
+                venue=self.venue,
+                school_group=self.group,
+                planned_duration_minutes=60
+            )
+            coach = self.coaches[i % len(self.coaches)]
+            SessionCoach.objects.create(session=session, coach=coach, coaching_duration_minutes=60, is_head_coach=(i % 2 == 0))
+            CoachAvailability.objects.create(coach=coach.user, session=session, status=CoachAvailability.Status.AVAILABLE)
+
+    def _count_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('scheduling:session_staffing'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_staffing_queries_do_not_grow_with_sessions(self):
+        """The staffing page runs the same number of queries for a quiet and a busy week."""
+        self.client.force_login(self.admin_user)
+        self._add_sessions(2)
+        small_week = self._count_queries()
+        self._add_sessions(12)
+        busy_week = self._count_queries()
+        self.assertEqual(small_week, busy_week)
+
+    def test_counts_are_attached(self):
+        from scheduling.models import AttendanceTracking
+        from players.models import Player
+        self._add_sessions(1)
+        session = Session.objects.get()
+        attending = Player.objects.create(first_name='A', last_name='Player')
+        inactive = Player.objects.create(first_name='B', last_name='Player', is_active=False)
+        attending.school_groups.add(self.group)
+        inactive.school_groups.add(self.group)
+        AttendanceTracking.objects.create(session=session, player=attending, parent_response=AttendanceTracking.ParentResponse.ATTENDING)
+
+        self.client.force_login(self.admin_user)
+        response = self.client.get(reverse('scheduling:session_staffing'))
+        items = [item for day in response.context['display_week'] for item in day['sessions']]
+        self.assertEqual(items[0]['total_players'], 1)
+        self.assertEqual(items[0]['confirmed_players_count'], 1)
+        self.assertEqual(items[0]['head_coach_id'], self.coaches[0].id)
+
+    def test_fallback_head_coach_is_not_preselected(self):
+        session = Session.objects.create(
+            session_date=self.week_start, session_start_time='09:00', venue=self.venue,
+            school_group=self.group, planned_duration_minutes=60
+        )
+        self.coaches[1].hourly_rate = 300
+        self.coaches[1].save()
+        for coach in self.coaches[:2]:
+            SessionCoach.objects.create(session=session, coach=coach, coaching_duration_minutes=60)
+
+        self.client.force_login(self.admin_user)
+        response = self.client.get(reverse('scheduling:session_staffing'))
+        item = next(item for day in response.context['display_week'] for item in day['sessions'])
+        self.assertEqual(item['session_obj'].head_coach, self.coaches[1])
+        self.assertIsNone(item['head_coach_id'])
+        self.assertNotRegex(response.content.decode(), rf'name="head_coach_{session.id}"[^>]*checked')
+
+
+class BatchAssignmentTest(TestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(username='admin', email='admin@example.com', password='password')
+        self.venue = Venue.objects.create(name="Test Venue")
+        self.other_venue = Venue.objects.create(name="Other Venue")
+        self.group = SchoolGroup.objects.create(name="Test Group")
+        self.coaches = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'coach{i}', password='password', is_staff=True)
+            self.coaches.append(Coach.objects.create(user=user, name=f'Coach {i}'))
+        self.day = timezone.now().date() + timedelta(days=2)
+        self.url = reverse('scheduling:assign_coaches_batch_ajax')
+        self.client.force_login(self.admin_user)
+
+    def _session(self, start, venue=None):
+        return Session.objects.create(
+            session_date=self.day, session_start_time=start, venue=venue or self.venue,
+            school_group=self.group, planned_duration_minutes=60
+        )
+
+    def _post(self, changes):
+        return self.client.post(self.url, json.dumps({'changes': changes}), content_type='application/json')
+
+    def test_applies_changes_for_many_sessions(self):
+        morning, noon = self._session('09:00'), self._session('12:00')
+        kept = SessionCoach.objects.create(session=morning, coach=self.coaches[0], coaching_duration_minutes=45)
+        SessionCoach.objects.create(session=morning, coach=self.coaches[1], coaching_duration_minutes=60)
+
+        response = self._post([
+            {'session_id': morning.id, 'coach_ids': [self.coaches[0].id, self.coaches[2].id], 'head_coach_id': self.coaches[0].id},
+            {'session_id': noon.id, 'coach_ids': [self.coaches[1].id]},
+        ])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+
+        self.assertEqual(
+            set(SessionCoach.objects.values_list('session_id', 'coach_id', 'is_head_coach')),
+            {(morning.id, self.coaches[0].id, True), (morning.id, self.coaches[2].id, False), (noon.id, self.coaches[1].id, False)}
+        )
+        # Unchanged assignments keep their row and custom duration
+        self.assertEqual(SessionCoach.objects.get(pk=kept.pk).coaching_duration_minutes, 45)
+        morning_data = data['sessions'][str(morning.id)]
+        self.assertEqual(morning_data['total_coaches_assigned'], 2)
+        self.assertEqual({c['id']: c['coaching_duration'] for c in morning_data['assigned_coaches']}, {self.coaches[0].id: 45, self.coaches[2].id: 60})
+
+    def test_reports_conflicts_on_other_sessions(self):
+        existing = self._session('10:00', venue=self.other_venue)
+        SessionCoach.objects.create(session=existing, coach=self.coaches[0], coaching_duration_minutes=60)
+        moved_to = self._session('10:30')
+
+        data = self._post([{'session_id': moved_to.id, 'coach_ids': [self.coaches[0].id]}]).json()
+        self.assertIn('Time overlap', data['sessions'][str(moved_to.id)]['assigned_coaches'][0]['conflict_warning'])
+        self.assertIn('Time overlap', data['conflict_updates'][str(existing.id)][str(self.coaches[0].id)])
+
+    def test_query_count_does_not_grow_with_sessions(self):
+        def run(count):
+            changes = [{'session_id': self._session(f'{8 + i:02d}:00').id, 'coach_ids': [c.id for c in self.coaches[:2]]} for i in range(count)]
+            from django.db import connection
+            from django.test.utils import CaptureQueriesContext
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self._post(changes).status_code, 200)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(run(1), run(6))
+
+    def test_rejects_invalid_batches_without_writing(self):
+        session = self._session('09:00')
+        self.assertEqual(self._post([{'session_id': session.id, 'coach_ids': [999999]}]).status_code, 400)
+        self.assertEqual(self._post([{'session_id': 999999, 'coach_ids': []}]).status_code, 404)
+        self.assertEqual(self._post([{'session_id': session.id, 'coach_ids': [self.coaches[0].id], 'head_coach_id': self.coaches[1].id}]).status_code, 400)
+        self.assertEqual(self._post([]).status_code, 400)
+        self.assertFalse(SessionCoach.objects.exists())
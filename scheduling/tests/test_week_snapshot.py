@@ -0,0 +1,96 @@
+import datetime
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import Coach
+from players.models import SchoolGroup
+from scheduling.models import CoachAvailability, Session, SessionCoach, Venue
+from scheduling.services import WeekSnapshotService
+
+User = get_user_model()
+
+
+class WeekSnapshotServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin_user = User.objects.create_superuser(username='admin', password='password')
+        self.coach_user = User.objects.create_user(username='coach', password='password', is_staff=True)
+        self.coach = Coach.objects.create(user=self.coach_user, name="Coach")
+        self.group = SchoolGroup.objects.create(name="U10")
+        self.courts = Venue.objects.create(name="Courts")
+        self.hall = Venue.objects.create(name="Hall")
+        today = timezone.now().date()
+        self.week_start = today - timedelta(days=today.weekday())
+
+    def _session(self, day, start, venue):
+        session = Session.objects.create(
+            school_group=self.group, venue=venue, session_date=self.week_start + timedelta(days=day),
+            session_start_time=datetime.time(*start)
+        )
+        SessionCoach.objects.create(session=session, coach=self.coach, coaching_duration_minutes=60)
+        return session
+
+    def test_days_are_grouped_by_venue_and_sorted(self):
+        hall_late = self._session(0, (17, 0), self.hall)
+        courts_late = self._session(0, (16, 0), self.courts)
+        hall_early = self._session(0, (9, 0), self.hall)
+        tuesday = self._session(1, (10, 0), self.courts)
+
+        snapshot = WeekSnapshotService.load_week(self.week_start)
+        self.assertEqual([day['day_name'] for day in snapshot['days']][:2], ['Monday', 'Tuesday'])
+        self.assertEqual(snapshot['days'][0]['sessions'], [hall_early, hall_late, courts_late])
+        self.assertEqual(snapshot['days'][1]['sessions'], [tuesday])
+        self.assertEqual(len(snapshot['sessions']), 4)
+
+    def test_load_week_runs_constant_queries(self):
+        self._session(0, (9, 0), self.hall)
+        with CaptureQueriesContext(connection) as quiet:
+            WeekSnapshotService.load_week(self.week_start)
+        for day in range(7):
+            self._session(day, (10, 0), self.courts)
+            self._session(day, (11, 0), self.hall)
+        with CaptureQueriesContext(connection) as busy:
+            WeekSnapshotService.load_week(self.week_start)
+        self.assertEqual(len(quiet.captured_queries), len(busy.captured_queries))
+
+    def test_cached_snapshot_is_rebuilt_when_availability_changes(self):
+        session = self._session(2, (15, 0), self.courts)
+        WeekSnapshotService.get_week(self.week_start)
+        with self.assertNumQueries(1):
+            WeekSnapshotService.get_week(self.week_start)
+
+        CoachAvailability.objects.create(coach=self.coach_user, session=session, status=CoachAvailability.Status.AVAILABLE)
+        snapshot = WeekSnapshotService.get_week(self.week_start)
+        self.assertEqual(len(snapshot['days'][2]['sessions'][0].coach_availabilities.all()), 1)
+
+    def test_cached_snapshot_is_rebuilt_when_venue_group_or_coach_changes(self):
+        self._session(2, (15, 0), self.courts)
+        WeekSnapshotService.get_week(self.week_start)
+
+        self.courts.name = "Main Courts"
+        self.courts.save()
+        self.group.name = "U11"
+        self.group.save()
+        session = WeekSnapshotService.get_week(self.week_start)['days'][2]['sessions'][0]
+        self.assertEqual((session.venue.name, session.school_group.name), ("Main Courts", "U11"))
+
+        self.coach.hourly_rate = 250
+        self.coach.save()
+        session = WeekSnapshotService.get_week(self.week_start)['days'][2]['sessions'][0]
+        self.assertEqual(session.sessioncoach_set.all()[0].coach.hourly_rate, 250)
+
+    def test_modal_and_staffing_page_render_from_snapshot(self):
+        self._session(3, (15, 0), self.courts)
+        self.client.force_login(self.admin_user)
+        modal = self.client.get(reverse('scheduling:staffing_overview_modal'), {'date': self.week_start.isoformat()})
+        self.assertEqual(modal.status_code, 200)
+        self.assertEqual(len(modal.context['display_week'][3]['sessions']), 1)
+
+        staffing = self.client.get(reverse('scheduling:session_staffing'))
+        self.assertEqual(staffing.status_code, 200)
+        self.assertEqual(len(staffing.context['display_week'][3]['sessions']), 1)
@@ -5,8 +5,11 @@ from . import views, feeds
 app_name = 'scheduling'
 urlpatterns = [
     path('calendar/', views.session_calendar, name='session_calendar'),
+    path('api/calendar/events/', views.session_calendar_events, name='session_calendar_events'),
     path('staffing/', views.session_staffing, name='session_staffing'),
+    path('staffing/solver/', views.staffing_solver, name='staffing_solver'),
     path('api/assign-coaches/', views.assign_coaches_ajax, name='assign_coaches_ajax'),
+    path('api/assign-coaches/batch/', views.assign_coaches_batch_ajax, name='assign_coaches_batch_ajax'),
     path('api/update-coach-duration/', views.update_coach_duration_ajax, name='update_coach_duration_ajax'),
     path('session/<int:session_id>/', views.session_detail, name='session_detail'),
     path('api/session/<int:session_id>/save_plan/', views.save_session_plan, name='save_session_plan'),
@@ -21,6 +24,7 @@ urlpatterns = [
     path('dashboard/decline/<int:session_id>/', views.dashboard_decline, name='dashboard_decline'),
     path('player-response/<str:token>/', views.player_attendance_response, name='player_attendance_response'),
     path('api/session/<int:session_id>/update_attendance/', views.update_attendance_status, name='update_attendance_status'),
+    path('api/session/<int:session_id>/commit_attendance/', views.commit_attendance, name='commit_attendance'),
     path('api/update-event-date/', views.update_event_date, name='update_event_date'),
     path('api/delete-event/', views.delete_event, name='delete_event'),
     # Management API
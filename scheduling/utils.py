@@ -1,6 +1,8 @@
 # scheduling/utils.py
 
+import bisect
 import calendar
+from collections import defaultdict
 from datetime import date, timedelta
 
 def get_month_start_end(year, month):
@@ -10,6 +12,24 @@ def get_month_start_end(year, month):
     end_date = date(year, month, num_days)
     return start_date, end_date
 
+def _conflict_message(session_to_check, check_start, check_end, other_session, other_start, other_end, travel_delta):
+    """
+    Returns the conflict message between two sessions, or None.
+    Shared by check_for_conflicts and CoachConflictIndex so both report identical messages.
+    """
+    # Check for direct time overlap
+    if max(check_start, other_start) < min(check_end, other_end):
+        return f"Time overlap with {other_session.school_group.name} at {other_session.session_start_time.strftime('%H:%M')}"
+
+    # Check for travel time conflicts if venues are different
+    if other_session.venue and session_to_check.venue and other_session.venue.id != session_to_check.venue.id:
+        if check_end > other_start - travel_delta and check_start < other_start:
+            return f"Insufficient travel time from {other_session.school_group.name} at {other_session.venue.name}"
+        if other_end > check_start - travel_delta and other_start < check_start:
+            return f"Insufficient travel time to {other_session.school_group.name} at {other_session.venue.name}"
+
+    return None
+
 def check_for_conflicts(coach, session_to_check, all_coach_sessions, travel_time_minutes=30):
     """
     Checks for scheduling conflicts for a coach.
@@ -35,15 +55,98 @@ def check_for_conflicts(coach, session_to_check, all_coach_sessions, travel_time
         if not other_session.start_datetime or not other_session.end_datetime:
             continue
 
-        # Check for direct time overlap
-        if max(session_to_check.start_datetime, other_session.start_datetime) < min(session_to_check.end_datetime, other_session.end_datetime):
-            return f"Time overlap with {other_session.school_group.name} at {other_session.session_start_time.strftime('%H:%M')}"
+        message = _conflict_message(
+            session_to_check, session_to_check.start_datetime, session_to_check.end_datetime,
+            other_session, other_session.start_datetime, other_session.end_datetime,
+            travel_delta
+        )
+        if message:
+            return message
+
+    return None
+
+
+class CoachConflictIndex:
+    """
+    Per-coach index of assigned sessions, sorted by start time.
+
+    Built once per request from a list of sessions (with `sessioncoach_set` prefetched),
+    it answers "does this coach conflict with session X" by bisecting to the only
+    sessions that can overlap X or fall inside the travel buffer, instead of scanning
+    every session the coach is assigned to. Messages match check_for_conflicts.
+    """
+
+    def __init__(self, sessions, travel_time_minutes=30):
+        self.travel_delta = timedelta(minutes=travel_time_minutes)
+        entries_by_coach = defaultdict(list)
+
+        # `order` keeps the position of each session in the input, so that when several
+        # sessions conflict we report the same one check_for_conflicts would find first.
+        for order, session in enumerate(sessions):
+            start, end = session.start_datetime, session.end_datetime
+            if not start or not end:
+                continue
+            for session_coach in session.sessioncoach_set.all():
+                entries_by_coach[session_coach.coach_id].append((start, end, order, session))
+
+        self._starts = {}
+        self._entries = {}
+        self._max_duration = {}
+        for coach_id, entries in entries_by_coach.items():
+            entries.sort(key=lambda e: (e[0], e[2]))
+            self._entries[coach_id] = entries
+            self._starts[coach_id] = [e[0] for e in entries]
+            self._max_duration[coach_id] = max(e[1] - e[0] for e in entries)
+
+    def coach_ids(self):
+        """Returns the ids of all coaches with at least one indexed session."""
+        return self._entries.keys()
+
+    def _conflict(self, coach_id, session, start, end):
+        entries = self._entries.get(coach_id)
+        if not entries:
+            return None
+
+        # Any conflicting session must start before end + travel and finish after
+        # start - travel, so its start lies within this window.
+        starts = self._starts[coach_id]
+        lo = bisect.bisect_right(starts, start - self.travel_delta - self._max_duration[coach_id])
+        hi = bisect.bisect_left(starts, end + self.travel_delta)
+
+        found = None
+        for other_start, other_end, order, other_session in entries[lo:hi]:
+            if other_session.id == session.id:
+                continue
+            if found is not None and order > found[0]:
+                continue
+            message = _conflict_message(session, start, end, other_session, other_start, other_end, self.travel_delta)
+            if message:
+                found = (order, message)
+        return found[1] if found else None
+
+    def conflict_for(self, coach_id, session):
+        """Returns the conflict message for assigning `coach_id` to `session`, or None."""
+        start, end = session.start_datetime, session.end_datetime
+        if not start or not end:
+            return None
+        return self._conflict(coach_id, session, start, end)
+
+    def conflicts_for_session(self, session, coach_ids=None):
+        """
+        Returns a {coach_id: message} map of every conflicting coach for `session`.
+        Only coaches that have indexed sessions are checked.
+        """
+        start, end = session.start_datetime, session.end_datetime
+        if not start or not end:
+            return {}
 
-        # Check for travel time conflicts if venues are different
-        if other_session.venue and session_to_check.venue and other_session.venue.id != session_to_check.venue.id:
-            if session_to_check.end_datetime > other_session.start_datetime - travel_delta and session_to_check.start_datetime < other_session.start_datetime:
-                return f"Insufficient travel time from {other_session.school_group.name} at {other_session.venue.name}"
-            if other_session.end_datetime > session_to_check.start_datetime - travel_delta and other_session.start_datetime < session_to_check.start_datetime:
-                return f"Insufficient travel time to {other_session.school_group.name} at {other_session.venue.name}"
+        candidate_ids = self._entries.keys()
+        if coach_ids is not None:
+            candidate_ids = set(coach_ids).intersection(candidate_ids)
 
-    return None
\ No newline at end of file
+        conflicts = {}
+        for coach_id in candidate_ids:
+            message = self._conflict(coach_id, session, start, end)
+            if message:
+                conflicts[coach_id] = message
+        return conflicts
@@ -1,5 +1,6 @@
 # scheduling/views.py
 # --- Start: Replace your existing imports with this block ---
+import hashlib
 import json
 from datetime import timedelta, datetime
 
@@ -9,8 +10,11 @@ from django.core.signing import BadSignature, SignatureExpired, TimestampSigner
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.views.decorators.http import require_POST
-from django.http import JsonResponse, HttpResponseForbidden
+from django.http import JsonResponse, HttpResponse, HttpResponseForbidden
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import quote_etag
 from django.utils import timezone
 from django.contrib import messages
 from django.db.models import Prefetch, F, ExpressionWrapper, DateTimeField, Exists, OuterRef, Q
@@ -20,7 +24,7 @@ import time
 from django.contrib.auth import get_user_model
 
 import calendar
-from .utils import get_month_start_end, check_for_conflicts
+from .utils import get_month_start_end, CoachConflictIndex
 from .forms import MonthYearFilterForm
 
 # Import models from their new app locations
@@ -33,7 +37,8 @@ from accounts.models import Coach, ContractTemplate, CoachContract
 from assessments.models import SessionAssessment, GroupAssessment
 from finance.models import CoachSessionCompletion
 from awards.models import Prize
-from .services import SessionService
+from .services import SessionService, StaffingService, AvailabilityService, AttendanceCommitService, WeekSnapshotService
+from .staffing_solver import propose_staffing, apply_staffing
 from todo.models import Task
 from tasks.models import TaskNotification
 # --- End: Replacement block ---
@@ -103,17 +108,13 @@ def _admin_dashboard(request):
         session_date__in=[today, today + timedelta(days=1)]
     ).order_by('session_date', 'session_start_time')
 
-    recent_sessions = Session.objects.filter(
-        session_date__gte=today - timedelta(days=1)
-    ).select_related('school_group')
-
-    finished_session_ids = [
-        s.id for s in recent_sessions
-        if s.end_datetime and s.end_datetime < now
-    ]
+    finished_recent_sessions = Session.objects.filter(
+        session_date__gte=today - timedelta(days=1),
+        scheduled_end__lt=now
+    )
 
     discrepancy_report = AttendanceDiscrepancy.objects.filter(
-        session_id__in=finished_session_ids,
+        session__in=finished_recent_sessions,
         admin_acknowledged=False,
         discrepancy_type__in=['NO_SHOW', 'UNEXPECTED']
     ).select_related('player', 'session__school_group')
@@ -252,6 +253,9 @@ def _coach_dashboard(request):
         ).select_related('school_group', 'venue').order_by('session_date', 'session_start_time')[:10]  # Limit to 10
 
 
+        # Resolve head coaches for all listed sessions in one query
+        head_coaches = Session.resolve_head_coaches(upcoming_coach_sessions)
+
         for session in upcoming_coach_sessions:
             availability = session.my_availability[0] if session.my_availability else None
             assignment = session.my_session_coach_assignment[0] if session.my_session_coach_assignment else None
@@ -267,7 +271,7 @@ def _coach_dashboard(request):
             # Extract confirmed coaches names
             # FIX: Only show confirmed coaches IF they are actually assigned to the session
             confirmed_coaches = []
-            head_coach = session.get_head_coach()
+            head_coach = head_coaches.get(session.id)
             if hasattr(session, 'confirmed_coach_availabilities'):
                 # Get IDs of users who are assigned coaches
                 assigned_user_ids = set(c.user_id for c in session.coaches_attending.all() if c.user_id)
@@ -276,7 +280,7 @@ def _coach_dashboard(request):
                 for ca in session.confirmed_coach_availabilities:
                     if ca.coach_id in assigned_user_ids:
                         is_hc = False
-                        if head_coach and head_coach.user == ca.coach:
+                        if head_coach and head_coach.user_id == ca.coach_id:
                             is_hc = True
                             
                         confirmed_coaches.append({
@@ -294,21 +298,16 @@ def _coach_dashboard(request):
             })
 
         # --- Pending assessment logic (remains the same) ---
-        sessions_needing_feedback_qs = Session.objects.filter(
+        recent_sessions_for_feedback = Session.objects.filter(
             coaches_attending=coach,
             session_date__gte=four_weeks_ago,
-            session_date__lte=today,
+            scheduled_end__lt=now,
             is_cancelled=False
         ).exclude(
             coach_completions__coach=coach,
             coach_completions__assessments_submitted=True
         ).order_by('-session_date', '-session_start_time')
 
-        recent_sessions_for_feedback = [
-            s for s in sessions_needing_feedback_qs
-            if s.end_datetime and s.end_datetime < now
-        ]
-
         # --- CORRECTED: Check if awards voting is open ---
         now_dt = timezone.now()
         show_awards_voting_card = Prize.objects.filter(
@@ -525,6 +524,30 @@ def update_attendance_status(request, session_id):
     except (json.JSONDecodeError, IntegrityError, Exception) as e:
         return JsonResponse({'status': 'error', 'message': 'An unexpected error occurred.'}, status=500)
 
+@login_required
+@require_POST
+@user_passes_test(is_staff)
+def commit_attendance(request, session_id):
+    """
+    Records final attendance for a whole session in one request.
+    Expects JSON: {"attending_player_ids": [1, 2, ...]}; every other active player in the group is marked absent.
+    """
+    session = get_object_or_404(Session.objects.select_related('school_group'), pk=session_id)
+    if not session.school_group:
+        return JsonResponse({'status': 'error', 'message': 'This session is not linked to a school group.'}, status=400)
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON data.'}, status=400)
+
+    attending_player_ids = data.get('attending_player_ids')
+    if not isinstance(attending_player_ids, list):
+        return JsonResponse({'status': 'error', 'message': 'attending_player_ids must be a list.'}, status=400)
+
+    summary = AttendanceCommitService.commit(session, attending_player_ids)
+    return JsonResponse({'status': 'success', 'message': 'Final attendance has been recorded.', **summary})
+
 @login_required
 def visual_attendance(request, session_id):
     session = get_object_or_404(Session.objects.select_related('school_group'), pk=session_id)
@@ -541,29 +564,7 @@ def visual_attendance(request, session_id):
         # Determine redirect target from hidden input, fallback to GET param check
         post_redirect_target = request.POST.get('redirect_next', 'session_detail')
 
-        # --- (Keep the discrepancy logic as it is) ---
-        for player in players_in_group:
-            record, _ = AttendanceTracking.objects.get_or_create(session=session, player=player)
-            final_attendance = AttendanceTracking.CoachAttended.YES if str(player.id) in attending_player_ids else AttendanceTracking.CoachAttended.NO
-            if record.attended != final_attendance:
-                record.attended = final_attendance
-                record.save()
-            parent_response = record.parent_response
-            discrepancy_type = None
-            if parent_response == 'ATTENDING' and final_attendance == 'NO':
-                discrepancy_type = 'NO_SHOW'
-            elif parent_response == 'NOT_ATTENDING' and final_attendance == 'YES':
-                discrepancy_type = 'UNEXPECTED'
-            elif parent_response == 'PENDING' and final_attendance == 'NO':
-                discrepancy_type = 'NEVER_NOTIFIED'
-            if discrepancy_type:
-                AttendanceDiscrepancy.objects.update_or_create(
-                    player=player, session=session,
-                    defaults={'discrepancy_type': discrepancy_type, 'parent_response': parent_response, 'coach_marked_attendance': final_attendance}
-                )
-            else:
-                AttendanceDiscrepancy.objects.filter(player=player, session=session).delete()
-        # --- (End of discrepancy logic) ---
+        AttendanceCommitService.commit(session, attending_player_ids)
 
         messages.success(request, "Final attendance has been recorded successfully.")
 
@@ -600,54 +601,71 @@ def visual_attendance(request, session_id):
     }
     return render(request, 'scheduling/visual_attendance.html', context)
 
-@login_required
-def session_calendar(request):
-    # Determine the view mode from URL (defaults to 'own')
-    view_mode = request.GET.get('view', 'own')
+# Pastel Palette with Paired Darker Text Colors for Contrast
+CALENDAR_PASTEL_PALETTE = [
+    {'bg': '#e3f2fd', 'text': '#1565c0'}, # Blue 50 -> Blue 800
+    {'bg': '#fff9c4', 'text': '#f57f17'}, # Yellow 50 -> Yellow 900
+    {'bg': '#e8f5e9', 'text': '#2e7d32'}, # Green 50 -> Green 800
+    {'bg': '#f3e5f5', 'text': '#6a1b9a'}, # Purple 50 -> Purple 800
+    {'bg': '#e0f7fa', 'text': '#006064'}, # Cyan 50 -> Cyan 900
+    {'bg': '#fff3e0', 'text': '#e65100'}, # Orange 50 -> Orange 900
+    {'bg': '#fce4ec', 'text': '#880e4f'}, # Pink 50 -> Pink 800
+    {'bg': '#f1f8e9', 'text': '#33691e'}, # Light Green 50 -> Light Green 800
+    {'bg': '#e8eaf6', 'text': '#283593'}, # Indigo 50 -> Indigo 800
+    {'bg': '#ffebee', 'text': '#b71c1c'}, # Red 50 -> Red 800
+]
+# Neutral color for no venue
+CALENDAR_NEUTRAL_COLOR = {'bg': '#f5f5f5', 'text': '#424242'} # Grey 100 -> Grey 800
+
+_URL_ID_PLACEHOLDER = 987654321
+
+
+def _url_template(view_name):
+    """
+    Reverses `view_name` once with a placeholder id and returns a (prefix, suffix) pair,
+    so per-object URLs can be built with string formatting instead of reverse().
+    """
+    url = reverse(view_name, args=[_URL_ID_PLACEHOLDER])
+    prefix, suffix = url.split(str(_URL_ID_PLACEHOLDER), 1)
+    return prefix, suffix
 
-    # Check if the user has the special permission
-    can_view_all = request.user.has_perm('scheduling.can_view_all_sessions')
 
+def _calendar_sessions_for_user(request, view_mode):
+    """Returns the Session queryset the user is allowed to see in the given calendar view mode."""
+    can_view_all = request.user.has_perm('scheduling.can_view_all_sessions')
     sessions_qs = Session.objects.all()
 
     # Filter sessions based on user role and selected view mode
     if request.user.is_superuser:
         # Superuser always sees all sessions
-        sessions = sessions_qs
+        return sessions_qs
     elif can_view_all and view_mode == 'all':
         # Permitted staff member has selected 'all'
-        sessions = sessions_qs
-    else:
-        # Default for all other staff: only see their own sessions
-        sessions = sessions_qs.filter(coaches_attending__user=request.user)
+        return sessions_qs
+    # Default for all other staff: only see their own sessions
+    return sessions_qs.filter(coaches_attending__user=request.user)
 
-    # --- Subquery to check for attendance records ---
-    attendance_taken_subquery = AttendanceTracking.objects.filter(
-        session=OuterRef('pk'),
-        attended__in=[AttendanceTracking.CoachAttended.YES, AttendanceTracking.CoachAttended.NO]
-    )
 
-    # Annotate the queryset with an 'attendance_taken' boolean field
-    sessions_annotated = sessions.select_related('school_group', 'venue').prefetch_related('coaches_attending').annotate(
-        attendance_taken=Exists(attendance_taken_subquery)
-    )
+def _parse_calendar_bound(value):
+    """Parses a FullCalendar start/end parameter (ISO date or datetime) into a date."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed:
+        return parsed.date()
+    return parse_date(value[:10])
 
-    # --- SORTING LOGIC ---
-    # 1. Fetch all sessions
-    all_sessions = list(sessions_annotated)
 
-    # 2. Group by Date
+def _build_session_events(sessions):
+    """Builds the FullCalendar event dicts for a list of sessions, grouped by venue within each day."""
+    # Group by Date
     sessions_by_date = defaultdict(list)
-    for session in all_sessions:
+    for session in sessions:
         sessions_by_date[session.session_date].append(session)
 
-    # 3. Process each day to apply Venue Grouping & Sorting
+    # Process each day to apply Venue Grouping & Sorting
     sorted_sessions = []
-    
-    # Sort dates to ensure chronological order first
-    sorted_dates = sorted(sessions_by_date.keys())
-
-    for date in sorted_dates:
+    for date in sorted(sessions_by_date.keys()):
         day_sessions = sessions_by_date[date]
         
         # Group by Venue ID (handle None venue)
@@ -661,38 +679,20 @@ def session_calendar(request):
             sessions_by_venue[vid].sort(key=lambda s: s.session_start_time)
 
         # Sort Venue Groups by the start time of their EARLIEST session
-        # We create a list of (venue_id, sessions_list) tuples
         venue_groups = []
         for vid, s_list in sessions_by_venue.items():
             if not s_list:
                 continue
             earliest_start = s_list[0].session_start_time
             venue_groups.append((vid, s_list, earliest_start))
-        
-        # Sort the groups by earliest_start
         venue_groups.sort(key=lambda x: x[2])
 
         # Flatten for this day
         for _, s_list, _ in venue_groups:
             sorted_sessions.extend(s_list)
 
-    # --- COLORING LOGIC ---
-    # --- COLORING LOGIC ---
-    # Pastel Palette with Paired Darker Text Colors for Contrast
-    PASTEL_PALETTE = [
-        {'bg': '#e3f2fd', 'text': '#1565c0'}, # Blue 50 -> Blue 800
-        {'bg': '#fff9c4', 'text': '#f57f17'}, # Yellow 50 -> Yellow 900
-        {'bg': '#e8f5e9', 'text': '#2e7d32'}, # Green 50 -> Green 800
-        {'bg': '#f3e5f5', 'text': '#6a1b9a'}, # Purple 50 -> Purple 800
-        {'bg': '#e0f7fa', 'text': '#006064'}, # Cyan 50 -> Cyan 900
-        {'bg': '#fff3e0', 'text': '#e65100'}, # Orange 50 -> Orange 900
-        {'bg': '#fce4ec', 'text': '#880e4f'}, # Pink 50 -> Pink 800
-        {'bg': '#f1f8e9', 'text': '#33691e'}, # Light Green 50 -> Light Green 800
-        {'bg': '#e8eaf6', 'text': '#283593'}, # Indigo 50 -> Indigo 800
-        {'bg': '#ffebee', 'text': '#b71c1c'}, # Red 50 -> Red 800
-    ]
-    # Neutral color for no venue
-    NEUTRAL_COLOR = {'bg': '#f5f5f5', 'text': '#424242'} # Grey 100 -> Grey 800
+    detail_url_prefix, detail_url_suffix = _url_template('scheduling:session_detail')
+    admin_url_prefix, admin_url_suffix = _url_template('admin:scheduling_session_change')
 
     # Build the rich event data for FullCalendar
     events = []
@@ -706,22 +706,20 @@ def session_calendar(request):
 
         # Determine Color
         if session.venue:
-            color_index = session.venue.id % len(PASTEL_PALETTE)
-            palette_entry = PASTEL_PALETTE[color_index]
+            palette_entry = CALENDAR_PASTEL_PALETTE[session.venue.id % len(CALENDAR_PASTEL_PALETTE)]
             event_bg_color = palette_entry['bg']
             event_text_color = palette_entry['text']
             border_color = event_bg_color 
         else:
-            event_bg_color = NEUTRAL_COLOR['bg']
-            event_text_color = NEUTRAL_COLOR['text']
+            event_bg_color = CALENDAR_NEUTRAL_COLOR['bg']
+            event_text_color = CALENDAR_NEUTRAL_COLOR['text']
             border_color = '#cccccc'
 
         events.append({
             'title': session.school_group.name if session.school_group else 'General Session',
             'start': f'{session.session_date}T{session.session_start_time}',
             'id': session.id,
-            'url': reverse('scheduling:session_detail', args=[session.id]),
-            'url': reverse('scheduling:session_detail', args=[session.id]),
+            'url': f'{detail_url_prefix}{session.id}{detail_url_suffix}',
             'backgroundColor': event_bg_color,
             'borderColor': border_color,
             'textColor': event_text_color,
@@ -732,17 +730,70 @@ def session_calendar(request):
                 'status_display': "Cancelled" if session.is_cancelled else "Confirmed",
                 'school_group_name': session.school_group.name if session.school_group else "N/A",
                 'session_time_str': session.session_start_time.strftime('%H:%M'),
-                'admin_url': reverse('admin:scheduling_session_change', args=[session.id]),
+                'admin_url': f'{admin_url_prefix}{session.id}{admin_url_suffix}',
                 'sortIndex': index, # CRITICAL for FullCalendar sorting
                 # MANAGEMENT MODE PROPS
                 'venue_id': session.venue.id if session.venue else '',
                 'school_group_id': session.school_group.id if session.school_group else '',
                 'duration': session.planned_duration_minutes,
                 'notes': session.notes,
-                'is_recurring': True if session.generated_from_rule else False
+                'is_recurring': True if session.generated_from_rule_id else False
             },
             'classNames': class_names
         })
+    return events
+
+
+@login_required
+def session_calendar_events(request):
+    """
+    JSON event feed for the session calendar.
+    Returns only the sessions inside the [start, end) range FullCalendar asks for,
+    and answers 304 Not Modified when the client already has the same payload.
+    """
+    start_date = _parse_calendar_bound(request.GET.get('start'))
+    end_date = _parse_calendar_bound(request.GET.get('end'))
+    if not start_date or not end_date or start_date > end_date:
+        return JsonResponse({'status': 'error', 'message': 'Valid start and end parameters are required.'}, status=400)
+
+    sessions = _calendar_sessions_for_user(request, request.GET.get('view', 'own'))
+
+    # --- Subquery to check for attendance records ---
+    attendance_taken_subquery = AttendanceTracking.objects.filter(
+        session=OuterRef('pk'),
+        attended__in=[AttendanceTracking.CoachAttended.YES, AttendanceTracking.CoachAttended.NO]
+    )
+
+    sessions_in_range = sessions.filter(
+        session_date__gte=start_date,
+        session_date__lt=end_date
+    ).select_related('school_group', 'venue').prefetch_related('coaches_attending').annotate(
+        attendance_taken=Exists(attendance_taken_subquery)
+    )
+
+    body = json.dumps(_build_session_events(sessions_in_range))
+    etag = quote_etag(hashlib.md5(body.encode()).hexdigest())
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+def session_calendar(request):
+    # Determine the view mode from URL (defaults to 'own')
+    view_mode = request.GET.get('view', 'own')
+
+    # Check if the user has the special permission
+    can_view_all = request.user.has_perm('scheduling.can_view_all_sessions')
+
+    # Session events are loaded per visible range from session_calendar_events.
+    events_url = reverse('scheduling:session_calendar_events')
 
     # --- TASKS LAYER LOGIC ---
     tasks_qs = Task.objects.filter(
@@ -800,7 +851,8 @@ def session_calendar(request):
 
     context = {
         'page_title': "Session Calendar",
-        'events_json': json.dumps(events),
+        'events_url': events_url,
+        'events_view_mode': view_mode,
         'tasks_json': json.dumps(tasks_data), # Add tasks data
         'special_events_json': json.dumps(special_events_data), # Add special events data
         'can_view_all': can_view_all,
@@ -828,39 +880,16 @@ def my_availability(request):
         coach_profile = None
 
     if request.method == 'POST':
-        updated_count = 0
-        session_ids_in_form = [int(key.split('_')[-1]) for key in request.POST.keys() if key.startswith('availability_session_')]
-        existing_records_qs = CoachAvailability.objects.filter(
-            coach=request.user, 
-            session_id__in=session_ids_in_form
-        )
-        existing_availabilities = {record.session_id: record for record in existing_records_qs}
-
+        submitted = {}
         for key, value in request.POST.items():
             if key.startswith('availability_session_'):
                 session_id = int(key.split('_')[-1])
-                notes = request.POST.get(f'notes_session_{session_id}', '').strip()
-                
-                if value not in CoachAvailability.Status.values:
-                    continue
-
-                existing_record = existing_availabilities.get(session_id)
-                current_status = existing_record.status if existing_record else CoachAvailability.Status.PENDING
-                current_notes = existing_record.notes if existing_record else ""
+                submitted[session_id] = (value, request.POST.get(f'notes_session_{session_id}', '').strip())
 
-                if value == current_status and notes == current_notes:
-                    continue
+        updated_count, missing_session_ids = AvailabilityService.save_session_availability(request.user, submitted)
+        for session_id in missing_session_ids:
+            messages.warning(request, f"Could not find session with ID {session_id}.")
 
-                try:
-                    session = Session.objects.get(pk=session_id)
-                    CoachAvailability.objects.update_or_create(
-                        coach=request.user, session=session,
-                        defaults={'status': value, 'notes': notes}
-                    )
-                    updated_count += 1
-                except Session.DoesNotExist:
-                    messages.warning(request, f"Could not find session with ID {session_id}.")
-        
         if updated_count > 0:
             messages.success(request, f"Successfully updated your availability for {updated_count} session(s).")
         else:
@@ -881,54 +910,30 @@ def my_availability(request):
     target_week_start = start_of_this_week + timedelta(weeks=week_offset)
     target_week_end = target_week_start + timedelta(days=6)
     
-    # --- START OF FIX ---
-    
-    # 1. Define the prefetch object we will use.
     my_availability_prefetch = Prefetch(
-        'coach_availabilities', 
-        queryset=CoachAvailability.objects.filter(coach=request.user), 
+        'coach_availabilities',
+        queryset=CoachAvailability.objects.filter(coach=request.user),
         to_attr='my_availability'
     )
 
-    # 2. Build the base queryset with the prefetch applied only ONCE.
-    upcoming_sessions_qs = Session.objects.filter(
+    upcoming_sessions = list(Session.objects.filter(
         session_date__gte=target_week_start,
         session_date__lte=target_week_end,
         is_cancelled=False
     ).select_related('school_group', 'venue').prefetch_related(
         'coaches_attending',
-        my_availability_prefetch  # Use the pre-defined prefetch object
-    ).order_by('session_date', 'venue__name', 'session_start_time')
+        my_availability_prefetch
+    ).order_by('session_date', 'venue__name', 'session_start_time'))
 
-    # 3. Now, if we are a coach, we can safely iterate to create missing records.
-    #    The queryset is already final, so there's no risk of re-applying the prefetch.
+    # Assigned sessions without an answer get a PENDING record (one bulk insert); the new
+    # rows are attached to the sessions so they render without being fetched again.
     if coach_profile:
-        # This loop now operates on a queryset that is already correctly defined.
-        for session in upcoming_sessions_qs:
-            is_assigned = coach_profile in session.coaches_attending.all()
-            # If assigned but no availability record exists, create one.
-            if is_assigned and not session.my_availability:
-                # Create the record. Note: This will NOT be reflected in the current
-                # loop's 'session.my_availability' because the prefetch is already done.
-                # The data will be correct on the next page load, which is acceptable.
-                CoachAvailability.objects.get_or_create(
-                    coach=request.user,
-                    session=session,
-                    defaults={'status': CoachAvailability.Status.PENDING} # Default to PENDING
-                )
-    
-    # --- END OF FIX ---
+        AvailabilityService.ensure_pending_availability(request.user, upcoming_sessions, coach_profile)
 
     # The rest of the view logic for grouping and rendering remains the same.
     grouped_sessions = defaultdict(list)
-    for session in upcoming_sessions_qs:
-        # We need to re-fetch my_availability for the created records
-        if not hasattr(session, 'my_availability') or not session.my_availability:
-             # This is a fallback for the session where we just created an availability.
-             availability_info_qs = CoachAvailability.objects.filter(coach=request.user, session=session)
-             availability_info = availability_info_qs.first()
-        else:
-            availability_info = session.my_availability[0] if session.my_availability else None
+    for session in upcoming_sessions:
+        availability_info = session.my_availability[0] if session.my_availability else None
         
         is_assigned = coach_profile in session.coaches_attending.all() if coach_profile else False
         is_confirmed = availability_info.last_action == 'CONFIRM' if availability_info else False
@@ -991,12 +996,10 @@ def set_bulk_availability_view(request):
         selected_year = int(request.POST.get('year'))
         start_date, end_date = get_month_start_end(selected_year, selected_month)
         
-        rules = ScheduledClass.objects.filter(is_active=True)
-        availability_updated_count = 0
+        rule_statuses = {}
+        for rule_id in ScheduledClass.objects.filter(is_active=True).values_list('id', flat=True):
+            availability_status_str = request.POST.get(f'availability_rule_{rule_id}')
 
-        for rule in rules:
-            availability_status_str = request.POST.get(f'availability_rule_{rule.id}')
-            
             # DEFAULT LOGIC: If the user leaves it empty/pending, it implies UNAVAILABLE
             status_to_set = CoachAvailability.Status.UNAVAILABLE
 
@@ -1004,28 +1007,18 @@ def set_bulk_availability_view(request):
                 status_to_set = CoachAvailability.Status.AVAILABLE
             elif availability_status_str == 'EMERGENCY':
                 status_to_set = CoachAvailability.Status.EMERGENCY
-            
-            # Historical Protection: Only update sessions strictly in the future (tomorrow onwards)
-            # We do NOT touch today's sessions or past sessions.
-            future_start_date = max(start_date, timezone.now().date() + timedelta(days=1))  
-
-            sessions_to_update = Session.objects.filter(
-                generated_from_rule=rule,
-                session_date__gte=future_start_date, # CHANGED: Use future_start_date instead of start_date
-                session_date__lte=end_date,
-                is_cancelled=False
-            )
-            
-            for session in sessions_to_update:
-                CoachAvailability.objects.update_or_create(
-                    coach=request.user,
-                    session=session,
-                    defaults={'status': status_to_set}
-                )
-                availability_updated_count += 1
-        
+            rule_statuses[rule_id] = status_to_set
+
+        # Historical Protection: only sessions strictly in the future (tomorrow onwards) are updated
+        availability_updated_count = AvailabilityService.apply_bulk_availability(
+            request.user, rule_statuses, start_date, end_date
+        )
+
         month_name = calendar.month_name[selected_month]
-        messages.success(request, f"Your availability for {availability_updated_count} future sessions in {month_name} {selected_year} has been updated.")
+        if availability_updated_count:
+            messages.success(request, f"Your availability for {availability_updated_count} future sessions in {month_name} {selected_year} has been updated.")
+        else:
+            messages.info(request, f"Your availability for {month_name} {selected_year} was already up to date.")
         return redirect(f"{reverse('scheduling:set_bulk_availability')}?month={selected_year}-{selected_month:02d}")
 
     # --- GET request handling ---
@@ -1279,93 +1272,43 @@ def session_staffing(request):
     # Neutral color for no venue
     NEUTRAL_COLOR = {'bg': '#f5f5f5', 'text': '#424242'} # Grey 100 -> Grey 800
 
-    # --- OPTIMIZED QUERY LOGIC ---
-    # Fetch all sessions for the week in a single query
-    # We prefetch all necessary related data to avoid N+1 N+1 queries in the loop
-    week_sessions = Session.objects.filter(
-        session_date__range=[target_week_start, target_week_end],
-        is_cancelled=False
-    ).select_related(
-        'school_group', 'venue'
-    ).prefetch_related(
-        'coaches_attending',                # Explicit prefetch for conflict checking
-        'sessioncoach_set__coach__user',    # For display status
-        'coach_availabilities'              # For display availability status
-    )
+    # --- WEEK SNAPSHOT ---
+    # Sessions, assignments and availabilities for the week, grouped per day and sorted by venue/time
+    snapshot = WeekSnapshotService.get_week(target_week_start)
+    week_sessions = snapshot['sessions']
 
-    # 1. Build Conflict Map (sessions grouped by coach)
-    coach_sessions_for_week = defaultdict(list)
-    
-    # 2. Build Daily Map (sessions grouped by date)
-    sessions_by_date = defaultdict(list)
+    # Player/attendance counts and head coaches for the whole week in two grouped queries.
+    # Not part of the cached snapshot: parent responses change independently of staffing.
+    StaffingService.attach_session_counts(week_sessions)
 
-    for session in week_sessions:
-        # Populate conflict map
-        for coach in session.coaches_attending.all():
-            coach_sessions_for_week[coach.id].append(session)
-        
-        # Populate daily map
-        sessions_by_date[session.session_date].append(session)
+    # 1. Build Conflict Index (sorted sessions per coach, built once)
+    conflict_index = CoachConflictIndex(week_sessions)
+    active_coach_ids = [coach.id for coach in all_active_coaches]
 
-    day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
     display_week = []
 
-    for i in range(7):
-        current_day = target_week_start + timedelta(days=i)
-        
-        # --- RETRIEVE FROM PRE-FETCHED DICT ---
-        sessions_qs = sessions_by_date[current_day]
-
-        # 1. Group by Venue ID
-        sessions_by_venue = defaultdict(list)
-        for session in sessions_qs:
-            # Use ID for grouping consistency
-            # Default to 'no_venue' if None (though venues should exist)
-            venue_id = session.venue.id if session.venue else 'no_venue'
-            sessions_by_venue[venue_id].append(session)
-        
-        # 2. Sort sessions WITHIN each venue by time
-        for vid in sessions_by_venue:
-            sessions_by_venue[vid].sort(key=lambda s: s.session_start_time)
-
-        # 3. Sort Venue Groups by the start time of their EARLIEST session
-        venue_groups = []
-        for vid, s_list in sessions_by_venue.items():
-            if not s_list:
-                continue
-            earliest_start = s_list[0].session_start_time
-            venue_groups.append((vid, s_list, earliest_start))
-        
-        # Sort the groups by earliest_start
-        venue_groups.sort(key=lambda x: x[2])
-
-        # 4. Flatten for this day
-        sessions_for_day_sorted = []
-        for _, s_list, _ in venue_groups:
-            sessions_for_day_sorted.extend(s_list)
-        # --- END: GROUPING LOGIC ---
-        
+    for day in snapshot['days']:
         processed_sessions = []
-        for session in sessions_for_day_sorted:
+        for session in day['sessions']:
             # Safely build availability map, skipping coaches without a user
             availability_map = {}
             for avail in session.coach_availabilities.all():
                 if avail.coach_id:
                      availability_map[avail.coach_id] = avail
 
-            coach_conflict_map = {}
-            for coach in all_active_coaches:
-                # Use the pre-calculated dictionary for conflicts
-                conflict = check_for_conflicts(coach, session, coach_sessions_for_week.get(coach.id, []))
-                if conflict:
-                    coach_conflict_map[coach.id] = conflict
+            coach_conflict_map = conflict_index.conflicts_for_session(session, active_coach_ids)
 
             assigned_coaches_status = []
             has_pending = False
             has_declined = False
+            # Only an explicit head coach pre-selects the radio; saving the form would otherwise
+            # store the highest-rate fallback from session.head_coach as an explicit choice
+            head_coach_id = None
             
             for session_coach in session.sessioncoach_set.all():
                 coach = session_coach.coach
+                if session_coach.is_head_coach:
+                    head_coach_id = coach.id
                 # Safely access availability using coach's user id if it exists
                 avail = None
                 if coach.user:
@@ -1405,11 +1348,8 @@ def session_staffing(request):
                             'conflict_warning': coach_conflict_map.get(coach.id)
                         })
             
-            total_players = session.school_group.players.filter(is_active=True).count() if session.school_group else 0
-            confirmed_players = AttendanceTracking.objects.filter(
-                session=session, 
-                parent_response=AttendanceTracking.ParentResponse.ATTENDING
-            ).count()
+            total_players = session.total_players
+            confirmed_players = session.confirmed_players_count
             total_coaches = len(assigned_coach_ids)
             confirmed_coaches = sum(1 for c in assigned_coaches_status if c['status'] == "Confirmed")
 
@@ -1432,6 +1372,7 @@ def session_staffing(request):
                 'has_declined_coaches': has_declined,
                 'total_players': total_players,
                 'confirmed_players_count': confirmed_players,
+                'head_coach_id': head_coach_id,
                 'total_coaches_assigned': total_coaches,
                 'confirmed_coaches_count': confirmed_coaches,
                 'bg_color': bg_color,
@@ -1439,8 +1380,8 @@ def session_staffing(request):
             })
             
         display_week.append({
-            'day_name': day_names[i],
-            'date': current_day,
+            'day_name': day['day_name'],
+            'date': day['date'],
             'sessions': processed_sessions
         })
 
@@ -1456,6 +1397,123 @@ def session_staffing(request):
     }
     return render(request, 'scheduling/session_staffing.html', context)
 
+def _assignment_response_data(session, coach_ids, all_active_coaches, conflict_index, durations):
+    """
+    Builds the staffing board payload for one session after its assignments changed:
+    assigned coaches with status/conflicts, available coaches, and the summary counts.
+    `session` needs `coach_availabilities` loaded; `durations` maps coach_id -> minutes.
+    """
+    all_active_coaches_dict = {c.id: c for c in all_active_coaches}
+    availability_map = {avail.coach_id: avail for avail in session.coach_availabilities.all()}
+    
+    assigned_coaches_data = []
+    has_pending = False
+    has_declined = False
+
+    for coach_id in coach_ids:
+        coach = all_active_coaches_dict.get(coach_id)
+        if not coach: continue
+
+        # Safely access availability
+        avail = None
+        if coach.user:
+            avail = availability_map.get(coach.user.id)
+        
+        status = "Pending"
+        if avail:
+            if avail.status == CoachAvailability.Status.UNAVAILABLE:
+                status = "Declined"
+                has_declined = True
+            elif avail.last_action == 'CONFIRM':
+                status = "Confirmed"
+        else:
+            has_pending = True
+
+        assigned_coaches_data.append({
+            'id': coach.id,
+            'name': coach.name,
+            'status': status,
+            'notes': avail.notes if avail and avail.notes else '',
+            'conflict_warning': conflict_index.conflict_for(coach.id, session),
+            'coaching_duration': durations.get(coach.id, session.planned_duration_minutes),
+        })
+    
+    available_coaches_data = []
+    assigned_coach_id_set = set(coach_ids)
+    for coach in all_active_coaches:
+        if coach.id not in assigned_coach_id_set:
+            # Safely access availability
+            avail = None
+            if coach.user:
+                avail = availability_map.get(coach.user.id)
+
+            if avail and avail.status in [CoachAvailability.Status.AVAILABLE, CoachAvailability.Status.EMERGENCY]:
+                available_coaches_data.append({
+                    'id': coach.id,
+                    'name': coach.name,
+                    'is_emergency': avail.status == CoachAvailability.Status.EMERGENCY,
+                    'conflict_warning': conflict_index.conflict_for(coach.id, session)
+                })
+    
+    available_coaches_data.sort(key=lambda x: x['is_emergency'])
+
+    confirmed_coaches_count = sum(1 for c in assigned_coaches_data if c['status'] == 'Confirmed')
+
+    return {
+        'assigned_coaches': assigned_coaches_data,
+        'available_coaches': available_coaches_data,
+        'confirmed_coaches_count': confirmed_coaches_count,
+        'total_coaches_assigned': len(coach_ids),
+        'has_pending': has_pending,
+        'has_declined': has_declined,
+    }
+
+
+@login_required
+@user_passes_test(lambda u: u.is_superuser)
+def staffing_solver(request):
+    """
+    Proposes a complete staffing plan for a date range (see staffing_solver.propose_staffing)
+    and shows it as a diff against the current assignments. POSTing the previewed plan's
+    fingerprint applies it in one bulk write; if staffing changed in the meantime the new
+    plan is shown again instead.
+    """
+    params = request.POST if request.method == 'POST' else request.GET
+    today = timezone.now().date()
+    default_start = today - timedelta(days=today.weekday())
+    start_date = parse_date(params.get('start') or '') or default_start
+    end_date = parse_date(params.get('end') or '') or start_date + timedelta(days=6)
+    try:
+        coaches_per_session = int(params.get('coaches_per_session') or 0) or None
+    except (ValueError, TypeError):
+        coaches_per_session = None
+    replace_existing = params.get('replace') == 'on'
+
+    if end_date < start_date or (end_date - start_date).days > 120:
+        messages.error(request, "Choose an end date on or after the start date, at most 120 days later.")
+        end_date = start_date + timedelta(days=6)
+
+    plan = propose_staffing(start_date, end_date, coaches_per_session=coaches_per_session, replace_existing=replace_existing)
+
+    if request.method == 'POST':
+        if params.get('fingerprint') == plan['fingerprint']:
+            created, removed = apply_staffing(plan)
+            messages.success(request, f"Staffing applied: {created} assignment(s) added, {removed} removed.")
+            week_offset = (WeekSnapshotService.week_start_for(start_date) - default_start).days // 7
+            return redirect(f"{reverse('scheduling:session_staffing')}?week={week_offset}")
+        messages.warning(request, "Staffing changed since the preview was generated. Review the updated plan below.")
+
+    context = {
+        'page_title': "Auto-Staff Sessions",
+        'plan': plan,
+        'changed_sessions': [entry for entry in plan['sessions'] if entry['added'] or entry['removed'] or entry['unfilled']],
+        'start_date': start_date,
+        'end_date': end_date,
+        'coaches_per_session': coaches_per_session or '',
+        'replace_existing': replace_existing,
+    }
+    return render(request, 'scheduling/staffing_solver.html', context)
+
 @login_required
 @user_passes_test(lambda u: u.is_superuser)
 @require_POST
@@ -1503,84 +1561,24 @@ def assign_coaches_ajax(request):
 
         # Re-fetch data for the response
         all_active_coaches = list(Coach.objects.filter(is_active=True).select_related('user').order_by('name'))
-        all_active_coaches_dict = {c.id: c for c in all_active_coaches}
         
         start_date_range = session.session_date - timedelta(days=3)
         end_date_range = session.session_date + timedelta(days=3)
         
-        coach_sessions_for_week = {
-            coach.id: list(Session.objects.filter(
-                coaches_attending=coach,
+        # One query for every assigned session in the window, indexed per coach
+        conflict_index = CoachConflictIndex(
+            Session.objects.filter(
                 session_date__range=[start_date_range, end_date_range],
-                is_cancelled=False
-            )) for coach in all_active_coaches
-        }
-
-        availability_map = {avail.coach_id: avail for avail in session.coach_availabilities.all()}
-        
-        assigned_coaches_data = []
-        has_pending = False
-        has_declined = False
-
-        for coach_id in coach_ids:
-            coach = all_active_coaches_dict.get(coach_id)
-            if not coach: continue
-
-            # Safely access availability
-            avail = None
-            if coach.user:
-                avail = availability_map.get(coach.user.id)
-            
-            status = "Pending"
-            if avail:
-                if avail.status == CoachAvailability.Status.UNAVAILABLE:
-                    status = "Declined"
-                    has_declined = True
-                elif avail.last_action == 'CONFIRM':
-                    status = "Confirmed"
-            else:
-                has_pending = True
-
-            assigned_coaches_data.append({
-                'id': coach.id,
-                'name': coach.name,
-                'status': status,
-                'notes': avail.notes if avail and avail.notes else '',
-                'conflict_warning': check_for_conflicts(coach, session, coach_sessions_for_week.get(coach.id, [])),
-                'coaching_duration': session.planned_duration_minutes, # Add default duration
-            })
-        
-        available_coaches_data = []
-        assigned_coach_id_set = set(coach_ids)
-        for coach in all_active_coaches:
-            if coach.id not in assigned_coach_id_set:
-                # Safely access availability
-                avail = None
-                if coach.user:
-                    avail = availability_map.get(coach.user.id)
+                is_cancelled=False,
+                sessioncoach__isnull=False
+            ).distinct().select_related('school_group', 'venue').prefetch_related('sessioncoach_set')
+        )
 
-                if avail and avail.status in [CoachAvailability.Status.AVAILABLE, CoachAvailability.Status.EMERGENCY]:
-                    available_coaches_data.append({
-                        'id': coach.id,
-                        'name': coach.name,
-                        'is_emergency': avail.status == CoachAvailability.Status.EMERGENCY,
-                        'conflict_warning': check_for_conflicts(coach, session, coach_sessions_for_week.get(coach.id, []))
-                    })
-        
-        available_coaches_data.sort(key=lambda x: x['is_emergency'])
-
-        confirmed_coaches_count = sum(1 for c in assigned_coaches_data if c['status'] == 'Confirmed')
-
-        return JsonResponse({
-            'status': 'success',
-            'message': 'Assignments updated.',
-            'assigned_coaches': assigned_coaches_data,
-            'available_coaches': available_coaches_data,
-            'confirmed_coaches_count': confirmed_coaches_count,
-            'total_coaches_assigned': len(coach_ids),
-            'has_pending': has_pending,
-            'has_declined': has_declined,
-        })
+        response_data = _assignment_response_data(
+            session, coach_ids, all_active_coaches, conflict_index,
+            durations={coach_id: session.planned_duration_minutes for coach_id in coach_ids}
+        )
+        return JsonResponse({'status': 'success', 'message': 'Assignments updated.', **response_data})
     except json.JSONDecodeError:
         return JsonResponse({'status': 'error', 'message': 'Invalid JSON data provided.'}, status=400)
     except Session.DoesNotExist:
@@ -1589,6 +1587,91 @@ def assign_coaches_ajax(request):
         return JsonResponse({'status': 'error', 'message': f'An unexpected error occurred: {str(e)}'}, status=500)
 
 
+@login_required
+@user_passes_test(lambda u: u.is_superuser)
+@require_POST
+def assign_coaches_batch_ajax(request):
+    """
+    Applies assignment changes for many sessions in one request and one transaction.
+    Body: {"changes": [{"session_id": 1, "coach_ids": [3, 4], "head_coach_id": 3}, ...]}
+    Returns the assign_coaches_ajax payload per changed session under `sessions`, plus
+    `conflict_updates`: {session_id: {coach_id: message or null}} for the coaches whose
+    assignments changed, on the other sessions within three days of the changes.
+    """
+    try:
+        data = json.loads(request.body)
+        changes = {}
+        for change in data['changes']:
+            session_id = int(change['session_id'])
+            coach_ids = list(dict.fromkeys(int(cid) for cid in change.get('coach_ids', [])))
+            head_coach_id = int(change['head_coach_id']) if change.get('head_coach_id') else None
+            if session_id in changes:
+                return JsonResponse({'status': 'error', 'message': f'Session {session_id} appears more than once.'}, status=400)
+            if head_coach_id is not None and head_coach_id not in coach_ids:
+                return JsonResponse({'status': 'error', 'message': f'Head coach for session {session_id} must also be assigned.'}, status=400)
+            changes[session_id] = (coach_ids, head_coach_id)
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON data provided.'}, status=400)
+
+    if not changes:
+        return JsonResponse({'status': 'error', 'message': 'No changes provided.'}, status=400)
+
+    sessions = {
+        s.id: s for s in Session.objects.filter(id__in=changes).select_related('school_group', 'venue').prefetch_related('coach_availabilities')
+    }
+    missing = sorted(set(changes) - set(sessions))
+    if missing:
+        return JsonResponse({'status': 'error', 'message': f'Sessions not found: {missing}'}, status=404)
+
+    requested_coach_ids = {cid for coach_ids, _ in changes.values() for cid in coach_ids}
+    unknown = sorted(requested_coach_ids - set(Coach.objects.filter(id__in=requested_coach_ids).values_list('id', flat=True)))
+    if unknown:
+        return JsonResponse({'status': 'error', 'message': f'Coaches not found: {unknown}'}, status=400)
+
+    deltas = StaffingService.apply_assignment_changes({sessions[sid]: change for sid, change in changes.items()})
+    affected_coach_ids = {cid for delta in deltas.values() for cid in delta['added'] | delta['removed']}
+
+    all_active_coaches = list(Coach.objects.filter(is_active=True).select_related('user').order_by('name'))
+    user_to_coach = {coach.user_id: coach.id for coach in all_active_coaches if coach.user_id}
+    # Only coaches shown in the changed sessions or whose assignments moved need conflict data
+    relevant_coach_ids = affected_coach_ids | requested_coach_ids | {
+        user_to_coach[avail.coach_id]
+        for session in sessions.values() for avail in session.coach_availabilities.all()
+        if avail.coach_id in user_to_coach
+    }
+
+    dates = [session.session_date for session in sessions.values()]
+    window_sessions = list(
+        Session.objects.filter(
+            session_date__range=[min(dates) - timedelta(days=3), max(dates) + timedelta(days=3)],
+            is_cancelled=False
+        ).select_related('school_group', 'venue').prefetch_related(
+            Prefetch('sessioncoach_set', queryset=SessionCoach.objects.filter(coach_id__in=relevant_coach_ids))
+        )
+    )
+    conflict_index = CoachConflictIndex(window_sessions)
+
+    session_payloads = {
+        session_id: _assignment_response_data(
+            sessions[session_id], changes[session_id][0], all_active_coaches, conflict_index,
+            durations=deltas[session_id]['durations']
+        )
+        for session_id in changes
+    }
+    conflict_updates = {
+        session.id: {coach_id: conflict_index.conflict_for(coach_id, session) for coach_id in affected_coach_ids}
+        for session in window_sessions
+        if session.id not in changes and affected_coach_ids
+    }
+
+    return JsonResponse({
+        'status': 'success',
+        'message': f'Assignments updated for {len(changes)} session(s).',
+        'sessions': session_payloads,
+        'conflict_updates': conflict_updates,
+    })
+
+
 @login_required
 @user_passes_test(lambda u: u.is_superuser)
 @require_POST
@@ -2144,52 +2227,15 @@ def staffing_overview_modal(request):
         target_date = timezone.now().date()
 
     # Calculate Monday-Sunday of the requested week
-    start_of_week = target_date - timedelta(days=target_date.weekday())
-    # end_of_week = start_of_week + timedelta(days=6) # Unused but implicit in loop
+    start_of_week = WeekSnapshotService.week_start_for(target_date)
+    snapshot = WeekSnapshotService.get_week(start_of_week)
 
-    day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
     display_week = []
 
-    for i in range(7):
-        current_day = start_of_week + timedelta(days=i)
-        
-        # Fetch sessions for the day
-        sessions_qs = Session.objects.filter(
-            session_date=current_day,
-            is_cancelled=False
-        ).select_related('school_group', 'venue').prefetch_related(
-            'sessioncoach_set__coach__user',
-            'coach_availabilities'
-        )
-
-        # 1. Group by Venue
-        sessions_by_venue = defaultdict(list)
-        for session in sessions_qs:
-            venue_id = session.venue.id if session.venue else 'no_venue'
-            sessions_by_venue[venue_id].append(session)
-        
-        # 2. Sort sessions WITHIN grouped venue by time
-        for vid in sessions_by_venue:
-            sessions_by_venue[vid].sort(key=lambda s: s.session_start_time)
-
-        # 3. Sort Venue Groups by the start time of their EARLIEST session
-        venue_groups = []
-        for vid, s_list in sessions_by_venue.items():
-            if not s_list:
-                continue
-            earliest_start = s_list[0].session_start_time
-            venue_groups.append((vid, s_list, earliest_start))
-        
-        venue_groups.sort(key=lambda x: x[2])
-
-        # 4. Flatten for this day
-        sessions_sorted = []
-        for _, s_list, _ in venue_groups:
-            sessions_sorted.extend(s_list)
-        
+    for day in snapshot['days']:
         # Process sessions to format data for template
         processed_sessions = []
-        for session in sessions_sorted:
+        for session in day['sessions']:
             # Build availability map for quick lookup
             availability_map = {}
             for avail in session.coach_availabilities.all():
@@ -2226,8 +2272,8 @@ def staffing_overview_modal(request):
             })
 
         display_week.append({
-            'day_name': day_names[i],
-            'date': current_day,
+            'day_name': day['day_name'],
+            'date': day['date'],
             'sessions': processed_sessions
         })
     
@@ -1,4 +1,11 @@
+import time
+
 from django.contrib.auth.models import Group
+from django.contrib.sites.models import Site
+from django.template.loader import render_to_string
+from todo.models import Comment
+
+from core.outbox import enqueue
 from .models import TaskNotification
 
 def create_admin_notifications(task, actor, notification_type):
@@ -26,3 +33,54 @@ def create_admin_notifications(task, actor, notification_type):
     
     if notifications:
         TaskNotification.objects.bulk_create(notifications)
+
+
+def queue_task_mail(task, subject, body, recipients):
+    """
+    Queues a task email through the outbox with the same Message-ID/References headers as
+    django-todo's todo_send_mail(), so mail clients keep threading notifications per task.
+    """
+    references = " ".join(filter(bool, Comment.objects.filter(task=task).values_list("email_message_id", flat=True)))
+    message_hash = abs(hash((subject, body, frozenset(recipients), references)))
+    thread_message_id = "<thread-{}@django-todo>".format(task.pk)
+    enqueue(
+        subject,
+        body,
+        recipients,
+        headers={
+            "Message-ID": "<notif-{}.{:x}.{}@django-todo>".format(task.pk, message_hash, int(time.time())),
+            "References": "{} {}".format(references, thread_message_id),
+            "In-reply-to": thread_message_id,
+        },
+        category="task_notification",
+    )
+
+
+def queue_assignment_mail(task):
+    """Outbox version of todo.utils.send_notify_mail(): tells the assignee about a new task."""
+    assignee = task.assigned_to
+    if not assignee or assignee == task.created_by or not assignee.email:
+        return
+    current_site = Site.objects.get_current()
+    subject = render_to_string("todo/email/assigned_subject.txt", {"task": task})
+    body = render_to_string("todo/email/assigned_body.txt", {"task": task, "site": current_site})
+    queue_task_mail(task, subject, body, [assignee.email])
+
+
+def queue_comment_mail(task, msg_body, user, subject=None):
+    """Outbox version of todo.utils.send_email_to_thread_participants()."""
+    current_site = Site.objects.get_current()
+    if not subject:
+        subject = render_to_string("todo/email/assigned_subject.txt", {"task": task})
+    body = render_to_string(
+        "todo/email/newcomment_body.txt",
+        {"task": task, "body": msg_body, "site": current_site, "user": user},
+    )
+
+    recipients = {comment.author.email for comment in Comment.objects.filter(task=task).select_related("author") if comment.author}
+    for participant in (task.created_by, task.assigned_to):
+        if participant:
+            recipients.add(participant.email)
+    recipients = sorted(email for email in recipients if email)
+    if recipients:
+        queue_task_mail(task, subject, body, recipients)
@@ -23,13 +23,12 @@ from todo.features import HAS_TASK_MERGE
 from todo.forms import AddEditTaskForm
 from todo.models import Attachment, Comment, Task
 from todo.utils import (
-    send_email_to_thread_participants,
     staff_check,
     toggle_task_completed,
     user_can_read_task,
 )
 from .forms import CustomAddEditTaskForm
-from .utils import create_admin_notifications
+from .utils import create_admin_notifications, queue_assignment_mail, queue_comment_mail
 from .models import TaskNotification
 from django.views.decorators.http import require_POST
 from django.http import JsonResponse
@@ -46,7 +45,7 @@ def handle_add_comment(request, task):
         author=request.user, task=task, body=bleach.clean(request.POST["comment-body"], strip=True)
     )
 
-    send_email_to_thread_participants(
+    queue_comment_mail(
         task,
         request.POST["comment-body"],
         request.user,
@@ -97,7 +96,6 @@ def custom_list_detail(request, list_id=None, list_slug=None, view_completed=Fal
     from django.http import HttpResponse
     from django.core.exceptions import PermissionDenied
     from todo.models import Task
-    from todo.utils import send_notify_mail
     from .forms import CustomAddEditTaskForm
     import bleach
     
@@ -171,7 +169,7 @@ def custom_list_detail(request, list_id=None, list_slug=None, view_completed=Fal
                         and new_task.assigned_to
                         and new_task.assigned_to != request.user
                     ):
-                        send_notify_mail(new_task)
+                        queue_assignment_mail(new_task)
 
                 if len(assignees) == 1:
                      messages.success(request, 'New task "{t}" has been added.'.format(t=new_task.title))